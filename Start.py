@@ -4,8 +4,23 @@ import streamlit as st
 import os
 from pathlib import Path
 
+from utils.pyramid_utils import build_all_in_background
+from utils.slider_utils import get_prefetcher
+
 st.set_page_config(page_title="Start", layout="wide")
 
+
+# Bildpyramiden der Detektiv-Szenen einmal pro Prozess im Hintergrund bauen
+@st.cache_resource
+def _pyramiden_bauen():
+    return build_all_in_background()
+
+
+_pyramiden_bauen()
+
+# Designer-Bilder auf Anzeigebreite vorab kodieren (ebenfalls im Hintergrund)
+get_prefetcher()
+
 st.header(
     """
     🏘️ Willkommen zu den Spielen der WKT Ebnat-Kappel!
@@ -6,7 +6,7 @@ from datetime import datetime, timedelta
 from utils.time_utils import TZ_LOCAL, to_utc
 
 
-from utils.google_utils import lade_worksheet_namen, lade_worksheet
+from utils.google_utils import get_gsheet_pool, lade_alle_worksheets
 from utils.utils import reset_session_state_on_page_change
 from utils.auswertung_utils import (
     detective_auswertung,
@@ -56,9 +56,12 @@ zeitauswahl()
 # ────────────────────────── Tabs pro Spiel ────────────────────────
 spiel_tabs = st.tabs(list(spiele.keys()))
 
+# Alle Worksheets aller Spiele in einem Zug laden (ein Request pro Spreadsheet)
+daten = lade_alle_worksheets(tuple(spiele.values()))
+
 for i, (spiel_label, sheet_name) in enumerate(spiele.items()):
     with spiel_tabs[i]:
-        worksheets = lade_worksheet_namen(sheet_name)
+        worksheets = list(daten[sheet_name])
         if not worksheets:
             continue
 
@@ -67,7 +70,7 @@ for i, (spiel_label, sheet_name) in enumerate(spiele.items()):
             "🗂️ Datenblatt auswählen", worksheets, index=0, key=sheet_name
         )
 
-        df = lade_worksheet(sheet_name, worksheet_name)
+        df = daten[sheet_name][worksheet_name]
         if df.empty:
             st.info("Keine Daten verfügbar.")
             continue
@@ -78,3 +81,8 @@ for i, (spiel_label, sheet_name) in enumerate(spiele.items()):
             detective_auswertung(df, worksheet_name)
         elif spiel_label == "🎚️ Landschaftsdesigner:in":
             designer_auswertung(df)
+
+# ────────────────────────── Sheets-Kontingent ─────────────────────
+with st.expander("📶 Google-Sheets-Kontingent"):
+    # Warteschlange und abgewiesene Anfragen (429) seit Serverstart
+    st.json(get_gsheet_pool().scheduler.stats())
@@ -1,5 +1,5 @@
 import streamlit as st
-from utils.utils import reset_session_state_on_page_change
+from utils.utils import reset_session_state_on_page_change, zeige_speicherstatus
 
 
 st.title("🛡️ Landschaftsbeschützer:in Game")
@@ -29,6 +29,7 @@ if st.button("Spiel starten"):
     )
 
 # Feedback-Meldung und Formular
+zeige_speicherstatus("feedback_ticket")
 if st.session_state["spiel_geoeffnet"]:
     st.success("✅ Das Spiel wurde in einem neuen Tab geöffnet. Viel Spass!")
     if not st.session_state["feedback"]:
@@ -4,13 +4,19 @@ from utils.slider_utils import (
     scan_slider_ranges,
     map_to_emoji_level,
     load_narrative_texts,
+    get_prefetcher,
+)
+from utils.image_utils import encode_file
+from utils.utils import (
+    reset_session_state_on_page_change,
+    get_base_path,
+    zeige_speicherstatus,
 )
-from utils.google_utils import save_slider_results_to_gsheet
-from utils.utils import reset_session_state_on_page_change, get_base_path
 
 st.set_page_config("Landschafts-Spiel", layout="wide")
 scene_ranges = scan_slider_ranges()
 narrative_texts = load_narrative_texts()
+prefetcher = get_prefetcher()  # kodiert beim ersten Aufruf alle Varianten vor
 
 
 reset_session_state_on_page_change("Landschaftsdesigner")
@@ -23,6 +29,8 @@ st.logo(get_base_path("slider") / "icon.png", size="large")
 
 st.markdown("---")
 
+zeige_speicherstatus("save_ticket", "feedback_ticket")
+
 if st.session_state.get("image_name") and not st.session_state["feedback"]:
     from utils.utils import zeige_feedback_formular
 
@@ -78,6 +86,8 @@ with st.sidebar:
 
 # Bildpfad ermitteln
 image_path, kosten = get_image_path(scene.replace(" ", ""), *slider_values)
+# Nachbarzustände serverseitig vorkodieren; der nächste Wechsel trifft den Cache
+prefetcher.prefetch_neighbours(scene.replace(" ", ""), *slider_values)
 
 col1_header, col2_header, col3_header = st.columns(3, gap="large")
 
@@ -124,8 +134,12 @@ col1_body, col2_body = st.columns([4, 1])
 
 with col1_body:
     # Bild anzeigen
+    # Kompaktes JPEG in Anzeigebreite statt der mehrere MB grossen Datei
     st.image(
-        image_path, caption="Dein gewähltes Zukunftsbild", use_container_width=True
+        encode_file(image_path).data,
+        caption="Dein gewähltes Zukunftsbild",
+        use_container_width=True,
+        output_format="JPEG",
     )
 with col2_body:
     # Präferenz absenden
@@ -133,7 +147,11 @@ with col2_body:
         st.session_state["image_name"] = image_path.split("/")[-1]
         st.session_state["feedback"] = False  # Reset
         try:
-            save_slider_results_to_gsheet(scene, slider_values, kosten)
+            from utils.google_utils import save_slider_results_to_gsheet
+
+            st.session_state.save_ticket = save_slider_results_to_gsheet(
+                scene, slider_values, kosten
+            )
             st.toast("✅ Auswahl gespeichert.")
         except Exception as e:
             st.warning(f"Fehler beim Speichern: {e}")
@@ -4,22 +4,22 @@ from __future__ import annotations
 
 import time
 
-import pandas as pd
 import streamlit as st
-from shapely.geometry import Point
 from streamlit_image_coordinates import streamlit_image_coordinates
 from streamlit_js_eval import streamlit_js_eval
 from utils.detective_utils import (
     init_state,
     reset_session_state_on_scene_change,
     get_base_path,
-    draw_markers_on_images,
     load_lerntexte,
     plot_images_with_differences,
     get_scene_scaled,
+    render_marked_scene,
+    get_label_mask,
     show_schwierigkeitstufe,
 )
-from utils.utils import reset_session_state_on_page_change
+from utils.image_utils import encode_image
+from utils.utils import reset_session_state_on_page_change, zeige_speicherstatus
 
 # ───────────────────────── UI-Setup ─────────────────────────
 st.set_page_config(layout="wide")
@@ -113,8 +113,8 @@ if not st.session_state.spiel_started:
     st.stop()
 
 # ───────────────────── Daten laden ──────────────────────────
-img_orig_s, img_klima_s, gdf_diff_s, scale_factor = get_scene_scaled(scene, image_w)
 lerntexte = load_lerntexte(scene)
+label_mask = get_label_mask(scene)
 
 
 # ───────────────────── Rückmeldung ─────────────────────────────
@@ -126,42 +126,14 @@ if len(st.session_state.gefunden) == len(lerntexte):
 
         zeige_feedback_formular("Landschaftsdetektiv")
 
-
-# ───────────────────── Treffer Meldung ──────────────────────────
-if st.session_state.letzte_meldung.startswith("❌"):
-    st.warning(st.session_state.letzte_meldung)
-else:
-    st.success(st.session_state.letzte_meldung)
-
-
-# ───────────────────── Bilder mit Markern ───────────────────
-img1_show, img2_show = draw_markers_on_images(
-    img_orig_s,
-    img_klima_s,
-    st.session_state.all_pts,
-    gdf_diff_s,
-    st.session_state.gefunden,
-    radius=20 * scale_factor,
-    lwd_width=int(2 * scale_factor),
-)
-
-col1, col2 = st.columns(2)
-with col1:
-    st.markdown("### 2025")
-    click1 = streamlit_image_coordinates(
-        img1_show, key=f"orig_{image_w}", width=image_w
-    )
-with col2:
-    st.markdown("### 2050")
-    click2 = streamlit_image_coordinates(
-        img2_show, key=f"klima_{image_w}", width=image_w
-    )
+zeige_speicherstatus("save_ticket", "feedback_ticket")
 
 
 # ───────────────────── Klick-Handler ────────────────────────
 def handle_click(
     click: dict | None,
     img,
+    image_w: int,
     key_last: str,
     label_side: str,
 ) -> None | bool:
@@ -176,12 +148,13 @@ def handle_click(
     if (rel_x, rel_y) == st.session_state.get(key_last):
         return
 
-    # ► Für Treffer-Prüfung
-    point = Point(rel_x, rel_y)
-    hit = not gdf_diff_s[gdf_diff_s.contains(point)].empty
+    # ► Für Treffer-Prüfung (ein Zugriff ins Label-Raster)
+    label = label_mask.locate(rel_x, rel_y)
+    hit = label is not None
 
-    # ► Klick speichern (nur rel_x/rel_y + hit)
-    st.session_state.all_pts.append({"rel_x": rel_x, "rel_y": rel_y, "hit": hit})
+    # ► Klick speichern (rel_x/rel_y, hit, Sekunden seit Start)
+    sec = round(time.time() - st.session_state.start_time, 2)
+    st.session_state.all_pts.append(rel_x, rel_y, hit, sec)
     st.session_state[key_last] = (rel_x, rel_y)  # letztes Click-Memo
 
     if key_last == "last_click_original":
@@ -191,14 +164,9 @@ def handle_click(
 
     # ► Meldungen & Lerntexte
     if hit:
-        label = gdf_diff_s[gdf_diff_s.contains(point)].iloc[0]["label"]
         if label not in st.session_state.gefunden:
             st.session_state.gefunden.append(label)
-            sec = round(time.time() - st.session_state.start_time, 2)
-            st.session_state.found_data.loc[len(st.session_state.found_data)] = {
-                "label": label,
-                "sekunden_seit_start": sec,
-            }
+            st.session_state.found_data.add(label, sec)
         st.session_state.letzte_meldung = lerntexte.get(
             label, "⚠️ Kein Lerntext vorhanden."
         )
@@ -207,14 +175,74 @@ def handle_click(
             f"❌ Kein Unterschied im {label_side} gefunden."
         )
 
-    return True  # signalisiert dem Aufrufer, dass ein Rerun nötig ist
+    return True  # signalisiert dem Aufrufer, dass neu gezeichnet werden muss
 
 
-rerun1 = handle_click(click1, img_orig_s, "last_click_original", "Originalbild")
-rerun2 = handle_click(click2, img_klima_s, "last_click_klima", "Klimabild")
+# ───────────────────── Bilder mit Markern ───────────────────
+@st.fragment
+def bild_panel(scene: str, image_w: int) -> None:
+    """
+    Trefferhinweis, Bildpaar und Klick-Auswertung als eigener Rerun-Bereich:
+    ein Klick führt nur diese Funktion erneut aus. Nur wenn ein neuer
+    Unterschied gefunden wurde (Lerntexte, Zeiten, Sieg), läuft die ganze Seite.
+    """
+    img_orig_s, img_klima_s, _, scale_factor = get_scene_scaled(scene, image_w)
+    klicks = [
+        (f"orig_{image_w}", img_orig_s, "last_click_original", "Originalbild"),
+        (f"klima_{image_w}", img_klima_s, "last_click_klima", "Klimabild"),
+    ]
+
+    # ► Klicks zuerst auswerten (Widget-Wert steht schon im Session-State),
+    #   dann einmal mit den neuen Markern zeichnen
+    gefunden_vorher = len(st.session_state.gefunden)
+    for key, img, key_last, label_side in klicks:
+        handle_click(st.session_state.get(key), img, image_w, key_last, label_side)
+    if len(st.session_state.gefunden) > gefunden_vorher:
+        st.rerun()  # neuer Fund → ganze Seite aktualisieren
+
+    # ► Treffer Meldung
+    if st.session_state.letzte_meldung.startswith("❌"):
+        st.warning(st.session_state.letzte_meldung)
+    else:
+        st.success(st.session_state.letzte_meldung)
+
+    img1_show, img2_show = render_marked_scene(
+        scene,
+        img_orig_s.width,
+        st.session_state.all_pts,
+        st.session_state.gefunden,
+        radius=20 * scale_factor,
+        lwd_width=int(2 * scale_factor),
+    )
 
-if rerun1 or rerun2:
-    st.rerun()
+    col1, col2 = st.columns(2)
+    with col1:
+        st.markdown("### 2025")
+        click1 = streamlit_image_coordinates(
+            encode_image(img1_show),
+            key=klicks[0][0],
+            width=image_w,
+            image_format="JPEG",
+        )
+    with col2:
+        st.markdown("### 2050")
+        click2 = streamlit_image_coordinates(
+            encode_image(img2_show),
+            key=klicks[1][0],
+            width=image_w,
+            image_format="JPEG",
+        )
+
+    # ► Falls ein Klick erst jetzt ankommt: nur diesen Bereich neu zeichnen
+    neu = False
+    for click, (_, img, key_last, label_side) in zip((click1, click2), klicks):
+        neu |= bool(handle_click(click, img, image_w, key_last, label_side))
+    if neu:
+        full = len(st.session_state.gefunden) > gefunden_vorher
+        st.rerun(scope="app" if full else "fragment")
+
+
+bild_panel(scene, image_w)
 
 # ───────────────────── Lerntexte ─────────────────
 if st.session_state.gefunden:
@@ -225,7 +253,7 @@ if st.session_state.gefunden:
 # ───────────────────── Fortschritt / Zeiten ────────────────
 with st.sidebar:
     st.write("Spielzeit:", round(time.time() - st.session_state.start_time, 2), "s")
-    st.dataframe(st.session_state.found_data, hide_index=True)
+    st.dataframe(st.session_state.found_data.to_columns(), hide_index=True)
 
 # ───────────────────── Sieg-Animation ──────────────────────
 if (
@@ -238,12 +266,13 @@ if (
     try:
         from utils.google_utils import save_compare_results_to_gsheet
 
-        save_compare_results_to_gsheet(
+        st.session_state.save_ticket = save_compare_results_to_gsheet(
             st.session_state.found_data,
             scene,
             spielname=st.session_state.get("spielname"),
             alter=st.session_state.get("alter"),
             all_pts=st.session_state.get("all_pts"),
+            round_id=st.session_state.get("runden_id"),
         )
         st.toast("✅ Ergebnisse gespeichert.")
     except Exception as e:
@@ -258,6 +287,7 @@ if st.button("🔄 Spiel neustarten"):
 # ───────────────────── Debug-Ansicht ───────────────────────
 if st.session_state.debug_mode:
     with st.expander("🛠️ Debug-Ansicht"):
+        img_orig_s, img_klima_s, gdf_diff_s, _ = get_scene_scaled(scene, image_w)
         fig, ax = plot_images_with_differences(
             img_orig_s,
             img_klima_s,
@@ -0,0 +1,116 @@
+"""benchmark_detective_page.py – Serverkosten eines Klicks auf der Detektiv-Seite.
+
+Spielt Klicks über `AppTest` ab (kein Browser) und meldet pro Klick die
+Laufzeit des Skripts sowie die an den Browser gesendeten Bytes
+(ForwardMsgs inkl. Bilddaten). Gemessen wird zweimal:
+
+- `app`:       wie ein Klick ohne Fragment – die ganze Seite läuft,
+- `fragment`:  nur das Bild-Panel (`bild_panel`) läuft erneut.
+
+    python -m tests.benchmark_detective_page --clicks 10
+    python -m tests.benchmark_detective_page --page alt.py --json
+"""
+
+from __future__ import annotations
+
+import argparse
+import functools
+import json
+import statistics
+import time
+from pathlib import Path
+from unittest import mock
+
+from streamlit.runtime.forward_msg_queue import ForwardMsgQueue
+from streamlit.runtime.scriptrunner_utils.script_requests import RerunData
+from streamlit.testing.v1 import AppTest
+import streamlit.testing.v1.local_script_runner as local_script_runner
+
+ROOT = Path(__file__).parent.parent
+PAGE = ROOT / "pages" / "LandschaftsdetektivIn.py"
+
+
+class _SentBytes:
+    """Zählt die Grösse aller ForwardMsgs, die in die Queue gelangen."""
+
+    def __init__(self):
+        self.total = 0
+        enqueue = ForwardMsgQueue.enqueue
+
+        def counting_enqueue(queue: ForwardMsgQueue, msg) -> None:
+            self.total += msg.ByteSize()
+            enqueue(queue, msg)
+
+        self.enqueue = counting_enqueue
+
+
+def _start(page: Path) -> AppTest:
+    at = AppTest.from_file(str(page), default_timeout=60)
+    at.run()
+    at.session_state["spiel_started"] = True
+    at.session_state["start_time"] = time.time()
+    at.run()
+    return at
+
+
+def measure(page: Path, clicks: int, width: int, scope: str) -> dict:
+    """Median über `clicks` Klicks (alle Fehlklicks, je an neuer Stelle)."""
+    at = _start(page)
+    rerun_data = RerunData
+    if scope == "fragment":
+        fragments = list(at._fragment_storage._fragments)
+        if not fragments:
+            raise SystemExit(f"{page.name}: kein Fragment registriert")
+        rerun_data = functools.partial(RerunData, fragment_id_queue=fragments[:1])
+
+    sent = _SentBytes()
+    samples, sizes = [], []
+    with (
+        mock.patch.object(ForwardMsgQueue, "enqueue", sent.enqueue),
+        mock.patch.object(local_script_runner, "RerunData", rerun_data),
+    ):
+        for i in range(clicks):
+            at.session_state[f"orig_{width}"] = {"x": 5 + 3 * i, "y": 5}
+            sent.total = 0
+            t0 = time.perf_counter()
+            at.run()
+            samples.append(time.perf_counter() - t0)
+            sizes.append(sent.total)
+            if at.exception:
+                raise SystemExit(at.exception[0].message)
+    return {
+        "page": page.name,
+        "scope": scope,
+        "clicks": clicks,
+        "recorded": len(at.session_state["all_pts"]),
+        "ms_per_click": statistics.median(samples) * 1000,
+        "kb_per_click": statistics.median(sizes) / 1024,
+    }
+
+
+def main(argv: list[str] | None = None) -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--page", type=Path, default=PAGE)
+    parser.add_argument("--clicks", type=int, default=10)
+    parser.add_argument("--width", type=int, default=600, help="Bildbreite (px)")
+    parser.add_argument(
+        "--scope", choices=("app", "fragment", "beide"), default="beide"
+    )
+    parser.add_argument("--json", action="store_true")
+    args = parser.parse_args(argv)
+
+    scopes = ("app", "fragment") if args.scope == "beide" else (args.scope,)
+    results = [measure(args.page.resolve(), args.clicks, args.width, s) for s in scopes]
+    if args.json:
+        print(json.dumps(results, indent=2))
+        return
+    print(f"{'Seite':<32}{'Scope':>10}{'Klicks':>8}{'ms/Klick':>10}{'KB/Klick':>10}")
+    for r in results:
+        print(
+            f"{r['page']:<32}{r['scope']:>10}{r['recorded']:>8}"
+            f"{r['ms_per_click']:>10.0f}{r['kb_per_click']:>10.1f}"
+        )
+
+
+if __name__ == "__main__":
+    main()
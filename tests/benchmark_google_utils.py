@@ -0,0 +1,249 @@
+"""benchmark_google_utils.py – Durchsatz & Latenz der google_utils-Funktionen.
+
+Läuft gegen den lokalen `FakeSheetsService` (kein Netzwerk, keine Credentials)
+und meldet pro Funktion: Anfragen pro Aufruf, übertragene Bytes pro Aufruf
+sowie p50/p95-Latenz. Beispiel:
+
+    python -m tests.benchmark_google_utils --rows 50000 --latency-ms 80
+    python -m tests.benchmark_google_utils --scheduler-quota 100000
+    python -m tests.benchmark_google_utils --quota 60 --failure-rate 0.05 --json
+"""
+
+from __future__ import annotations
+
+import argparse
+import json
+import statistics
+import tempfile
+import time
+from datetime import datetime, timedelta
+from pathlib import Path
+from unittest import mock
+
+import pandas as pd
+
+from tests.fake_sheets import FakeSheetsService
+from utils import google_utils, quota_utils
+from utils.storage_utils import get_storage_backend
+
+
+def _percentile(samples: list[float], q: float) -> float:
+    if len(samples) == 1:
+        return samples[0]
+    return statistics.quantiles(samples, n=100, method="inclusive")[q - 1]
+
+
+def _seed(service: FakeSheetsService, rows: int, labels: int) -> None:
+    """Füllt die drei Spiele mit `rows` plausiblen Zeilen."""
+    start = datetime(2025, 6, 1, 8, 0, 0)
+    stamps = [
+        (start + timedelta(seconds=i)).strftime("%Y-%m-%d %H:%M:%S")
+        for i in range(rows)
+    ]
+    names = [f"Label{j}" for j in range(labels)]
+
+    detektiv = service.spreadsheet("Landschaftsdetektiv")
+    detektiv.seed(
+        "Dorf",
+        [["timestamp", "spielname", "alter", *names, "punkte"]]
+        + [
+            [ts, f"Spiel{i % 97}", 8 + i % 10]
+            + [round(1.5 + (i * j) % 60, 2) for j in range(labels)]
+            + ["(0.1000, 0.2000, True); (0.3000, 0.4000, False)"]
+            for i, ts in enumerate(stamps)
+        ],
+    )
+    feedback = [["timestamp", "bewertung", "gelernt", "kommentar"]] + [
+        [ts, 1 + i % 5, i % 3, "Super!" if i % 4 else ""]
+        for i, ts in enumerate(stamps[: max(rows // 10, 1)])
+    ]
+    detektiv.seed("Feedback", feedback)
+
+    designer = service.spreadsheet("Landschaftsdesigner")
+    designer.seed(
+        "Sliderdaten",
+        [["timestamp", "scene", "s1", "s4", "kosten"]]
+        + [
+            [ts, "Fluss", i % 4, (i // 4) % 4, round(0.25 * (i % 13), 3)]
+            for i, ts in enumerate(stamps)
+        ],
+    )
+    designer.seed("Feedback", feedback)
+    service.spreadsheet("Landschaftsbeschuetzer").seed("Feedback", feedback)
+
+
+def _reset_caches() -> None:
+    for fn in (
+        google_utils.get_result_writer,
+        google_utils.get_gsheet_pool,
+        get_storage_backend,
+        google_utils.lade_worksheet,
+        google_utils.lade_worksheet_namen,
+        google_utils.lade_alle_worksheets,
+    ):
+        fn.clear()
+
+
+class Bench:
+    def __init__(self, service: FakeSheetsService):
+        self.service = service
+        self.results: list[dict] = []
+
+    def measure(self, name: str, fn, repeat: int, before=None) -> None:
+        """Ruft `fn` `repeat`-mal auf; zählt Anfragen/Bytes des Fake-Service."""
+        samples = []
+        self.service.reset_stats()
+        for _ in range(repeat):
+            if before:
+                before()
+            t0 = time.perf_counter()
+            fn()
+            samples.append(time.perf_counter() - t0)
+        stats = self.service.stats
+        self.results.append(
+            {
+                "function": name,
+                "calls": repeat,
+                "requests_per_call": stats["requests"] / repeat,
+                "kb_per_call": (stats["bytes_sent"] + stats["bytes_received"])
+                / 1024
+                / repeat,
+                "rejected_429": stats["rejected"],
+                "p50_ms": _percentile(samples, 50) * 1000,
+                "p95_ms": _percentile(samples, 95) * 1000,
+            }
+        )
+
+    def report(self, as_json: bool) -> None:
+        if as_json:
+            print(json.dumps(self.results, indent=2))
+            return
+        print(
+            f"{'Funktion':<44}{'Aufrufe':>8}{'Anfr./Aufruf':>14}"
+            f"{'KB/Aufruf':>12}{'429':>6}{'p50 ms':>10}{'p95 ms':>10}"
+        )
+        for r in self.results:
+            print(
+                f"{r['function']:<44}{r['calls']:>8}{r['requests_per_call']:>14.2f}"
+                f"{r['kb_per_call']:>12.1f}{r['rejected_429']:>6}"
+                f"{r['p50_ms']:>10.1f}{r['p95_ms']:>10.1f}"
+            )
+
+
+def run(args: argparse.Namespace) -> Bench:
+    service = FakeSheetsService(
+        latency=args.latency_ms / 1000,
+        jitter=args.jitter_ms / 1000,
+        reads_per_minute=args.quota,
+        writes_per_minute=args.quota,
+        failure_rate=args.failure_rate,
+        decimal_separator=args.decimal,
+        seed=1,
+    )
+    _seed(service, args.rows, args.labels)
+    bench = Bench(service)
+    outbox = Path(tempfile.mkdtemp()) / "outbox.sqlite"
+
+    # Eigenes Kontingent des Schedulers (Standard: wie bei Google, 60/Minute)
+    budget = args.scheduler_quota or quota_utils.READS_PER_MINUTE
+    with (
+        service.installed(),
+        mock.patch("utils.outbox_utils.OUTBOX_PATH", outbox),
+        mock.patch("utils.quota_utils.READS_PER_MINUTE", budget),
+        mock.patch("utils.quota_utils.WRITES_PER_MINUTE", budget),
+    ):
+        _reset_caches()
+        runde = pd.DataFrame(
+            {
+                "label": [f"Label{j}" for j in range(args.labels)],
+                "sekunden_seit_start": [1.5 * j for j in range(args.labels)],
+            }
+        )
+        pts = [{"rel_x": 0.1, "rel_y": 0.2, "hit": True}] * 10
+        writer = google_utils.get_result_writer()
+
+        def save_compare():
+            ticket = google_utils.save_compare_results_to_gsheet(
+                runde, "Dorf", spielname="Bench", alter=11, all_pts=pts
+            )
+            writer.flush()
+            ticket.wait(30)
+
+        def save_slider():
+            ticket = google_utils.save_slider_results_to_gsheet("Fluss", [2, 1], 0.5)
+            writer.flush()
+            ticket.wait(30)
+
+        def save_feedback():
+            feedback = pd.DataFrame(
+                {
+                    "timestamp": ["2025-06-01 10:00:00"],
+                    "bewertung": [4],
+                    "gelernt": [1],
+                    "kommentar": ["Bench"],
+                }
+            )
+            google_utils.save_feedback_to_gsheet(feedback)
+            writer.flush()
+
+        bench.measure("save_compare_results_to_gsheet", save_compare, args.saves)
+        bench.measure("save_slider_results_to_gsheet", save_slider, args.saves)
+        bench.measure("save_feedback_to_gsheet", save_feedback, args.saves)
+
+        # Lesen: jeweils ohne st.cache_data, damit der Datenpfad gemessen wird
+        bench.measure(
+            "lade_worksheet_namen",
+            lambda: google_utils.lade_worksheet_namen("Landschaftsdetektiv"),
+            args.reads,
+            before=google_utils.lade_worksheet_namen.clear,
+        )
+        bench.measure(
+            "lade_worksheet (kalt, voller Download)",
+            lambda: google_utils.lade_worksheet("Landschaftsdesigner", "Sliderdaten"),
+            1,
+            before=get_storage_backend.clear,
+        )
+        bench.measure(
+            "lade_worksheet (warm, inkrementell)",
+            lambda: google_utils.lade_worksheet("Landschaftsdesigner", "Sliderdaten"),
+            args.reads,
+            before=google_utils.lade_worksheet.clear,
+        )
+        bench.measure(
+            "lade_alle_worksheets",
+            lambda: google_utils.lade_alle_worksheets(
+                ("Landschaftsdetektiv", "Landschaftsdesigner", "Landschaftsbeschuetzer")
+            ),
+            args.reads,
+            before=google_utils.lade_alle_worksheets.clear,
+        )
+        writer.close()
+        _reset_caches()
+    return bench
+
+
+def main(argv: list[str] | None = None) -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--rows", type=int, default=50_000)
+    parser.add_argument("--labels", type=int, default=8)
+    parser.add_argument("--saves", type=int, default=20)
+    parser.add_argument("--reads", type=int, default=5)
+    parser.add_argument("--latency-ms", type=float, default=0.0)
+    parser.add_argument("--jitter-ms", type=float, default=0.0)
+    parser.add_argument("--quota", type=int, default=None, help="Anfragen/Minute")
+    parser.add_argument(
+        "--scheduler-quota",
+        type=float,
+        default=None,
+        help="Anfragen/Minute des SheetsScheduler (hoch setzen, um ohne "
+        "Kontingent-Wartezeit zu messen)",
+    )
+    parser.add_argument("--failure-rate", type=float, default=0.0)
+    parser.add_argument("--decimal", default=".", help="Dezimaltrenner der Zellen")
+    parser.add_argument("--json", action="store_true")
+    args = parser.parse_args(argv)
+    run(args).report(args.json)
+
+
+if __name__ == "__main__":
+    main()
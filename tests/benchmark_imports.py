@@ -0,0 +1,105 @@
+"""benchmark_imports.py – Kalte Importzeit pro Seite (`python -X importtime`).
+
+Jede Seite wird in einem frischen Interpreter gemessen: zuerst `streamlit`
+(gemeinsame Grundlast aller Seiten, nicht mitgezählt), danach alle Module, die
+die Seite auf oberster Ebene importiert. Gezählt wird die kumulierte Zeit
+dieser Importe; pro Seite gilt das Minimum aus mehreren Läufen.
+
+    python -m tests.benchmark_imports
+    python -m tests.benchmark_imports --repeat 5 --json
+"""
+
+from __future__ import annotations
+
+import argparse
+import ast
+import json
+import subprocess
+import sys
+from pathlib import Path
+
+ROOT = Path(__file__).parent.parent
+PAGES = [ROOT / "Start.py", *sorted((ROOT / "pages").glob("[!_]*.py"))]
+
+# Budget pro Seite in ms (ohne streamlit); schwere Pakete gehören in Funktionen
+BUDGET_MS = {
+    "Start": 150,
+    "Auswertung": 1200,
+    "LandschaftsbeschuetzerIn": 100,
+    "LandschaftsdesignerIn": 300,
+    "LandschaftsdetektivIn": 900,
+}
+
+
+def page_imports(page: Path) -> list[str]:
+    """Module, die eine Seite beim Laden (oberste Ebene) importiert."""
+    modules = []
+    for node in ast.parse(page.read_text(encoding="utf-8")).body:
+        if isinstance(node, ast.Import):
+            modules += [alias.name for alias in node.names]
+        elif isinstance(node, ast.ImportFrom) and node.module != "__future__":
+            modules.append(node.module)
+    return list(dict.fromkeys(modules))
+
+
+def _parse_importtime(stderr: str) -> float:
+    """Summe der kumulierten µs aller Importe nach `streamlit` (oberste Ebene)."""
+    total, after_streamlit = 0, False
+    for line in stderr.splitlines():
+        if not line.startswith("import time:") or "|" not in line:
+            continue
+        _, cumulative, name = line.split("|")
+        if name.startswith("  ") or not cumulative.strip().isdigit():
+            continue  # verschachtelter Import bzw. Kopfzeile
+        if after_streamlit:
+            total += int(cumulative)
+        elif name.strip() == "streamlit":
+            after_streamlit = True
+    return total / 1000
+
+
+def measure(page: Path, repeat: int = 3) -> float:
+    """Kalte Importzeit der Seite in ms (Minimum über `repeat` Läufe)."""
+    code = "\n".join(f"import {m}" for m in ["streamlit", *page_imports(page)])
+    samples = []
+    for _ in range(repeat):
+        result = subprocess.run(
+            [sys.executable, "-X", "importtime", "-c", code],
+            cwd=ROOT,
+            capture_output=True,
+            text=True,
+            check=True,
+        )
+        samples.append(_parse_importtime(result.stderr))
+    return min(samples)
+
+
+def main(argv: list[str] | None = None) -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--repeat", type=int, default=3)
+    parser.add_argument("--json", action="store_true")
+    args = parser.parse_args(argv)
+
+    results = [
+        {
+            "page": page.stem,
+            "import_ms": measure(page, args.repeat),
+            "budget_ms": BUDGET_MS.get(page.stem),
+        }
+        for page in PAGES
+    ]
+    if args.json:
+        print(json.dumps(results, indent=2))
+        return
+    print(f"{'Seite':<28}{'Import ms':>11}{'Budget ms':>11}")
+    for r in results:
+        flag = (
+            "" if r["budget_ms"] is None or r["import_ms"] <= r["budget_ms"] else "  ✗"
+        )
+        print(
+            f"{r['page']:<28}{r['import_ms']:>11.0f}{r['budget_ms'] or '-':>11}{flag}"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,171 @@
+"""benchmark_synthetic.py – Lade- und Lookup-Zeiten bei vielen Szenen.
+
+Erzeugt (falls nötig) synthetische Inhalte mit `utils.synthetic_utils` und
+misst darauf die Funktionen, die pro Rerun bzw. pro Szene laufen. Die
+Detektiv-Funktionen lesen dabei aus dem synthetischen Ordner (Basis-, Pyramiden-
+und Bundle-Pfade werden umgebogen, `data/` bleibt unberührt). Beispiel:
+
+    python -m tests.benchmark_synthetic --slider-scenes 200 --detective-scenes 50
+    python -m tests.benchmark_synthetic --data /tmp/synth --json
+"""
+
+from __future__ import annotations
+
+import argparse
+import json
+import statistics
+import time
+from pathlib import Path
+from unittest import mock
+
+from utils import detective_utils, slider_utils, synthetic_utils
+from utils.image_utils import ImageStore
+
+
+def _timed(fn) -> float:
+    t0 = time.perf_counter()
+    fn()
+    return time.perf_counter() - t0
+
+
+def _row(name: str, samples: list[float], n: int) -> dict:
+    return {
+        "function": name,
+        "calls": len(samples),
+        "items": n,
+        "p50_ms": statistics.median(samples) * 1000,
+        "max_ms": max(samples) * 1000,
+    }
+
+
+def ensure_data(args: argparse.Namespace) -> Path:
+    """Erzeugt die Inhalte nur, wenn der Ordner noch leer ist."""
+    data = args.data
+    if not any((data / "slider").glob("*_*_*_*.*")):
+        tasks = synthetic_utils.plan(
+            data,
+            args.slider_scenes,
+            args.s1,
+            args.detective_scenes,
+            args.diffs,
+            args.size or synthetic_utils.SLIDER_SIZE,
+            args.size or synthetic_utils.DETECTIVE_SIZE,
+            "gemischt",
+            seed=0,
+        )
+        synthetic_utils.generate(tasks, args.workers)
+    return data
+
+
+def bench_slider(slider_dir: Path, repeat: int) -> list[dict]:
+    image_dir = str(slider_dir)
+    n_files = sum(1 for _ in slider_dir.iterdir())
+    results = []
+
+    cold = []
+    for _ in range(repeat):
+        slider_utils._indexes.clear()
+        cold.append(_timed(lambda: slider_utils.scan_slider_ranges(image_dir)))
+    results.append(_row("scan_slider_ranges (kalt, Index bauen)", cold, n_files))
+
+    warm = [
+        _timed(lambda: slider_utils.scan_slider_ranges(image_dir))
+        for _ in range(repeat)
+    ]
+    results.append(_row("scan_slider_ranges (warm)", warm, n_files))
+
+    keys = list(slider_utils.get_slider_index(image_dir).images)
+    lookups = [
+        _timed(lambda k=k: slider_utils.get_image_path(*k, image_dir=image_dir))
+        for k in keys
+    ]
+    results.append(_row("get_image_path", lookups, n_files))
+    return results
+
+
+def bench_detective(data: Path, repeat: int, width: int) -> list[dict]:
+    detective_dir = data / "detective"
+    store = ImageStore(raw_path=data / ".cache" / "raw")
+    patches = (
+        mock.patch("utils.utils.get_base_path", lambda game: data / game),
+        mock.patch("utils.detective_utils.get_base_path", lambda game: data / game),
+        mock.patch("utils.bundle_utils.get_base_path", lambda game: data / game),
+        mock.patch("utils.pyramid_utils.get_base_path", lambda game: data / game),
+        mock.patch("utils.bundle_utils.BUNDLE_PATH", data / ".cache" / "scenes"),
+        mock.patch("utils.pyramid_utils.PYRAMID_PATH", data / ".cache" / "pyramid"),
+        mock.patch("utils.detective_utils.get_image_store", lambda: store),
+    )
+    scenes = sorted(p.stem for p in detective_dir.glob("*.xml"))
+    results = []
+    for p in patches:
+        p.start()
+    try:
+        caches = (
+            detective_utils.get_pyramid,
+            detective_utils.get_scene_bundle,
+            detective_utils.parse_cvat_xml,
+        )
+        for fn in caches:
+            fn.clear()
+
+        parse = []
+        for scene in scenes:
+            detective_utils.parse_cvat_xml.clear()
+            parse.append(_timed(lambda: detective_utils.parse_cvat_xml(scene)))
+        results.append(_row("parse_cvat_xml", parse, len(scenes)))
+
+        first = [
+            _timed(lambda s=s: detective_utils.get_scene_scaled(s, width))
+            for s in scenes
+        ]
+        results.append(
+            _row("get_scene_scaled (erster Aufruf, baut Stufen)", first, len(scenes))
+        )
+        warm = [
+            _timed(lambda s=s: detective_utils.get_scene_scaled(s, width))
+            for s in scenes
+            for _ in range(repeat)
+        ]
+        results.append(_row("get_scene_scaled (warm)", warm, len(scenes)))
+        for fn in caches:
+            fn.clear()
+    finally:
+        for p in patches:
+            p.stop()
+    return results
+
+
+def report(results: list[dict], as_json: bool) -> None:
+    if as_json:
+        print(json.dumps(results, indent=2))
+        return
+    print(f"{'Funktion':<48}{'Aufrufe':>8}{'Dateien':>9}{'p50 ms':>10}{'max ms':>10}")
+    for r in results:
+        print(
+            f"{r['function']:<48}{r['calls']:>8}{r['items']:>9}"
+            f"{r['p50_ms']:>10.3f}{r['max_ms']:>10.3f}"
+        )
+
+
+def main(argv: list[str] | None = None) -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--data", type=Path, default=synthetic_utils.SYNTHETIC_PATH)
+    parser.add_argument("--slider-scenes", type=int, default=50)
+    parser.add_argument("--s1", type=int, default=3)
+    parser.add_argument("--detective-scenes", type=int, default=20)
+    parser.add_argument("--diffs", type=int, default=5)
+    parser.add_argument("--size", type=synthetic_utils._size, default=None)
+    parser.add_argument("--workers", type=int, default=None)
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument("--width", type=int, default=600, help="Bildbreite (px)")
+    parser.add_argument("--json", action="store_true")
+    args = parser.parse_args(argv)
+
+    data = ensure_data(args)
+    results = bench_slider(data / "slider", args.repeat)
+    results += bench_detective(data, args.repeat, args.width)
+    report(results, args.json)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,320 @@
+"""fake_sheets.py – Lokaler Ersatz für die Google-Sheets-API (Tests & Benchmarks).
+
+Bildet die Teilmenge von gspread nach, die `utils.google_utils` benutzt
+(Client, Spreadsheet, Worksheet), und hält die Daten im Speicher. Jeder
+Methodenaufruf zählt als eine API-Anfrage und kann verzögert oder abgewiesen
+werden:
+
+- ``latency`` (+ ``jitter``): Sekunden pro Anfrage,
+- ``reads_per_minute`` / ``writes_per_minute``: Kontingent → APIError 429,
+- ``failure_rate``: Anteil zufälliger 503-Fehler.
+
+`stats` zählt Anfragen pro Methode und die übertragenen Bytes (JSON-Grösse von
+Anfrage und Antwort, wie sie über die Leitung gingen).
+
+    service = FakeSheetsService(latency=0.05)
+    service.spreadsheet("Landschaftsdetektiv")
+    with service.installed():
+        save_compare_results_to_gsheet(...)
+"""
+
+from __future__ import annotations
+
+import json
+import random
+import threading
+import time
+from collections import Counter, deque
+from contextlib import contextmanager
+from unittest import mock
+
+import gspread
+from gspread.utils import a1_range_to_grid_range, a1_to_rowcol
+
+READ_METHODS = {
+    "open",
+    "open_by_key",
+    "worksheet",
+    "worksheets",
+    "row_values",
+    "col_values",
+    "get_all_values",
+    "batch_get",
+    "values_batch_get",
+}
+
+
+class _Response:
+    """Minimaler requests.Response-Ersatz für gspread.exceptions.APIError."""
+
+    def __init__(self, code: int, message: str):
+        self.status_code = code
+        self.text = message
+        self._body = {"error": {"code": code, "message": message, "status": ""}}
+
+    def json(self) -> dict:
+        return self._body
+
+
+def api_error(code: int, message: str = "") -> gspread.exceptions.APIError:
+    return gspread.exceptions.APIError(_Response(code, message or f"HTTP {code}"))
+
+
+def _size(payload) -> int:
+    return len(json.dumps(payload, default=str)) if payload is not None else 0
+
+
+def _trim(rows: list[list[str]]) -> list[list[str]]:
+    """Wie die API: leere Zellen am Zeilenende und leere Zeilen am Ende fehlen."""
+    out = [list(r) for r in rows]
+    for r in out:
+        while r and r[-1] == "":
+            r.pop()
+    while out and not out[-1]:
+        out.pop()
+    return out
+
+
+class FakeSheetsService:
+    """In-Memory-Sheets mit Latenz, Kontingent und Fehlerinjektion."""
+
+    def __init__(
+        self,
+        latency: float = 0.0,
+        jitter: float = 0.0,
+        reads_per_minute: int | None = None,
+        writes_per_minute: int | None = None,
+        failure_rate: float = 0.0,
+        decimal_separator: str = ".",
+        seed: int | None = None,
+    ):
+        self.latency = latency
+        self.jitter = jitter
+        self.quota = {"read": reads_per_minute, "write": writes_per_minute}
+        self.failure_rate = failure_rate
+        self.decimal_separator = decimal_separator
+        self._random = random.Random(seed)
+        self._lock = threading.Lock()
+        self._window: dict[str, deque] = {"read": deque(), "write": deque()}
+        self._spreadsheets: dict[str, FakeSpreadsheet] = {}
+        self._next_id = 0
+        self.stats = Counter()
+
+    # ► Daten
+    def spreadsheet(self, name: str) -> FakeSpreadsheet:
+        """Liefert (und erzeugt bei Bedarf) ein Spreadsheet – ohne API-Anfrage."""
+        with self._lock:
+            if name not in self._spreadsheets:
+                self._spreadsheets[name] = FakeSpreadsheet(self, name, self._new_id())
+            return self._spreadsheets[name]
+
+    def _new_id(self) -> int:
+        self._next_id += 1
+        return self._next_id
+
+    def cell(self, value) -> str:
+        """Wert so, wie ihn die API formatiert zurückgibt (immer String)."""
+        if value is None:
+            return ""
+        if isinstance(value, float):
+            return repr(value).replace(".", self.decimal_separator)
+        return str(value)
+
+    # ► Anfragen
+    def request(self, method: str, sent=None, received=None) -> None:
+        """Zählt eine Anfrage, wartet die Latenz ab und injiziert Fehler."""
+        kind = "read" if method in READ_METHODS else "write"
+        delay = self.latency + self._random.uniform(0, self.jitter)
+        if delay:
+            time.sleep(delay)
+        with self._lock:
+            self.stats["requests"] += 1
+            self.stats[f"requests.{method}"] += 1
+            self.stats["bytes_sent"] += _size(sent)
+            limit = self.quota[kind]
+            if limit is not None:
+                window = self._window[kind]
+                now = time.monotonic()
+                while window and window[0] <= now - 60:
+                    window.popleft()
+                if len(window) >= limit:
+                    self.stats["rejected"] += 1
+                    raise api_error(429, "Quota exceeded")
+                window.append(now)
+            if self.failure_rate and self._random.random() < self.failure_rate:
+                self.stats["failed"] += 1
+                raise api_error(503, "The service is currently unavailable.")
+            self.stats["bytes_received"] += _size(received)
+
+    def reset_stats(self) -> None:
+        with self._lock:
+            self.stats.clear()
+
+    # ► Einbau
+    def client(self) -> FakeClient:
+        return FakeClient(self)
+
+    @contextmanager
+    def installed(self):
+        """Ersetzt gspread.authorize und die Credentials in utils.google_utils."""
+        with (
+            mock.patch("utils.google_utils._load_credentials", return_value=object()),
+            mock.patch(
+                "utils.google_utils.gspread.authorize", return_value=self.client()
+            ),
+        ):
+            yield self
+
+
+class FakeClient:
+    def __init__(self, service: FakeSheetsService):
+        self._service = service
+
+    def open(self, title: str) -> FakeSpreadsheet:
+        sh = self._service._spreadsheets.get(title)
+        if sh is None:
+            self._service.request("open", sent=title)
+            raise gspread.exceptions.SpreadsheetNotFound(title)
+        self._service.request("open", sent=title, received=sh.metadata())
+        return sh
+
+    def open_by_key(self, key: str) -> FakeSpreadsheet:
+        for sh in self._service._spreadsheets.values():
+            if sh.id == key:
+                self._service.request("open_by_key", sent=key, received=sh.metadata())
+                return sh
+        self._service.request("open_by_key", sent=key)
+        raise gspread.exceptions.SpreadsheetNotFound(key)
+
+
+class FakeSpreadsheet:
+    def __init__(self, service: FakeSheetsService, title: str, sid: int):
+        self._service = service
+        self.title = title
+        self.id = f"fake-{sid}"
+        self._worksheets: list[FakeWorksheet] = []
+
+    def metadata(self) -> dict:
+        return {
+            "spreadsheetId": self.id,
+            "sheets": [
+                {"title": ws.title, "sheetId": ws.id} for ws in self._worksheets
+            ],
+        }
+
+    def seed(self, title: str, rows: list[list], cols: int | None = None):
+        """Legt ein Worksheet mit Daten an – ohne API-Anfrage."""
+        width = max([cols or 0] + [len(r) for r in rows])
+        ws = FakeWorksheet(self, title, self._service._new_id(), max(width, 1))
+        ws._rows = [[self._service.cell(v) for v in r] for r in rows]
+        self._worksheets.append(ws)
+        return ws
+
+    def worksheets(self) -> list[FakeWorksheet]:
+        self._service.request("worksheets", received=self.metadata())
+        return list(self._worksheets)
+
+    def worksheet(self, title: str) -> FakeWorksheet:
+        self._service.request("worksheet", sent=title, received=self.metadata())
+        for ws in self._worksheets:
+            if ws.title == title:
+                return ws
+        raise gspread.exceptions.WorksheetNotFound(title)
+
+    def add_worksheet(self, title: str, rows=1000, cols=26, **kwargs) -> FakeWorksheet:
+        self._service.request("add_worksheet", sent=title)
+        ws = FakeWorksheet(self, title, self._service._new_id(), int(cols))
+        self._worksheets.append(ws)
+        return ws
+
+    def values_batch_get(self, ranges: list[str], params=None) -> dict:
+        value_ranges = []
+        for rng in ranges:
+            title, _, cells = rng.partition("!")
+            ws = next(w for w in self._worksheets if w.title == title.strip("'"))
+            values = ws._read(cells or None)
+            entry = {"range": rng, "majorDimension": "ROWS"}
+            if values:
+                entry["values"] = values
+            value_ranges.append(entry)
+        response = {"spreadsheetId": self.id, "valueRanges": value_ranges}
+        self._service.request("values_batch_get", sent=ranges, received=response)
+        return response
+
+
+class FakeWorksheet:
+    def __init__(self, spreadsheet: FakeSpreadsheet, title: str, wid: int, cols: int):
+        self._sh = spreadsheet
+        self._service = spreadsheet._service
+        self._rows: list[list[str]] = []
+        self.title = title
+        self.id = wid
+        self.spreadsheet_id = spreadsheet.id
+        self.col_count = cols
+
+    @property
+    def row_count(self) -> int:
+        return max(len(self._rows), 1000)
+
+    def _read(self, a1: str | None) -> list[list[str]]:
+        rows = self._rows
+        if a1:
+            grid = a1_range_to_grid_range(a1)
+            rows = [
+                r[grid.get("startColumnIndex", 0) : grid.get("endColumnIndex")]
+                for r in rows[grid.get("startRowIndex", 0) : grid.get("endRowIndex")]
+            ]
+        return _trim(rows)
+
+    # ► Lesen
+    def row_values(self, row: int) -> list[str]:
+        values = _trim(self._rows[row - 1 : row])
+        result = values[0] if values else []
+        self._service.request("row_values", received=result)
+        return result
+
+    def col_values(self, col: int) -> list[str]:
+        result = [r[col - 1] if len(r) >= col else "" for r in _trim(self._rows)]
+        while result and result[-1] == "":
+            result.pop()
+        self._service.request("col_values", received=result)
+        return result
+
+    def get_all_values(self) -> list[list[str]]:
+        values = _trim(self._rows)
+        self._service.request("get_all_values", received=values)
+        width = max((len(r) for r in values), default=0)
+        return [r + [""] * (width - len(r)) for r in values]
+
+    def batch_get(self, ranges: list[str], **kwargs) -> list[list[list[str]]]:
+        result = [self._read(r) for r in ranges]
+        self._service.request("batch_get", sent=ranges, received=result)
+        return result
+
+    # ► Schreiben
+    def append_rows(self, values: list[list], **kwargs) -> dict:
+        cells = [[self._service.cell(v) for v in r] for r in values]
+        self._service.request("append_rows", sent=values)
+        # Wie die API: hinter die letzte nicht-leere Zeile
+        self._rows = _trim(self._rows) + cells
+        self.col_count = max([self.col_count] + [len(r) for r in cells])
+        return {"updates": {"updatedRows": len(cells)}}
+
+    def append_row(self, values: list, **kwargs) -> dict:
+        return self.append_rows([values], **kwargs)
+
+    def update(self, values: list[list], range_name: str | None = None, **kwargs):
+        self._service.request("update", sent=values)
+        row, col = a1_to_rowcol(range_name or "A1")
+        for i, r in enumerate(values):
+            target = row - 1 + i
+            while len(self._rows) <= target:
+                self._rows.append([])
+            line = self._rows[target]
+            line += [""] * (col - 1 + len(r) - len(line))
+            line[col - 1 : col - 1 + len(r)] = [self._service.cell(v) for v in r]
+        return {"updatedRows": len(values)}
+
+    def add_cols(self, cols: int) -> None:
+        self._service.request("add_cols", sent=cols)
+        self.col_count += cols
@@ -0,0 +1,41 @@
+import pandas as pd
+from utils import auswertung_utils
+from utils.auswertung_utils import klickpunkte
+
+
+def test_klickpunkte_parses_once_per_dataset(mocker):
+    auswertung_utils._klickpunkte.clear()
+    df = pd.DataFrame(
+        {"punkte": ["(0.1000, 0.2000, True); (0.3000, 0.4000, False)", "", None]},
+        index=[10, 11, 12],
+    ).astype({"punkte": "string[pyarrow]"})
+    spy = mocker.spy(auswertung_utils, "parse_punkte")
+
+    pts = klickpunkte(df)
+    assert list(pts.columns) == ["runde", "rel_x", "rel_y", "hit"]
+    assert pts["runde"].tolist() == [10, 10]
+    assert pts["hit"].tolist() == [True, False]
+
+    # Gleicher Datenstand → aus dem Cache, neuer Datenstand → neu geparst
+    klickpunkte(df)
+    assert spy.call_count == 1
+    df.loc[12, "punkte"] = "(0.5000, 0.6000, True)"
+    assert klickpunkte(df)["runde"].tolist() == [10, 10, 12]
+    assert spy.call_count == 2
+
+
+def test_feedback_metrics_without_ratings(mocker):
+    st_mock = mocker.patch("utils.auswertung_utils.st")
+    cols = (mocker.MagicMock(), mocker.MagicMock())
+    st_mock.columns.return_value = cols
+    df = pd.DataFrame(
+        {
+            "bewertung": pd.array([pd.NA, pd.NA], dtype="Int64"),
+            "gelernt": [True, False],
+        }
+    )
+
+    auswertung_utils.plot_feedback_metrics(df)
+
+    cols[0].metric.assert_called_once_with(label="Ø Bewertung", value="- von 5")
+    cols[1].metric.assert_called_once_with(label="Anteil 'Gelernt'", value="50.0 %")
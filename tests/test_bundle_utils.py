@@ -0,0 +1,69 @@
+import os
+import subprocess
+import sys
+from pathlib import Path
+
+import pytest
+from PIL import Image
+from utils import bundle_utils
+from utils.bundle_utils import compile_scene, ensure_bundle, load_bundle
+
+XML = """<annotations>
+  <image name="Mini_verändert.png" width="200" height="100">
+    <polygon label="Wald" points="20,10;80,10;80,60;20,60"/>
+    <polygon label="Fluss" points="100,50;180,50;140,90"/>
+  </image>
+</annotations>
+"""
+
+
+@pytest.fixture
+def scene_dir(tmp_path, monkeypatch):
+    data = tmp_path / "detective"
+    data.mkdir()
+    for variant in ("unverändert", "verändert"):
+        Image.new("RGB", (200, 100), "green").save(data / f"Mini_{variant}.png")
+    (data / "Mini.xml").write_text(XML, encoding="utf-8")
+    (data / "Mini_lerntexte.md").write_text(
+        "# Wald\nMehr Bäume.\n\n# Fluss\nMehr Wasser.\n", encoding="utf-8"
+    )
+    monkeypatch.setattr(bundle_utils, "get_base_path", lambda game: data)
+    monkeypatch.setattr(bundle_utils, "BUNDLE_PATH", tmp_path / "scenes")
+    return data
+
+
+def test_compile_scene(scene_dir):
+    bundle = compile_scene("Mini")
+    assert bundle["size"] == [200, 100]
+    assert [p["label"] for p in bundle["polygons"]] == ["Wald", "Fluss"]
+    assert bundle["polygons"][0]["points"][0] == [0.1, 0.1]
+    assert bundle["lerntexte"] == {"Wald": "Mehr Bäume.", "Fluss": "Mehr Wasser."}
+    assert load_bundle("Mini") == bundle
+
+
+def test_bundle_is_recompiled_when_sources_change(scene_dir):
+    compile_scene("Mini")
+    md = scene_dir / "Mini_lerntexte.md"
+    md.write_text("# Wald\nNeu.\n", encoding="utf-8")
+    assert load_bundle("Mini") is None
+    assert ensure_bundle("Mini")["lerntexte"] == {"Wald": "Neu."}
+
+    png = scene_dir / "Mini_verändert.png"
+    stat = png.stat()
+    os.utime(png, ns=(stat.st_atime_ns, stat.st_mtime_ns + 10**9))
+    assert load_bundle("Mini") is None
+
+
+def test_detective_page_imports_without_geopandas():
+    code = (
+        "import sys, utils.detective_utils; "
+        "print('geopandas' in sys.modules, 'xml.etree.ElementTree' in sys.modules)"
+    )
+    out = subprocess.run(
+        [sys.executable, "-c", code],
+        cwd=Path(__file__).parent.parent,
+        capture_output=True,
+        text=True,
+        check=True,
+    )
+    assert out.stdout.split() == ["False", "False"]
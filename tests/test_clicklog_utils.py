@@ -0,0 +1,92 @@
+import sys
+
+import numpy as np
+import pandas as pd
+import pytest
+from utils.clicklog_utils import (
+    ClickLog,
+    FoundTimes,
+    format_punkte,
+    iter_points,
+    parse_punkte,
+)
+
+
+def _deep_sizeof_dicts(pts: list[dict]) -> int:
+    """Bisherige Session-Form: Liste von Dicts mit float/float/bool."""
+    return sys.getsizeof(pts) + sum(
+        sys.getsizeof(p) + sum(sys.getsizeof(v) for v in p.values()) for p in pts
+    )
+
+
+def test_click_log_appends_and_iterates():
+    log = ClickLog()
+    assert not log
+    log.append(0.25, 0.5, True, 1.5)
+    log.append(0.75, 0.125, False, 3.0)
+    assert len(log) == 2
+    assert list(log.points()) == [(0.25, 0.5, True), (0.75, 0.125, False)]
+    assert list(log.points(1)) == [(0.75, 0.125, False)]
+    assert list(log.t) == [1.5, 3.0]
+
+
+def test_iter_points_accepts_dicts():
+    pts = [
+        {"rel_x": 0.1, "rel_y": 0.2, "hit": True},
+        {"rel_x": 0.3, "rel_y": 0.4, "hit": False},
+    ]
+    assert list(iter_points(pts, 1)) == [(0.3, 0.4, False)]
+
+
+def test_found_times():
+    found = FoundTimes()
+    found.add("Wald", 12.34)
+    found.add("Fluss", 20.0)
+    assert "Wald" in found and "See" not in found
+    assert len(found) == 2
+    assert found.as_dict() == {"Wald": 12.34, "Fluss": 20.0}
+    frame = pd.DataFrame(found.to_columns())
+    assert list(frame.columns) == ["label", "sekunden_seit_start"]
+
+
+@pytest.mark.parametrize("n", [50, 500])
+def test_click_log_footprint_is_a_fraction_of_dicts(n):
+    log, dicts = ClickLog(), []
+    for i in range(n):
+        log.append(i / n, 1 - i / n, i % 3 == 0, i * 0.5)
+        dicts.append({"rel_x": i / n, "rel_y": 1 - i / n, "hit": i % 3 == 0})
+    assert log.nbytes() < _deep_sizeof_dicts(dicts) / 10
+
+
+def test_parse_punkte_roundtrip():
+    log = ClickLog()
+    log.append(0.25, 0.5, True)
+    log.append(0.75, 0.125, False)
+    values = [format_punkte(log), "", "(0.1000, 0.9000, True)"]
+    assert values[0] == "(0.2500, 0.5000, True); (0.7500, 0.1250, False)"
+
+    cols = parse_punkte(values)
+    assert cols["runde"].tolist() == [0, 0, 2]
+    np.testing.assert_allclose(cols["rel_x"], [0.25, 0.75, 0.1])
+    np.testing.assert_allclose(cols["rel_y"], [0.5, 0.125, 0.9])
+    assert cols["hit"].tolist() == [True, False, True]
+
+
+@pytest.mark.parametrize(
+    "values",
+    [
+        ["(0.1, 0.2, True); __import__('os').getcwd(); (0.3, 0.4, False)"],
+        ["(0.1, 0.2, True); (0.3, 0.4, Vielleicht)", "(0.3, 0.4, False)"],
+        ["(0.1, 0.2, True); (abc, 0.4, False)", "(0.3, 0.4, False)"],
+    ],
+)
+def test_parse_punkte_skips_invalid_points(values):
+    cols = parse_punkte(values)
+    assert cols["rel_x"].tolist() == pytest.approx([0.1, 0.3])
+    assert cols["runde"].tolist() == [0, len(values) - 1]
+
+
+def test_parse_punkte_empty():
+    for values in ([], ["", ""]):
+        cols = parse_punkte(values)
+        assert all(len(col) == 0 for col in cols.values())
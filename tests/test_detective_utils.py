@@ -6,14 +6,23 @@ from utils.detective_utils import (
     convert_display_to_original_coords,
     draw_markers_on_images,
     get_scene_scaled,
+    load_pyramid_level,
+    render_marked_scene,
+    MarkerLayer,
+    LabelMask,
+    get_label_mask,
+    load_scene_polygons,
 )
 from utils.utils import get_base_path
+from utils.pyramid_utils import PYRAMID_WIDTHS, snap_width
 from pathlib import Path
 from PIL import Image
 import geopandas as gpd
+import pandas as pd
+import numpy as np
+import shapely
 from shapely.geometry import Polygon
 
-
 SCENES = ["Dorf"]
 DISPLAY_WIDTH = [200, 400, 800, 1200, 1600]
 
@@ -51,6 +60,15 @@ def test_parse_cvat_xml(scene_name):
     assert all(isinstance(geom, Polygon) for geom in gdf.geometry)
 
 
+def test_scene_polygons_match_xml(scene_name):
+    polygons = load_scene_polygons(scene_name)
+    gdf = parse_cvat_xml(scene_name)
+    assert list(polygons["label"]) == list(gdf["label"])
+    for geom, ref in zip(polygons.geometry, gdf.geometry):
+        assert isinstance(geom, Polygon)
+        assert geom.equals_exact(ref, 0)
+
+
 def test_load_lerntexte(scene_name):
     lerntexte = load_lerntexte(scene_name)
     assert isinstance(lerntexte, dict)
@@ -87,9 +105,10 @@ def test_get_scene_scaled(scene_name, display_width):
     img_orig_s, img_klima_s, gdf_s, scale = get_scene_scaled(scene_name, display_width)
     assert isinstance(img_orig_s, Image.Image)
     assert isinstance(img_klima_s, Image.Image)
-    assert isinstance(gdf_s, gpd.GeoDataFrame)
+    assert isinstance(gdf_s, pd.DataFrame)
     assert isinstance(scale, float)
-    assert img_orig_s.width == display_width
+    assert img_orig_s.width == snap_width(display_width)
+    assert img_orig_s.width >= min(display_width, max(PYRAMID_WIDTHS))
     assert img_orig_s.size == img_klima_s.size
     assert not gdf_s.empty
     for geom in gdf_s.geometry:
@@ -107,3 +126,71 @@ def test_draw_markers_on_images(scene_name):
     img1_marked, img2_marked = draw_markers_on_images(img1, img2, pts, gdf, gefunden)
     assert img1_marked is not None
     assert img2_marked is not None
+
+
+def test_marker_layer_draws_only_new_clicks():
+    pts = [{"rel_x": 0.1 * i, "rel_y": 0.05 * i, "hit": bool(i % 2)} for i in range(8)]
+    full = MarkerLayer((300, 200), 10, 2).update(pts)
+
+    layer = MarkerLayer((300, 200), 10, 2)
+    for n in range(1, len(pts) + 1):
+        layer.update(pts[:n])
+    assert layer.count == len(pts)
+    assert np.array_equal(np.asarray(layer.image), np.asarray(full))
+
+    # Weniger Klicks als gezeichnet → neue Runde, Ebene wird geleert
+    layer.update([])
+    assert layer.count == 0
+    assert not np.asarray(layer.image).any()
+
+
+def test_render_marked_scene_matches_full_redraw(scene_name, mocker):
+    mocker.patch("utils.detective_utils.st.session_state", {})
+    width = PYRAMID_WIDTHS[1]
+    img1, img2 = load_pyramid_level(scene_name, width)
+    gdf = parse_cvat_xml(scene_name)
+    pts = [
+        {"rel_x": 0.2, "rel_y": 0.3, "hit": False},
+        {"rel_x": 0.6, "rel_y": 0.5, "hit": True},
+    ]
+    gefunden = list(gdf["label"].iloc[:2])
+
+    for n in range(len(pts) + 1):
+        out1, out2 = render_marked_scene(
+            scene_name, width, pts[:n], gefunden, radius=8, lwd_width=2
+        )
+    ref1, ref2 = draw_markers_on_images(img1, img2, pts, gdf, gefunden, 8, 2)
+    assert np.array_equal(np.asarray(out1), np.asarray(ref1))
+    assert np.array_equal(np.asarray(out2), np.asarray(ref2))
+
+
+def _first_containing(gdf, xs, ys) -> list:
+    """Referenz: Label des ersten Polygons, das den Punkt enthält (sonst None)."""
+    expected = np.full(len(xs), None, dtype=object)
+    for label, geom in zip(gdf["label"][::-1], gdf.geometry[::-1]):
+        expected[shapely.contains_xy(geom, xs, ys)] = label
+    return list(expected)
+
+
+def test_label_mask_matches_polygons(scene_name, tmp_path, monkeypatch):
+    monkeypatch.setattr("utils.detective_utils.MASK_CACHE_PATH", tmp_path)
+    get_label_mask.clear()
+    label_mask = get_label_mask(scene_name)
+    assert len(list(tmp_path.glob(f"{scene_name}-*.npz"))) == 1
+
+    # Auf den Pixelmittelpunkten stimmt das Raster exakt mit den Polygonen überein
+    ys, xs = np.mgrid[0 : label_mask.height : 5, 0 : label_mask.width : 5]
+    rel_x = (xs.ravel() + 0.5) / label_mask.width
+    rel_y = (ys.ravel() + 0.5) / label_mask.height
+    expected = _first_containing(parse_cvat_xml(scene_name), rel_x, rel_y)
+    assert list(label_mask.locate_many(rel_x, rel_y)) == expected
+    assert label_mask.locate(rel_x[0], rel_y[0]) == expected[0]
+    assert label_mask.locate(1.5, 0.5) is None
+    assert list(label_mask.label_ids([-0.1, 0.5], [0.5, 2.0])) == [0, 0]
+
+    # Zweiter Prozess: Raster kommt von der Platte
+    get_label_mask.clear()
+    loaded = get_label_mask(scene_name)
+    assert np.array_equal(loaded.mask, label_mask.mask)
+    assert list(loaded.labels) == list(label_mask.labels)
+    get_label_mask.clear()
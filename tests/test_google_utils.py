@@ -1,16 +1,44 @@
+import sqlite3
+import threading
+
 import pytest
 import pandas as pd
-from unittest.mock import MagicMock
+from unittest.mock import MagicMock, patch
+from tests.fake_sheets import FakeSheetsService, api_error
+from utils.clicklog_utils import ClickLog, FoundTimes
+from utils.storage_utils import get_storage_backend
+from utils.utils import zeige_speicherstatus
+from utils.quota_utils import SheetsScheduler
 from utils.google_utils import (
+    HeaderRegistry,
+    get_gsheet_pool,
+    get_result_writer,
     init_gsheet,
+    ResultWriter,
+    Outbox,
     save_compare_results_to_gsheet,
     save_slider_results_to_gsheet,
     save_feedback_to_gsheet,
     lade_worksheet_namen,
     lade_worksheet,
+    lade_alle_worksheets,
 )
 
 
+@pytest.fixture(autouse=True)
+def fresh_pool(tmp_path, monkeypatch):
+    """Jeder Test startet mit leerem Client-Pool und eigener Outbox."""
+    monkeypatch.setattr("utils.outbox_utils.OUTBOX_PATH", tmp_path / "outbox.sqlite")
+    get_gsheet_pool.clear()
+    get_result_writer.clear()
+    get_storage_backend.clear()
+    yield
+    get_result_writer().close()
+    get_result_writer.clear()
+    get_storage_backend.clear()
+    get_gsheet_pool.clear()
+
+
 @pytest.fixture
 def mock_credentials(mocker):
     """Patch streamlit.secrets with dummy credentials."""
@@ -34,56 +62,424 @@ def test_init_gsheet(mock_credentials, mocker):
     assert sheet == sheet_mock
 
 
+def test_pool_authorizes_once_and_caches_handles(mock_credentials, mocker):
+    sheet_mock = MagicMock(id="sheet-key")
+    client_mock = MagicMock()
+    client_mock.open.return_value = sheet_mock
+    authorize = mocker.patch(
+        "utils.google_utils.gspread.authorize", return_value=client_mock
+    )
+
+    pool = get_gsheet_pool()
+    assert pool.worksheet("TestSheet", "Dorf") is pool.worksheet("TestSheet", "Dorf")
+    assert init_gsheet("TestSheet") is sheet_mock
+
+    authorize.assert_called_once()
+    client_mock.open.assert_called_once_with("TestSheet")
+    sheet_mock.worksheet.assert_called_once_with("Dorf")
+
+    # Nach Invalidierung wird per Key statt per Name neu geöffnet
+    pool.invalidate("TestSheet")
+    pool.spreadsheet("TestSheet")
+    client_mock.open_by_key.assert_called_once_with("sheet-key")
+
+
+def test_pool_lock_is_free_during_api_calls(mock_credentials, mocker):
+    pool = get_gsheet_pool()
+
+    def lock_free(*args, **kwargs):
+        # Aus einem anderen Thread prüfen (RLock ist reentrant)
+        free = []
+
+        def probe():
+            free.append(pool._lock.acquire(blocking=False))
+            if free[0]:
+                pool._lock.release()
+
+        t = threading.Thread(target=probe)
+        t.start()
+        t.join()
+        assert free == [True]
+        return sheet_mock
+
+    sheet_mock = MagicMock(id="sheet-key")
+    sheet_mock.worksheet.side_effect = lock_free
+    client_mock = MagicMock()
+    client_mock.open.side_effect = lock_free
+    mocker.patch("utils.google_utils.gspread.authorize", return_value=client_mock)
+
+    assert pool.worksheet("TestSheet", "Dorf") is sheet_mock
+    assert client_mock.open.call_count == sheet_mock.worksheet.call_count == 1
+
+
 def test_save_compare_results_to_gsheet(mock_credentials, mocker):
     df = pd.DataFrame({"label": ["A", "B"], "sekunden_seit_start": [10, 20]})
     sheet_mock = MagicMock()
     ws_mock = MagicMock()
-    ws_mock.get_all_records.return_value = [
-        {"timestamp": "", "spielname": "", "alter": "", "A": "", "B": "", "punkte": ""}
+    ws_mock.row_values.return_value = [
+        "timestamp",
+        "spielname",
+        "alter",
+        "A",
+        "B",
+        "punkte",
+        "round_id",
     ]
     sheet_mock.worksheet.return_value = ws_mock
     client_mock = MagicMock()
     client_mock.open.return_value = sheet_mock
     mocker.patch("utils.google_utils.gspread.authorize", return_value=client_mock)
 
-    save_compare_results_to_gsheet(
+    ticket = save_compare_results_to_gsheet(
         df,
         scene="Dorf",
         spielname="Testspiel",
         alter=12,
         all_pts=[{"rel_x": 0.1, "rel_y": 0.2, "hit": True}],
     )
+    get_result_writer().flush()
 
-    ws_mock.append_row.assert_called()
+    assert ticket.status == "ok"
+    ws_mock.append_rows.assert_called_once()
+    (rows,), _ = ws_mock.append_rows.call_args
+    assert rows[0][1:] == [
+        "Testspiel",
+        12,
+        10,
+        20,
+        "(0.1000, 0.2000, True)",
+        ticket.round_id,
+    ]
+    ws_mock.get_all_records.assert_not_called()
+    ws_mock.get_all_values.assert_not_called()
 
 
-def test_save_slider_results_to_gsheet(mock_credentials, mocker):
+def test_save_compare_results_from_click_log(mock_credentials, mocker):
+    found = FoundTimes()
+    found.add("B", 20.0)
+    found.add("A", 10.5)
+    log = ClickLog()
+    log.append(0.1, 0.2, True, 10.5)
+    log.append(0.5, 0.25, False, 15.0)
     sheet_mock = MagicMock()
     ws_mock = MagicMock()
-    ws_mock.get_all_values.return_value = [
-        ["timestamp", "scene", "slider1", "slider2", "slider3", "slider4"]
+    ws_mock.row_values.return_value = [
+        "timestamp",
+        "spielname",
+        "alter",
+        "A",
+        "B",
+        "punkte",
+        "round_id",
+    ]
+    sheet_mock.worksheet.return_value = ws_mock
+    client_mock = MagicMock()
+    client_mock.open.return_value = sheet_mock
+    mocker.patch("utils.google_utils.gspread.authorize", return_value=client_mock)
+
+    save_compare_results_to_gsheet(
+        found, scene="Dorf", spielname="Log", alter=10, all_pts=log
+    )
+    get_result_writer().flush()
+
+    (rows,), _ = ws_mock.append_rows.call_args
+    assert rows[0][1:-1] == [
+        "Log",
+        10,
+        10.5,
+        20.0,
+        "(0.1000, 0.2000, True); (0.5000, 0.2500, False)",
     ]
+
+
+def test_detective_header_evolves_in_place(mock_credentials, mocker):
+    sheet_mock = MagicMock()
+    ws_mock = MagicMock(col_count=7)
+    header = ["timestamp", "spielname", "alter", "A", "punkte", "round_id"]
+    # Zeile 1: gecacht, frisch vor der Änderung, zur Kontrolle danach
+    ws_mock.row_values.side_effect = [header, header, header + ["B"]]
     sheet_mock.worksheet.return_value = ws_mock
     client_mock = MagicMock()
     client_mock.open.return_value = sheet_mock
     mocker.patch("utils.google_utils.gspread.authorize", return_value=client_mock)
 
-    save_slider_results_to_gsheet("Dorf", [1, 2, 3, 4])
-    ws_mock.append_row.assert_called()
+    df = pd.DataFrame({"label": ["A", "B"], "sekunden_seit_start": [1, 2]})
+    save_compare_results_to_gsheet(df, scene="Dorf", spielname="x", alter=9)
+    save_compare_results_to_gsheet(df, scene="Dorf", spielname="y", alter=10)
+    get_result_writer().flush()
+
+    # Nur die neue Spalte wird rechts angefügt, keine alten Zeilen neu hochgeladen
+    ws_mock.add_cols.assert_not_called()
+    ws_mock.update.assert_called_once_with([["B"]], range_name="G1")
+    ws_mock.append_rows.assert_called_once()
+    (rows,), _ = ws_mock.append_rows.call_args
+    assert [r[1:5] + r[6:] for r in rows] == [["x", 9, 1, "", 2], ["y", 10, 1, "", 2]]
+
+    # Kopfzeile bleibt gecacht: weitere Runden lesen Zeile 1 nicht erneut
+    calls = ws_mock.row_values.call_count
+    save_compare_results_to_gsheet(df, scene="Dorf", spielname="z", alter=11)
+    get_result_writer().flush()
+    assert ws_mock.row_values.call_count == calls
+
+
+def test_header_extension_survives_concurrent_writer(tmp_path, mocker):
+    service = FakeSheetsService()
+    ws = service.spreadsheet("S").seed("Dorf", [["timestamp", "A"]])
+    registry = HeaderRegistry(SheetsScheduler(6000, 6000))
+    update = ws.update
+
+    def overwritten(values, range_name=None, **kwargs):
+        update(values, range_name=range_name)
+        if range_name == "C1":
+            # Writer auf einem anderen Rechner schreibt in dieselbe Zelle
+            update([["C"]], range_name=range_name)
+
+    mocker.patch.object(ws, "update", side_effect=overwritten)
+    header = registry.ensure(
+        ws, ["timestamp", "B"], lock=Outbox(tmp_path / "o.sqlite").schema_lock()
+    )
+
+    assert header == ["timestamp", "A", "C", "B"]
+    assert ws.row_values(1) == header
+
+
+def test_schema_lock_is_exclusive_across_connections(tmp_path, mocker):
+    mocker.patch("utils.outbox_utils.SCHEMA_LOCK_TIMEOUT", 0.05)
+    first, second = Outbox(tmp_path / "o.sqlite"), Outbox(tmp_path / "o.sqlite")
+    with first.schema_lock():
+        with pytest.raises(sqlite3.OperationalError):
+            with second.schema_lock():
+                pass
+    with second.schema_lock():
+        pass
+
+
+def test_save_slider_results_to_gsheet(mock_credentials, mocker):
+    sheet_mock = MagicMock()
+    ws_mock = MagicMock(col_count=26)
+    columns = ["timestamp", "scene", "s1", "s4", "kosten", "round_id"]
+    ws_mock.row_values.side_effect = [[], [], columns]  # neues Worksheet
+    sheet_mock.worksheet.return_value = ws_mock
+    client_mock = MagicMock()
+    client_mock.open.return_value = sheet_mock
+    mocker.patch("utils.google_utils.gspread.authorize", return_value=client_mock)
+
+    ticket = save_slider_results_to_gsheet("Dorf", [1, 2], 0.5)
+    get_result_writer().flush()
+
+    assert ticket.status == "ok"
+    ws_mock.update.assert_called_once_with([columns], range_name="A1")
+    ws_mock.append_rows.assert_called_once()
+    ws_mock.get_all_values.assert_not_called()
 
 
 def test_save_feedback_to_gsheet(mock_credentials, mocker):
     df = pd.DataFrame({"Feedback": ["Great Game!"]})
     sheet_mock = MagicMock()
     ws_mock = MagicMock()
-    ws_mock.get_all_values.return_value = [["Feedback"]]
+    ws_mock.row_values.return_value = ["Feedback", "round_id"]
+    sheet_mock.worksheet.return_value = ws_mock
+    client_mock = MagicMock()
+    client_mock.open.return_value = sheet_mock
+    mocker.patch("utils.google_utils.gspread.authorize", return_value=client_mock)
+
+    ticket = save_feedback_to_gsheet(df)
+    get_result_writer().flush()
+    ws_mock.append_rows.assert_called_once_with(
+        [["Great Game!", ticket.round_id]], table_range="A1"
+    )
+    ws_mock.get_all_values.assert_not_called()
+    ws_mock.insert_rows.assert_not_called()
+
+
+def test_save_feedback_to_gsheet_ignores_empty_frame(mock_credentials, mocker):
+    submit = mocker.patch.object(ResultWriter, "submit")
+    assert save_feedback_to_gsheet(pd.DataFrame(columns=["bewertung"])) is None
+    submit.assert_not_called()
+
+
+def test_result_writer_coalesces_rows_per_worksheet(mock_credentials, mocker):
+    sheet_mock = MagicMock()
+    ws_mock = MagicMock()
+    ws_mock.row_values.return_value = ["timestamp", "kommentar", "round_id"]
+    sheet_mock.worksheet.return_value = ws_mock
+    client_mock = MagicMock()
+    client_mock.open.return_value = sheet_mock
+    mocker.patch("utils.google_utils.gspread.authorize", return_value=client_mock)
+
+    writer = ResultWriter(interval_ms=60_000, max_rows=1000)
+    tickets = [
+        writer.submit("S", "Feedback", ["timestamp", "kommentar"], [i, "ok"])
+        for i in range(20)
+    ]
+    assert not any(t.done for t in tickets)
+
+    writer.flush()
+    ws_mock.append_rows.assert_called_once()
+    assert len(ws_mock.append_rows.call_args.args[0]) == 20
+    assert all(t.status == "ok" for t in tickets)
+    writer.close()
+
+
+def test_result_writer_keeps_rows_until_sheets_recovers(
+    mock_credentials, mocker, tmp_path
+):
+    sheet_mock = MagicMock()
+    ws_mock = MagicMock()
+    ws_mock.row_values.return_value = ["a", "round_id"]
+    ws_mock.append_rows.side_effect = RuntimeError("quota")
+    sheet_mock.worksheet.return_value = ws_mock
+    client_mock = MagicMock()
+    client_mock.open.return_value = sheet_mock
+    client_mock.open_by_key.return_value = sheet_mock  # nach Invalidierung
+    mocker.patch("utils.google_utils.gspread.authorize", return_value=client_mock)
+
+    outbox = Outbox(tmp_path / "retry.sqlite")
+    writer = ResultWriter(outbox, interval_ms=60_000)
+    ticket = writer.submit("S", "W", ["a"], [1], round_id="runde-1")
+    writer.flush()
+    assert ticket.status == "retrying" and not ticket.done
+    assert "quota" in str(ticket.error)
+    assert outbox.status("runde-1") == "pending"
+
+    # Gleiche Runde nochmals speichern → kein Duplikat
+    writer.submit("S", "W", ["a"], [1], round_id="runde-1")
+    assert outbox._con.execute("SELECT COUNT(*) FROM outbox").fetchone()[0] == 1
+
+    # Sheets wieder erreichbar, Backoff abgelaufen → Replay
+    ws_mock.append_rows.side_effect = None
+    ws_mock.col_values.return_value = ["round_id"]  # noch nicht angekommen
+    outbox._con.execute("UPDATE outbox SET lease_until = 0")
+    writer.flush()
+    assert ticket.status == "ok"
+    assert outbox.status("runde-1") == "delivered"
+    ws_mock.append_rows.assert_called_with([[1, "runde-1"]], table_range="A1")
+    writer.close()
+
+
+def test_speicherstatus_warns_while_delivery_retries(
+    mock_credentials, mocker, tmp_path
+):
+    ws_mock = MagicMock()
+    ws_mock.row_values.return_value = ["a", "round_id"]
+    ws_mock.append_rows.side_effect = RuntimeError("quota")
+    client_mock = MagicMock()
+    client_mock.open.return_value.worksheet.return_value = ws_mock
+    mocker.patch("utils.google_utils.gspread.authorize", return_value=client_mock)
+    st_mock = mocker.patch("utils.utils.st")
+    st_mock.session_state = {}
+
+    writer = ResultWriter(Outbox(tmp_path / "status.sqlite"), interval_ms=60_000)
+    ticket = writer.submit("S", "W", ["a"], [1])
+    st_mock.session_state["save_ticket"] = ticket
+    zeige_speicherstatus("save_ticket")
+    st_mock.warning.assert_not_called()
+
+    writer.flush()
+    zeige_speicherstatus("save_ticket")
+    st_mock.warning.assert_called_once()
+    assert "quota" in st_mock.warning.call_args.args[0]
+    assert st_mock.session_state["save_ticket"] is ticket
+
+    ticket._resolve()
+    zeige_speicherstatus("save_ticket")
+    assert "save_ticket" not in st_mock.session_state
+    writer.close()
+
+
+def test_outbox_replays_after_restart(mock_credentials, mocker, tmp_path):
+    sheet_mock = MagicMock()
+    ws_mock = MagicMock()
+    ws_mock.row_values.return_value = ["a", "round_id"]
     sheet_mock.worksheet.return_value = ws_mock
     client_mock = MagicMock()
     client_mock.open.return_value = sheet_mock
     mocker.patch("utils.google_utils.gspread.authorize", return_value=client_mock)
 
-    save_feedback_to_gsheet(df)
-    ws_mock.insert_rows.assert_called()
+    path = tmp_path / "crash.sqlite"
+    Outbox(path).put("runde-7", "S", "W", ["a"], [7])  # Prozess „stirbt“
+
+    writer = ResultWriter(Outbox(path), interval_ms=60_000)
+    writer.flush()
+    ws_mock.append_rows.assert_called_once_with([[7, "runde-7"]], table_range="A1")
+    assert writer.outbox.next_due() is None
+    writer.close()
+
+
+def test_redelivery_skips_rounds_already_in_sheet(tmp_path, mocker):
+    service = FakeSheetsService()
+    ws = service.spreadsheet("S").seed("W", [["a", "round_id"]])
+    mocker.patch("utils.quota_utils.time.sleep")
+    mocker.patch("utils.quota_utils.READS_PER_MINUTE", 6000)
+    mocker.patch("utils.quota_utils.WRITES_PER_MINUTE", 6000)
+    outbox = Outbox(tmp_path / "dedup.sqlite")
+
+    # Writer A reserviert und sendet, stirbt aber vor mark_delivered
+    outbox.put("runde-1", "S", "W", ["a"], [1])
+    outbox.claim(10)
+    ws.append_rows([[1, "runde-1"]])
+    outbox._con.execute("UPDATE outbox SET lease_until = 0")  # Lease abgelaufen
+
+    # Writer B: 503 nach dem Anhängen → kein blinder Retry, später Abgleich
+    append_rows = ws.append_rows
+
+    def applied_then_503(*args, **kwargs):
+        append_rows(*args, **kwargs)
+        raise api_error(503)
+
+    outbox.put("runde-2", "S", "W", ["a"], [2])
+    with service.installed():
+        writer = ResultWriter(outbox, interval_ms=60_000)
+        with patch.object(ws, "append_rows", side_effect=applied_then_503):
+            writer.flush()
+        assert outbox.status("runde-1") == "delivered"
+        assert outbox.status("runde-2") == "pending"
+
+        outbox._con.execute("UPDATE outbox SET lease_until = 0")
+        writer.flush()
+        writer.close()
+
+    assert outbox.status("runde-2") == "delivered"
+    assert ws.get_all_values() == [
+        ["a", "round_id"],
+        ["1", "runde-1"],
+        ["2", "runde-2"],
+    ]
+
+
+def test_outbox_migrates_old_schema(tmp_path):
+    path = tmp_path / "alt.sqlite"
+    con = sqlite3.connect(path)
+    con.executescript(
+        "CREATE TABLE outbox (id INTEGER PRIMARY KEY AUTOINCREMENT,"
+        " round_id TEXT NOT NULL UNIQUE, sheet_name TEXT NOT NULL,"
+        " worksheet TEXT NOT NULL, cols INTEGER NOT NULL, columns TEXT NOT NULL,"
+        " payload TEXT NOT NULL, header_kind TEXT NOT NULL, created REAL NOT NULL,"
+        " lease_until REAL NOT NULL DEFAULT 0, attempts INTEGER NOT NULL DEFAULT 0,"
+        " last_error TEXT, delivered REAL);"
+        "INSERT INTO outbox (round_id, sheet_name, worksheet, cols, columns,"
+        " payload, header_kind, created)"
+        " VALUES ('alt', 'S', 'W', 10, '[\"a\"]', '[1]', 'fixed', 0);"
+    )
+    con.close()
+
+    outbox = Outbox(path)
+    assert outbox.put("neu", "S", "W", ["a"], [2])
+    assert [r.values for r in outbox.claim(10)] == [[1], [2]]
+
+
+def test_outbox_next_due_bundles_new_rows_and_respects_backoff(tmp_path):
+    outbox = Outbox(tmp_path / "due.sqlite")
+    assert outbox.next_due(5.0) is None
+
+    outbox.put("runde-1", "S", "W", ["a"], [1])
+    created = outbox._con.execute("SELECT created FROM outbox").fetchone()[0]
+    assert outbox.next_due(5.0) == pytest.approx(created + 5.0)
+
+    (row,) = outbox.claim(10)
+    outbox.mark_failed([row.id], RuntimeError("quota"))
+    lease = outbox._con.execute("SELECT lease_until FROM outbox").fetchone()[0]
+    assert outbox.next_due(5.0) == lease
 
 
 def test_lade_worksheet_namen(mock_credentials, mocker):
@@ -103,13 +499,222 @@ def test_lade_worksheet_namen(mock_credentials, mocker):
 def test_lade_worksheet(mock_credentials, mocker):
     sheet_mock = MagicMock()
     ws_mock = MagicMock()
-    ws_mock.get_all_records.return_value = [{"A": 1, "B": 2}]
+    ws_mock.get_all_values.return_value = [
+        ["timestamp", "spielname", "alter", "A", "B", "punkte"],
+        ["2025-06-01 10:00:00", "Eli", "11", "1", "2,5", "(0.1, 0.2, True)"],
+        ["2025-06-01 11:00:00", "Noa", "", "3", "", ""],
+    ]
     sheet_mock.worksheet.return_value = ws_mock
     client_mock = MagicMock()
     client_mock.open.return_value = sheet_mock
     mocker.patch("utils.google_utils.gspread.authorize", return_value=client_mock)
 
-    df = lade_worksheet("TestSheet", "Sheet1")
+    df = lade_worksheet("Landschaftsdetektiv", "Dorf")
     assert isinstance(df, pd.DataFrame)
     assert "A" in df.columns
     assert "B" in df.columns
+    assert df.loc[0, "B"] == 2.5
+    assert pd.isna(df.loc[1, "B"])
+    assert str(df["alter"].dtype) == "Int64" and pd.isna(df.loc[1, "alter"])
+    assert df.loc[0, "timestamp"] == pd.Timestamp("2025-06-01 10:00:00", tz="UTC")
+    assert df.loc[1, "punkte"] == ""
+
+
+def test_read_dataset_fetches_only_new_rows(mock_credentials, mocker):
+    sheet_mock = MagicMock()
+    ws_mock = MagicMock()
+    header = ["scene", "kosten"]
+    ws_mock.get_all_values.return_value = [header, ["t1", "0,5"], ["t2", "1"]]
+    sheet_mock.worksheet.return_value = ws_mock
+    client_mock = MagicMock()
+    client_mock.open.return_value = sheet_mock
+    mocker.patch("utils.google_utils.gspread.authorize", return_value=client_mock)
+
+    backend = get_storage_backend()
+    names = ("Landschaftsdesigner", "Sliderdaten")
+    assert backend.read_dataset(*names)["kosten"].tolist() == [0.5, 1.0]
+
+    # Zweiter Aufruf: nur Kopfzeile + Zeilen ab der letzten bekannten
+    ws_mock.batch_get.return_value = [[header], [["t2", "1"], ["t3", "0,25"]]]
+    df = backend.read_dataset(*names)
+    ws_mock.batch_get.assert_called_once_with(["1:1", "A3:B"])
+    assert ws_mock.get_all_values.call_count == 1
+    assert df["scene"].tolist() == ["t1", "t2", "t3"]
+    assert df["kosten"].tolist() == [0.5, 1.0, 0.25]
+
+    # Letzte bekannte Zeile fehlt (Zeilen gelöscht) → voller Reload
+    ws_mock.batch_get.return_value = [[header], []]
+    ws_mock.get_all_values.return_value = [header, ["t1", "0,5"]]
+    df = backend.read_dataset(*names)
+    assert ws_mock.get_all_values.call_count == 2
+    assert df["scene"].tolist() == ["t1"]
+
+
+def test_read_dataset_reloads_when_header_grows(mocker):
+    service = FakeSheetsService()
+    sh = service.spreadsheet("Landschaftsdetektiv")
+    ws = sh.seed(
+        "Dorf",
+        [
+            ["timestamp", "spielname", "alter", "A", "punkte"],
+            ["2025-06-01 10:00:00", "Eli", "11", "1.5", ""],
+        ],
+    )
+    mocker.patch("utils.quota_utils.READS_PER_MINUTE", 6000)
+
+    with service.installed():
+        backend = get_storage_backend()
+        df = backend.read_dataset("Landschaftsdetektiv", "Dorf")
+        assert list(df.columns) == ["timestamp", "spielname", "alter", "A", "punkte"]
+
+        # Ein anderer Prozess hängt eine Spalte an und schreibt eine Zeile
+        ws.update([["B"]], range_name="F1")
+        ws.append_rows([["2025-06-01 11:00:00", "Noa", "12", "", "", "2.5"]])
+        df = backend.read_dataset("Landschaftsdetektiv", "Dorf")
+
+    assert list(df.columns) == ["timestamp", "spielname", "alter", "A", "punkte", "B"]
+    assert df["B"].tolist()[1] == 2.5 and pd.isna(df["B"].tolist()[0])
+    assert service.stats["requests.get_all_values"] == 2
+
+
+def test_lade_alle_worksheets_one_batch_per_spreadsheet(mock_credentials, mocker):
+    sheets = {}
+    for name in ["Landschaftsdetektiv", "Landschaftsdesigner"]:
+        sh = MagicMock(id=name)
+        sh.worksheets.return_value = [
+            MagicMock(title="Dorf"),
+            MagicMock(title="Feedback"),
+        ]
+        sh.values_batch_get.return_value = {
+            "valueRanges": [
+                {"values": [["timestamp", "A"], ["2025-06-01 10:00:00", "1,5"]]},
+                {"values": [["timestamp", "bewertung"], ["2025-06-01 10:00:00", "3"]]},
+            ]
+        }
+        sheets[name] = sh
+    client_mock = MagicMock()
+    client_mock.open.side_effect = lambda name: sheets[name]
+    mocker.patch("utils.google_utils.gspread.authorize", return_value=client_mock)
+    lade_alle_worksheets.clear()
+
+    daten = lade_alle_worksheets(tuple(sheets))
+    for name, sh in sheets.items():
+        sh.values_batch_get.assert_called_once_with(["'Dorf'", "'Feedback'"])
+        assert list(daten[name]) == ["Dorf", "Feedback"]
+        assert daten[name]["Feedback"].loc[0, "bewertung"] == 3
+    assert daten["Landschaftsdetektiv"]["Dorf"].loc[0, "A"] == 1.5
+
+    # Der Stand ist gemerkt → das nächste read_dataset lädt nur inkrementell
+    ws_mock = sheets["Landschaftsdetektiv"].worksheets.return_value[0]
+    ws_mock.batch_get.return_value = [
+        [["timestamp", "A"]],
+        [["2025-06-01 10:00:00", "1,5"]],
+    ]
+    df = get_storage_backend().read_dataset("Landschaftsdetektiv", "Dorf")
+    ws_mock.get_all_values.assert_not_called()
+    assert len(df) == 1
+
+
+def test_read_all_fetches_only_new_rows_of_known_tabs(mocker):
+    service = FakeSheetsService()
+    sh = service.spreadsheet("Landschaftsdetektiv")
+    dorf = sh.seed("Dorf", [["timestamp", "A"], ["2025-06-01 10:00:00", "1.5"]])
+    feedback = sh.seed(
+        "Feedback",
+        [["timestamp", "bewertung"], ["t1", "3"], ["t2", "4"]],
+    )
+    mocker.patch("utils.quota_utils.READS_PER_MINUTE", 6000)
+    spy = mocker.spy(sh, "values_batch_get")
+
+    with service.installed():
+        backend = get_storage_backend()
+        backend.read_all("Landschaftsdetektiv")
+        spy.assert_called_once_with(["'Dorf'", "'Feedback'"])
+
+        # Dorf wächst, Feedback verliert eine Zeile → nur Feedback voll neu
+        dorf.append_rows([["2025-06-01 11:00:00", "2.5"]])
+        feedback._rows.pop()
+        spy.reset_mock()
+        frames = backend.read_all("Landschaftsdetektiv")
+
+    assert [c.args[0] for c in spy.call_args_list] == [
+        ["'Dorf'!1:1", "'Dorf'!A2:B", "'Feedback'!1:1", "'Feedback'!A3:B"],
+        ["'Feedback'"],
+    ]
+    assert frames["Dorf"]["A"].tolist() == [1.5, 2.5]
+    assert frames["Feedback"]["bewertung"].tolist() == [3]
+
+
+def test_round_trip_against_fake_sheets(mocker):
+    service = FakeSheetsService(decimal_separator=",")
+    service.spreadsheet("Landschaftsdetektiv")
+    mocker.patch("utils.quota_utils.time.sleep")
+    mocker.patch("utils.quota_utils.READS_PER_MINUTE", 6000)
+    mocker.patch("utils.quota_utils.WRITES_PER_MINUTE", 6000)
+
+    with service.installed():
+        writer = get_result_writer()
+        runde = pd.DataFrame({"label": ["Wind"], "sekunden_seit_start": [3.5]})
+        save_compare_results_to_gsheet(runde, scene="Dorf", spielname="Eli", alter=11)
+        writer.flush()
+
+        # Sheets fällt aus → Zeile bleibt in der Outbox und wird später geliefert
+        service.failure_rate = 1.0
+        runde = pd.DataFrame({"label": ["Solar"], "sekunden_seit_start": [7.25]})
+        ticket = save_compare_results_to_gsheet(runde, scene="Dorf", spielname="Noa")
+        writer.flush()
+        assert not ticket.done and service.stats["failed"] > 0
+
+        service.failure_rate = 0.0
+        writer.outbox._con.execute("UPDATE outbox SET lease_until = 0")
+        writer.flush()
+        assert ticket.done
+
+        service.reset_stats()
+        lade_worksheet.clear()
+        df = lade_worksheet("Landschaftsdetektiv", "Dorf")
+
+    assert service.stats["requests"] == 1
+    assert list(df.columns) == [
+        "timestamp",
+        "spielname",
+        "alter",
+        "Wind",
+        "punkte",
+        "round_id",
+        "Solar",
+    ]
+    assert df["Wind"].tolist()[0] == 3.5 and pd.isna(df["Wind"].tolist()[1])
+    assert df["Solar"].tolist()[1] == 7.25
+
+
+def test_concurrent_feedback_from_two_processes_is_append_only(tmp_path, mocker):
+    service = FakeSheetsService()
+    service.spreadsheet("Landschaftsbeschuetzer")
+    mocker.patch("utils.quota_utils.READS_PER_MINUTE", 6000)
+    mocker.patch("utils.quota_utils.WRITES_PER_MINUTE", 6000)
+    columns = ["timestamp", "bewertung", "kommentar"]
+
+    with service.installed():
+        # Zwei Writer mit eigener Outbox (wie zwei Server-Prozesse) liefern parallel
+        writers = [ResultWriter(Outbox(tmp_path / f"p{i}.sqlite")) for i in (1, 2)]
+        for i in range(20):
+            writers[i % 2].submit(
+                "Landschaftsbeschuetzer", "Feedback", columns, [f"t{i}", 3, ""]
+            )
+        threads = [threading.Thread(target=w.flush) for w in writers]
+        for t in threads:
+            t.start()
+        for t in threads:
+            t.join()
+        for w in writers:
+            w.close()
+
+        # Geschrieben wurde nur angehängt – nie der bestehende Inhalt gelesen
+        assert service.stats["requests.get_all_values"] == 0
+        assert service.stats["requests.insert_rows"] == 0
+        lade_worksheet.clear()
+        df = lade_worksheet("Landschaftsbeschuetzer", "Feedback")
+
+    assert list(df.columns) == columns + ["round_id"]
+    assert df["round_id"].nunique() == len(df) == 20 and (df["bewertung"] == 3).all()
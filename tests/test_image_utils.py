@@ -0,0 +1,177 @@
+import io
+from concurrent.futures import ThreadPoolExecutor
+
+import numpy as np
+import pytest
+from PIL import Image, ImageDraw
+from utils import image_utils
+from utils.image_utils import (
+    EncodedImage,
+    ImageStore,
+    cached_file,
+    encode_file,
+    encode_image,
+)
+
+
+@pytest.fixture(autouse=True)
+def empty_cache(tmp_path, monkeypatch):
+    monkeypatch.setattr(image_utils, "ENCODE_CACHE_PATH", tmp_path / "encoded")
+    image_utils._cache.clear()
+    yield
+    image_utils._cache.clear()
+
+
+def _bild(color="green", size=(800, 500)) -> Image.Image:
+    img = Image.new("RGBA", size, color)
+    img.paste((200, 30, 30, 255), (100, 100, 300, 250))
+    return img
+
+
+def test_encode_image_is_compact_jpeg():
+    img = _bild()
+    encoded = encode_image(img)
+    assert encoded.format == "JPEG"
+    assert encoded.mime == "image/jpeg"
+    assert encoded.size == img.size
+    assert len(encoded.data) < len(img.tobytes()) / 10
+    with Image.open(io.BytesIO(encoded.data)) as decoded:
+        assert decoded.format == "JPEG"
+        assert decoded.size == img.size
+
+
+def test_encode_image_caches_by_content():
+    first = encode_image(_bild())
+    # Anderes Objekt, gleicher Inhalt → dieselben Bytes aus dem Cache
+    assert encode_image(_bild()) is first
+    assert encode_image(_bild("blue")) is not first
+    assert encode_image(_bild(), fmt="WEBP").format == "WEBP"
+
+
+def test_encode_image_downscales_only():
+    assert encode_image(_bild(), width=400).size == (400, 250)
+    assert encode_image(_bild(), width=1600).size == (800, 500)
+
+
+def test_encoded_image_saves_its_bytes():
+    encoded = EncodedImage(b"\xff\xd8abc", "JPEG", (1, 1))
+    buf = io.BytesIO()
+    encoded.save(buf, format="JPEG", quality=75)
+    assert buf.getvalue() == encoded.data
+
+
+def test_encode_file_uses_disk_cache(tmp_path, mocker):
+    path = tmp_path / "Fluss_1_1_0.0.png"
+    _bild(size=(2000, 1000)).save(path)
+
+    encoded = encode_file(path, width=1000)
+    assert encoded.size == (1000, 500)
+    assert len(list(image_utils.ENCODE_CACHE_PATH.glob("*.jpg"))) == 1
+
+    # Neuer Prozess: Speicher leer, Bytes kommen von der Platte
+    image_utils._cache.clear()
+    spy = mocker.spy(image_utils, "_encode")
+    assert encode_file(path, width=1000).data == encoded.data
+    spy.assert_not_called()
+
+
+def test_encode_file_once_under_concurrency(tmp_path, mocker):
+    path = tmp_path / "Bach_1_1_0.0.png"
+    _bild(size=(1200, 600)).save(path)
+    spy = mocker.spy(image_utils, "_encode")
+
+    assert cached_file(path, width=600) is None
+    with ThreadPoolExecutor(4) as pool:
+        results = list(pool.map(lambda _: encode_file(path, width=600), range(8)))
+
+    spy.assert_called_once()
+    assert all(r is results[0] for r in results)
+    assert cached_file(path, width=600) is results[0]
+
+
+def test_memory_budget_evicts_oldest():
+    cache = image_utils._EncodedCache(budget=10)
+    for key in "abc":
+        cache.put(key, EncodedImage(b"12345", "JPEG", (1, 1)))
+    assert cache.get("a") is None
+    assert cache.get("c") is not None
+    assert cache.used == 10
+
+
+@pytest.fixture
+def bild_datei(tmp_path):
+    path = tmp_path / "Mini_unverändert.png"
+    _bild(size=(64, 32)).convert("RGB").save(path)
+    return path
+
+
+@pytest.mark.parametrize("mmap", [True, False])
+def test_image_store_returns_readonly_rgba(tmp_path, bild_datei, mmap):
+    store = ImageStore(raw_path=tmp_path / "raw" if mmap else None)
+    img = store.get(bild_datei)
+    assert img.mode == "RGBA"
+    assert img.size == (64, 32)
+    assert img.readonly
+
+    # Zeichnen arbeitet auf einer Kopie, der gemeinsame Puffer bleibt gleich
+    before = np.asarray(store.get(bild_datei)).copy()
+    ImageDraw.Draw(img).rectangle((0, 0, 10, 10), fill=(0, 0, 0, 255))
+    assert np.array_equal(np.asarray(store.get(bild_datei)), before)
+
+
+def test_image_store_decodes_once_under_concurrency(tmp_path, bild_datei, mocker):
+    store = ImageStore(raw_path=tmp_path / "raw")
+    decode = mocker.spy(store, "_decode")
+    with ThreadPoolExecutor(max_workers=8) as pool:
+        arrays = list(pool.map(lambda _: store.get_array(bild_datei), range(32)))
+    assert decode.call_count == 1
+    assert all(a is arrays[0] for a in arrays)
+    assert not arrays[0].flags.writeable
+
+
+def test_image_store_shares_raw_file_between_processes(tmp_path, bild_datei, mocker):
+    ImageStore(raw_path=tmp_path / "raw").get(bild_datei)
+    assert len(list((tmp_path / "raw").glob("*.npy"))) == 1
+
+    # Zweiter Prozess: liest die Roh-Datei per mmap, ohne PNG zu dekodieren
+    open_png = mocker.spy(image_utils.Image, "open")
+    img = ImageStore(raw_path=tmp_path / "raw").get(bild_datei)
+    open_png.assert_not_called()
+    assert img.getpixel((0, 0)) == (0, 128, 0, 255)
+
+
+def test_image_store_removes_stale_raw_files(tmp_path, bild_datei):
+    raw_path = tmp_path / "raw"
+    ImageStore(raw_path=raw_path).get(bild_datei)
+    first = list(raw_path.glob("*.npy"))
+
+    # Bild geändert → neue Roh-Datei, die alte verschwindet
+    Image.new("RGB", (64, 32), "blue").save(bild_datei)
+    img = ImageStore(raw_path=raw_path).get(bild_datei)
+    assert img.getpixel((0, 0)) == (0, 0, 255, 255)
+    assert len(list(raw_path.glob("*.npy"))) == 1
+    assert not first[0].exists()
+
+    # Bild gelöscht bzw. Datei ohne Quelle → beim Aufräumen entfernt
+    (raw_path / "alt-0123.npy").write_bytes(b"")
+    store = ImageStore(raw_path=raw_path)
+    assert store.prune_raw() == 1
+    bild_datei.unlink()
+    assert store.prune_raw() == 1
+    assert list(raw_path.iterdir()) == []
+
+
+def test_image_store_evicts_least_recently_used(tmp_path):
+    paths = []
+    for i in range(3):
+        paths.append(tmp_path / f"b{i}.png")
+        Image.new("RGB", (10, 10), (i, i, i)).save(paths[-1])
+    store = ImageStore(budget_bytes=2 * 10 * 10 * 4, raw_path=None)
+    first = store.get_array(paths[0])
+    store.get_array(paths[1])
+    store.get_array(paths[0])  # zuletzt benutzt
+    store.get_array(paths[2])
+    stats = store.stats()
+    assert stats["items"] == 2
+    assert stats["evictions"] == 1
+    assert store.get_array(paths[0]) is first
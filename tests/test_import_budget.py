@@ -0,0 +1,22 @@
+import os
+
+import pytest
+from tests.benchmark_imports import BUDGET_MS, PAGES, measure, page_imports
+
+
+def test_every_page_has_a_budget():
+    assert {page.stem for page in PAGES} == set(BUDGET_MS)
+
+
+# Wanduhr-Messung → nur auf Wunsch (LEARNLIT_BENCHMARK=1), nicht im Standardlauf
+@pytest.mark.skipif(
+    not os.environ.get("LEARNLIT_BENCHMARK"),
+    reason="Import-Budget nur mit LEARNLIT_BENCHMARK=1",
+)
+@pytest.mark.parametrize("page", PAGES, ids=lambda p: p.stem)
+def test_page_cold_import_within_budget(page):
+    import_ms = measure(page, repeat=2)
+    assert import_ms <= BUDGET_MS[page.stem], (
+        f"{page.stem}: {import_ms:.0f} ms > {BUDGET_MS[page.stem]} ms "
+        f"({', '.join(page_imports(page))})"
+    )
@@ -0,0 +1,57 @@
+import os
+
+import pytest
+from PIL import Image
+from utils import pyramid_utils
+from utils.pyramid_utils import (
+    PYRAMID_WIDTHS,
+    build_pyramid,
+    ensure_pyramid,
+    load_level,
+    snap_width,
+)
+
+
+@pytest.fixture
+def scene_dir(tmp_path, monkeypatch):
+    """Kleine Test-Szene statt der echten 3-MB-Bilder."""
+    data = tmp_path / "detective"
+    data.mkdir()
+    for variant, color in [("unverändert", "green"), ("verändert", "brown")]:
+        Image.new("RGB", (1500, 1000), color).save(data / f"Mini_{variant}.png")
+    (data / "Mini.xml").write_text("<annotations/>")
+    monkeypatch.setattr(pyramid_utils, "get_base_path", lambda game: data)
+    monkeypatch.setattr(pyramid_utils, "PYRAMID_PATH", tmp_path / "pyramid")
+    return data
+
+
+@pytest.mark.parametrize(
+    "display_w, expected",
+    [(100, 200), (200, 200), (450, 600), (1150, 1200), (1600, 1200)],
+)
+def test_snap_width(display_w, expected):
+    assert snap_width(display_w) == expected
+
+
+def test_build_and_load_levels(scene_dir):
+    manifest = build_pyramid("Mini")
+    assert manifest["size"] == [1500, 1000]
+    assert sorted(map(int, manifest["levels"])) == sorted(PYRAMID_WIDTHS)
+
+    orig, klima = load_level("Mini", manifest, 600)
+    assert orig.size == klima.size == (600, 400)
+    assert orig.getpixel((10, 10)) == (0, 128, 0)
+
+
+def test_rebuilds_only_when_source_changes(scene_dir, mocker):
+    first = ensure_pyramid("Mini")
+    resize = mocker.spy(Image.Image, "resize")
+    assert ensure_pyramid("Mini") == first
+    resize.assert_not_called()
+
+    # Originalbild ersetzt → Manifest veraltet → neu bauen
+    src = scene_dir / "Mini_verändert.png"
+    Image.new("RGB", (1500, 1000), "blue").save(src)
+    os.utime(src, ns=(1, 1))
+    ensure_pyramid("Mini")
+    assert resize.call_count == 2 * len(PYRAMID_WIDTHS)
@@ -0,0 +1,96 @@
+import threading
+import time
+
+import gspread
+import pytest
+from unittest.mock import MagicMock
+from utils.quota_utils import (
+    READ,
+    WRITE,
+    PRIORITY_DASHBOARD,
+    PRIORITY_PLAYER,
+    SheetsScheduler,
+)
+
+
+def api_error(code: int) -> gspread.exceptions.APIError:
+    response = MagicMock()
+    response.json.return_value = {"error": {"code": code, "message": "x"}}
+    return gspread.exceptions.APIError(response)
+
+
+def test_retries_429_with_backoff_and_counts(mocker):
+    sleep = mocker.patch("utils.quota_utils.time.sleep")
+    scheduler = SheetsScheduler(writes_per_minute=6000, backoff_base=0.001)
+    fn = MagicMock(side_effect=[api_error(429), api_error(503), "ok"])
+
+    assert scheduler.call(WRITE, fn, "zeile") == "ok"
+    assert fn.call_count == 3
+    assert sleep.call_count == 2
+    stats = scheduler.stats()
+    assert stats["throttled"] == 1
+    assert stats["server_errors"] == 1
+    assert stats["retries"] == 2
+    assert stats["failures"] == 0
+
+
+def test_gives_up_after_max_retries(mocker):
+    mocker.patch("utils.quota_utils.time.sleep")
+    scheduler = SheetsScheduler(
+        reads_per_minute=6000, max_retries=2, backoff_base=0.001
+    )
+    fn = MagicMock(side_effect=api_error(429))
+
+    with pytest.raises(gspread.exceptions.APIError):
+        scheduler.call(READ, fn)
+    assert fn.call_count == 3
+    assert scheduler.stats()["failures"] == 1
+
+
+def test_other_errors_are_not_retried():
+    scheduler = SheetsScheduler()
+    fn = MagicMock(side_effect=api_error(400))
+    with pytest.raises(gspread.exceptions.APIError):
+        scheduler.call(READ, fn)
+    fn.assert_called_once()
+    assert scheduler.stats()["retries"] == 0
+
+
+def test_non_idempotent_calls_retry_only_429(mocker):
+    mocker.patch("utils.quota_utils.time.sleep")
+    scheduler = SheetsScheduler(writes_per_minute=6000, backoff_base=0.001)
+    fn = MagicMock(side_effect=[api_error(429), api_error(503), "ok"])
+
+    with pytest.raises(gspread.exceptions.APIError):
+        scheduler.call(WRITE, fn, "zeile", idempotent=False)
+    assert fn.call_count == 2
+    fn.assert_called_with("zeile")
+    stats = scheduler.stats()
+    assert stats["retries"] == 1 and stats["failures"] == 1
+
+
+def test_player_writes_go_before_dashboard_reads():
+    # Kein Burst, 1 Token alle 50 ms → Wartende werden nacheinander bedient
+    scheduler = SheetsScheduler(writes_per_minute=1200, burst=1)
+    scheduler.call(WRITE, lambda: None)  # Bucket leeren
+    order = []
+
+    def worker(name, priority):
+        scheduler.call(WRITE, order.append, name, priority=priority)
+
+    threads = [
+        threading.Thread(target=worker, args=(f"dashboard-{i}", PRIORITY_DASHBOARD))
+        for i in range(3)
+    ]
+    for t in threads:
+        t.start()
+    time.sleep(0.01)
+    while scheduler.stats()["queued_write"] < 3:
+        time.sleep(0.001)
+    player = threading.Thread(target=worker, args=("player", PRIORITY_PLAYER))
+    player.start()
+    for t in threads + [player]:
+        t.join(timeout=5)
+
+    assert order[0] == "player"
+    assert scheduler.stats()["queued_write"] == 0
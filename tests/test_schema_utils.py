@@ -0,0 +1,28 @@
+import pandas as pd
+from utils.schema_utils import parse_values
+
+
+def test_timestamps_in_sheet_locale_are_day_first():
+    raw = pd.DataFrame(
+        {
+            "timestamp": [
+                "2025-06-01 10:00:00",
+                "01.02.2025 10:00",
+                "03.04.2025 11:12:13",
+                "2025-06-01T10:00:00Z",
+                "",
+            ],
+            "bewertung": ["3", "4", "", "5", "2"],
+        }
+    )
+
+    df = parse_values(raw, "Landschaftsdetektiv", "Feedback")
+
+    assert df["timestamp"].tolist()[:4] == [
+        pd.Timestamp("2025-06-01 10:00:00", tz="UTC"),
+        pd.Timestamp("2025-02-01 10:00:00", tz="UTC"),
+        pd.Timestamp("2025-04-03 11:12:13", tz="UTC"),
+        pd.Timestamp("2025-06-01 10:00:00", tz="UTC"),
+    ]
+    assert pd.isna(df["timestamp"].iloc[4])
+    assert df["bewertung"].tolist()[:2] == [3, 4]
@@ -1,8 +1,19 @@
+import os
+
 import pytest
 import pandas as pd
 from pathlib import Path
-from utils.slider_utils import get_image_path, scan_slider_ranges, create_feedback_df
-
+from PIL import Image
+from utils import image_utils
+from utils.slider_utils import (
+    SliderPrefetcher,
+    build_slider_index,
+    neighbour_images,
+    get_image_path,
+    get_slider_index,
+    scan_slider_ranges,
+    create_feedback_df,
+)
 
 SCENES = ["Test1", "Test2", "Test3"]
 
@@ -12,10 +23,35 @@ def pytest_generate_tests(metafunc):
         metafunc.parametrize("scene_name", SCENES)
 
 
-def test_get_image_path(scene_name):
-    path = Path(get_image_path(scene_name, 1, 2, 3, 4))
-    assert path.name == f"{scene_name}_1_2_3_4.jpg"
+@pytest.fixture
+def slider_dir(tmp_path):
+    test_dir = tmp_path / "data" / "slider"
+    test_dir.mkdir(parents=True)
+    return test_dir
+
+
+def _touch(directory: Path, *names: str) -> None:
+    for name in names:
+        (directory / name).touch()
+    # Verzeichnis-Änderungszeit sicher verschieben (grobe Zeitauflösung mancher FS)
+    stat = os.stat(directory)
+    os.utime(directory, ns=(stat.st_atime_ns, stat.st_mtime_ns + 1_000_000_000))
+
+
+def test_get_image_path(scene_name, slider_dir):
+    _touch(slider_dir, f"{scene_name}_1_2_0.25.jpg", f"{scene_name}_1_1_0.0.jpg")
+
+    path, kosten = get_image_path(scene_name, 1, 2, image_dir=str(slider_dir))
+    path = Path(path)
+    assert path.name == f"{scene_name}_1_2_0.25.jpg"
     assert "data" in path.parts and "slider" in path.parts
+    assert kosten == 0.25
+
+
+def test_get_image_path_missing(slider_dir):
+    _touch(slider_dir, "Test1_1_1_0.0.jpg")
+    with pytest.raises(FileNotFoundError):
+        get_image_path("Test1", 9, 9, image_dir=str(slider_dir))
 
 
 def test_create_feedback_df(scene_name):
@@ -27,29 +63,95 @@ def test_create_feedback_df(scene_name):
     assert df.iloc[0]["comment"] == "Great!"
 
 
-def test_scan_slider_ranges(scene_name, tmp_path):
-    test_dir = tmp_path / "data" / "slider"
-    test_dir.mkdir(parents=True)
-
+def test_scan_slider_ranges(scene_name, slider_dir):
     # Dummy-Dateien erstellen
-    files = [
-        test_dir / f"{scene_name}_1_2_0_4.jpg",
-        test_dir / f"{scene_name}_3_2_0_4.jpg",
-        test_dir / f"{scene_name}_1_0_0_0.jpg",
-    ]
-    for file in files:
-        file.touch()
+    _touch(
+        slider_dir,
+        f"{scene_name}_1_2_0.5.jpg",
+        f"{scene_name}_3_2_1.0.jpg",
+        f"{scene_name}_1_0_0.0.jpg",
+        "Andere_0_1_0.0.png",
+        "notiz.txt",
+    )
 
-    result = scan_slider_ranges(str(test_dir))
+    result = scan_slider_ranges(str(slider_dir))
 
-    assert scene_name in result
+    assert set(result) == {scene_name, "Andere"}
     slider_ranges = result[scene_name]
 
     # S1: 1, 3, 1 → min=1, max=3
     assert slider_ranges["S1"] == (1, 3)
-    # S2: 2, 2, 0 → min=0, max=2
-    assert slider_ranges["S2"] == (0, 2)
-    # S3: 0, 0, 0 → nur 0 → (0,0)
-    assert slider_ranges["S3"] == (0, 0)
-    # S4: 4, 4, 0 → min=0, max=4
-    assert slider_ranges["S4"] == (0, 4)
+    # S4: 2, 2, 0 → min=0, max=2
+    assert slider_ranges["S4"] == (0, 2)
+    # S1 nur 0 → (0, 0)
+    assert result["Andere"]["S1"] == (0, 0)
+
+
+def test_index_prefers_jpg_and_keeps_format(slider_dir):
+    _touch(slider_dir, "Fluss_1_2_0.5.png", "Fluss_1_2_0.5.jpg", "Fluss_2_2_1.0.png")
+
+    index = build_slider_index(slider_dir)
+
+    assert index.images[("Fluss", 1, 2)].format == "jpg"
+    assert index.images[("Fluss", 2, 2)].format == "png"
+    assert index.images[("Fluss", 2, 2)].kosten == 1.0
+
+
+def test_index_cached_until_directory_changes(slider_dir):
+    _touch(slider_dir, "Bach_1_1_0.0.jpg")
+
+    first = get_slider_index(slider_dir)
+    assert get_slider_index(slider_dir) is first
+
+    _touch(slider_dir, "Bach_2_1_0.5.jpg")
+    second = get_slider_index(slider_dir)
+    assert second is not first
+    assert second.ranges["Bach"]["S1"] == (1, 2)
+    assert get_image_path("Bach", 2, 1, image_dir=str(slider_dir))[1] == 0.5
+
+
+def test_index_matches_data_dir():
+    """Jede Kombination im Repo-Verzeichnis ist per Index auffindbar."""
+    ranges = scan_slider_ranges()
+    index = get_slider_index()
+    for scene, (s1, s4) in {k[0]: k[1:] for k in index.images}.items():
+        assert scene in ranges
+        assert Path(get_image_path(scene, s1, s4)[0]).exists()
+
+
+def test_neighbour_images(slider_dir):
+    _touch(
+        slider_dir,
+        *(f"Fluss_{s1}_{s4}_0.5.png" for s1 in (1, 2, 3) for s4 in (1, 2)),
+    )
+
+    names = lambda imgs: sorted(Path(i.path).name for i in imgs)
+    # s1±1 und Hochwasser umschalten
+    assert names(neighbour_images("Fluss", 2, 1, str(slider_dir))) == [
+        "Fluss_1_1_0.5.png",
+        "Fluss_2_2_0.5.png",
+        "Fluss_3_1_0.5.png",
+    ]
+    # Am Rand fällt der fehlende Nachbar weg
+    assert names(neighbour_images("Fluss", 3, 2, str(slider_dir))) == [
+        "Fluss_2_2_0.5.png",
+        "Fluss_3_1_0.5.png",
+    ]
+    assert neighbour_images("Unbekannt", 1, 1, str(slider_dir)) == []
+
+
+def test_prefetcher_encodes_neighbours(slider_dir, tmp_path, monkeypatch):
+    monkeypatch.setattr(image_utils, "ENCODE_CACHE_PATH", tmp_path / "encoded")
+    image_utils._cache.clear()
+    for s1, color in ((1, "green"), (2, "blue")):
+        Image.new("RGB", (300, 200), color).save(slider_dir / f"Bach_{s1}_1_0.0.png")
+    _touch(slider_dir)
+
+    prefetcher = SliderPrefetcher(workers=1)
+    neighbours = prefetcher.prefetch_neighbours("Bach", 1, 1, str(slider_dir))
+    prefetcher._pool.shutdown(wait=True)
+
+    assert [Path(n.path).name for n in neighbours] == ["Bach_2_1_0.0.png"]
+    assert image_utils.cached_file(neighbours[0].path) is not None
+    assert image_utils.cached_file(slider_dir / "Bach_1_1_0.0.png") is None
+    image_utils._cache.clear()
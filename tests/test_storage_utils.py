@@ -0,0 +1,82 @@
+import pytest
+import pandas as pd
+from utils.storage_utils import SQLiteBackend, filter_by_timestamp, get_storage_backend
+from utils.google_utils import (
+    save_compare_results_to_gsheet,
+    save_slider_results_to_gsheet,
+    save_feedback_to_gsheet,
+    lade_worksheet_namen,
+    lade_worksheet,
+)
+
+
+@pytest.fixture
+def sqlite_backend(tmp_path, mocker):
+    """Schaltet die App per st.secrets auf das lokale SQLite-Backend um."""
+    secrets = {"storage": {"backend": "sqlite", "path": str(tmp_path / "db.sqlite")}}
+    mocker.patch("utils.storage_utils.st.secrets", secrets)
+    get_storage_backend.clear()
+    lade_worksheet.clear()
+    lade_worksheet_namen.clear()
+    yield get_storage_backend()
+    get_storage_backend().close()
+    get_storage_backend.clear()
+    lade_worksheet.clear()
+    lade_worksheet_namen.clear()
+
+
+def test_backend_selected_from_secrets(sqlite_backend):
+    assert isinstance(sqlite_backend, SQLiteBackend)
+
+
+def test_full_round_trip_without_network(sqlite_backend):
+    df = pd.DataFrame({"label": ["Wind", "Solar"], "sekunden_seit_start": [3.5, 7.25]})
+    ticket = save_compare_results_to_gsheet(
+        df,
+        scene="Dorf",
+        spielname="Testspiel",
+        alter=11,
+        all_pts=[{"rel_x": 0.1, "rel_y": 0.2, "hit": True}],
+        round_id="runde-1",
+    )
+    assert ticket.done and ticket.status == "ok"
+
+    # Dieselbe Runde nochmals → kein Duplikat
+    save_compare_results_to_gsheet(df, scene="Dorf", round_id="runde-1")
+    save_slider_results_to_gsheet("Fluss", [2, 1], 0.5)
+    save_feedback_to_gsheet(
+        pd.DataFrame({"timestamp": ["2025-06-01 10:00:00"], "kommentar": ["Super!"]})
+    )
+
+    assert lade_worksheet_namen("Landschaftsdetektiv") == ["Dorf", "Feedback"]
+
+    runden = lade_worksheet("Landschaftsdetektiv", "Dorf")
+    assert len(runden) == 1
+    assert list(runden.columns) == [
+        "timestamp",
+        "spielname",
+        "alter",
+        "Solar",
+        "Wind",
+        "punkte",
+    ]
+    assert runden.loc[0, "Wind"] == 3.5
+    assert runden.loc[0, "punkte"] == "(0.1000, 0.2000, True)"
+
+    slider = lade_worksheet("Landschaftsdesigner", "Sliderdaten")
+    assert slider.loc[0, "kosten"] == 0.5
+
+
+def test_read_dataset_by_time_range(tmp_path):
+    backend = SQLiteBackend(tmp_path / "db.sqlite")
+    for ts in ["2025-06-01 08:00:00", "2025-06-01 12:00:00", "2025-06-02 08:00:00"]:
+        backend.append_feedback("S", "Feedback", ["timestamp", "x"], [ts, 1])
+
+    df = backend.read_dataset(
+        "S", "Feedback", start="2025-06-01 10:00:00", end="2025-06-01 23:59:59"
+    )
+    assert df["timestamp"].tolist() == [pd.Timestamp("2025-06-01 12:00:00", tz="UTC")]
+
+    alle = backend.read_dataset("S", "Feedback")
+    assert filter_by_timestamp(alle, start="2025-06-02 00:00:00").shape[0] == 1
+    backend.close()
@@ -0,0 +1,71 @@
+import pytest
+from PIL import Image
+from utils.bundle_utils import read_cvat_polygons, read_lerntexte
+from utils.slider_utils import build_slider_index, get_image_path
+from utils.synthetic_utils import generate, plan, slider_kosten, slider_name
+
+
+def _plan(out, **kwargs):
+    params = dict(
+        slider_scenes=2,
+        s1_levels=3,
+        detective_scenes=2,
+        n_diffs=9,
+        slider_size=(64, 48),
+        detective_size=(80, 40),
+        fmt="gemischt",
+        seed=1,
+    )
+    params.update(kwargs)
+    return plan(out, **params)
+
+
+@pytest.mark.parametrize("workers", [1, 2])
+def test_generate_writes_current_layout(tmp_path, workers):
+    tasks = _plan(tmp_path)
+    assert len(tasks) == 2 * 3 * 2 + 2
+    assert generate(tasks, workers) > 0
+
+    index = build_slider_index(tmp_path / "slider")
+    assert index.ranges == {
+        "Szene0000": {"S1": (1, 3), "S4": (1, 2)},
+        "Szene0001": {"S1": (1, 3), "S4": (1, 2)},
+    }
+    assert {img.format for img in index.images.values()} == {"png", "jpg"}
+    path, kosten = get_image_path("Szene0001", 2, 2, str(tmp_path / "slider"))
+    assert path.endswith("Szene0001_2_2_0.5.jpg") and kosten == 0.5
+    assert Image.open(path).size == (64, 48)
+
+
+def test_detective_scene_roundtrip(tmp_path):
+    generate(_plan(tmp_path, slider_scenes=0), workers=1)
+    bp = tmp_path / "detective"
+
+    polygons = read_cvat_polygons(bp / "Szene0001.xml", "Szene0001")
+    lerntexte = read_lerntexte(bp / "Szene0001_lerntexte.md")
+    labels = [p["label"] for p in polygons]
+
+    assert len(labels) == len(set(labels)) == 9
+    assert set(labels) == set(lerntexte)
+    assert all(0 <= x <= 1 and 0 <= y <= 1 for p in polygons for x, y in p["points"])
+
+    with Image.open(bp / "Szene0001_unverändert.png") as a, Image.open(
+        bp / "Szene0001_verändert.png"
+    ) as b:
+        assert a.size == b.size == (80, 40)
+        assert a.tobytes() != b.tobytes()
+
+
+def test_generate_is_deterministic(tmp_path):
+    for out in ("a", "b"):
+        generate(_plan(tmp_path / out, slider_scenes=1, s1_levels=1), workers=1)
+    for rel in ("slider/Szene0000_1_2_1.0.png", "detective/Szene0000.xml"):
+        assert (tmp_path / "a" / rel).read_bytes() == (
+            tmp_path / "b" / rel
+        ).read_bytes()
+
+
+def test_slider_names_match_data_dir():
+    assert slider_kosten(1, 1) == 0.0
+    assert slider_name("Bach", 3, 2, "jpg") == "Bach_3_2_0.25.jpg"
+    assert slider_name("Fluss", 1, 2, "png") == "Fluss_1_2_1.0.png"
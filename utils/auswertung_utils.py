@@ -1,13 +1,13 @@
+import hashlib
+
 import streamlit as st
 import pandas as pd
-import matplotlib.pyplot as plt
-import seaborn as sns
-from PIL import Image, ImageDraw
 from datetime import datetime
 import pytz
 import numpy as np
-from scipy.ndimage import gaussian_filter
 from utils.utils import get_base_path
+from utils.clicklog_utils import parse_punkte
+from utils.detective_utils import get_label_mask
 from utils.time_utils import fmt_local, to_utc, TZ_LOCAL, to_local
 
 
@@ -77,6 +77,25 @@ def show_raw_data(df: pd.DataFrame):
 
 
 ############################# Auswertungs-Funktionen für Landschaftsdetektiv ############################
+NICHT_ZEIT_SPALTEN = [
+    "timestamp",
+    "spielname",
+    "alter",
+    "punkte",
+    "round_id",
+    "timestamp_dt",
+    "gesamtzeit",
+]
+
+
+def zeit_spalten(df: pd.DataFrame) -> list[str]:
+    """
+    Label-Spalten (Sekunden bis zum Fund) einer Detektiv-Tabelle.
+    Neue Labels werden rechts an die Kopfzeile angehängt, daher nach Namen statt Position.
+    """
+    return [col for col in df.columns if col.lower() not in NICHT_ZEIT_SPALTEN]
+
+
 def detective_auswertung(
     df: pd.DataFrame,
     scene: str,
@@ -104,6 +123,9 @@ def detective_auswertung(
     # Bild mit allen Punkten
     plot_all_points(filtered_df, scene)
 
+    # Klicks pro Unterschied
+    plot_klicks_pro_unterschied(filtered_df, scene)
+
     # Rohdaten anzeigen
     show_raw_data(filtered_df)
 
@@ -116,9 +138,7 @@ def plot_leaderboard(df: pd.DataFrame):
     - Rest als DataFrame mit ProgressColumn
     """
     # Berechnung der Gesamtzeit
-    zeit_cols = [
-        col for col in df.columns[3:-1] if col.lower() not in ["punkte", "timestamp_dt"]
-    ]
+    zeit_cols = zeit_spalten(df)
     df["Gesamtzeit"] = df[zeit_cols].max(axis=1)
 
     # Leaderboard erstellen
@@ -131,6 +151,9 @@ def plot_leaderboard(df: pd.DataFrame):
     st.subheader("🏆 Leaderboard")
 
     # Falls weniger als 3 Einträge: Dummy-Einträge hinzufügen
+    leaderboard[["spielname", "alter"]] = leaderboard[["spielname", "alter"]].astype(
+        object
+    )
     while len(leaderboard) < 3:
         leaderboard.loc[len(leaderboard)] = ["-", "-", np.nan]
 
@@ -216,11 +239,12 @@ def plot_violin_times(df: pd.DataFrame):
     Plottet einen farbigen Violinplot der Zeiten pro Kategorie (Borke, Brand, etc.)
     mit halbtransparenten Boxplots und farbigen Punkten (unten liegend).
     """
+    import matplotlib.pyplot as plt
+    import seaborn as sns
+
     st.subheader("🎻 Violinplot der Zeiten pro Kategorie")
 
-    zeit_cols = [
-        col for col in df.columns[3:-1] if col.lower() not in ["punkte", "timestamp_dt"]
-    ]
+    zeit_cols = zeit_spalten(df)
     times_long = df.melt(value_vars=zeit_cols, var_name="Label", value_name="Sekunden")
 
     fig, ax = plt.subplots(figsize=(12, 6))
@@ -262,31 +286,48 @@ def plot_violin_times(df: pd.DataFrame):
     st.pyplot(fig)
 
 
+# ────────────────────────── Klickpunkte ──────────────────────────
+@st.cache_data(max_entries=16, show_spinner=False)
+def _klickpunkte(version: str, _values: list[str]) -> pd.DataFrame:
+    return pd.DataFrame(parse_punkte(_values))
+
+
+def klickpunkte(df: pd.DataFrame) -> pd.DataFrame:
+    """
+    Alle Klickpunkte aus der 'punkte'-Spalte als DataFrame (runde, rel_x, rel_y, hit);
+    `runde` ist das Zeilen-Label der Runde in `df`. Pro Datenstand (Hash der
+    Spalte) wird nur einmal geparst – Heatmap, Punktebild und Klicks pro
+    Unterschied teilen sich das Ergebnis.
+    """
+    values = df["punkte"].fillna("").astype(str).tolist()
+    version = hashlib.blake2b("\x1f".join(values).encode(), digest_size=16).hexdigest()
+    pts = _klickpunkte(version, values)
+    pts["runde"] = df.index.to_numpy()[pts["runde"].to_numpy()]
+    return pts
+
+
 # ────────────────────────── 3. Heatmap ──────────────────────────
 def plot_heatmap(df: pd.DataFrame, scene: str):
     """
     Zeichnet eine echte Heatmap der Klickpunkte als Overlay über das Hintergrundbild.
     """
+    import matplotlib.pyplot as plt
+    from PIL import Image
+    from scipy.ndimage import gaussian_filter
+
     st.subheader("🌡️ Heatmap der Klickpunkte")
 
     img_path = get_base_path("detective") / f"{scene}_verändert.png"
     img = Image.open(img_path).convert("RGB")
     width, height = img.size
 
-    # Alle Klickpunkte aus 'punkte'-Spalte extrahieren
+    # Alle Klickpunkte in einem Schritt aufs Pixelraster zählen
+    pts = klickpunkte(df)
+    x_px = (pts["rel_x"].to_numpy(float) * width).astype(int)
+    y_px = (pts["rel_y"].to_numpy(float) * height).astype(int)
+    inside = (x_px >= 0) & (x_px < width) & (y_px >= 0) & (y_px < height)
     heatmap_array = np.zeros((height, width))
-
-    for pts_str in df["punkte"]:
-        points = pts_str.split("; ")
-        for pt in points:
-            try:
-                x_rel, y_rel, hit = eval(pt)
-                x_px = int(x_rel * width)
-                y_px = int(y_rel * height)
-                if 0 <= x_px < width and 0 <= y_px < height:
-                    heatmap_array[y_px, x_px] += 1
-            except Exception:
-                continue
+    np.add.at(heatmap_array, (y_px[inside], x_px[inside]), 1)
 
     # Weiche Heatmap mit Gaussian-Filter erzeugen
     heatmap_blurred = gaussian_filter(heatmap_array, sigma=20)
@@ -296,7 +337,7 @@ def plot_heatmap(df: pd.DataFrame, scene: str):
     heatmap_img = Image.fromarray(np.uint8(plt.cm.jet(heatmap_norm) * 255))
     heatmap_img = heatmap_img.convert("RGBA")
 
-    # Transparenz anpassen (z. B. Alpha = 128)
+    # Transparenz anpassen (z. B. Alpha = 128)
     alpha = 128
     heatmap_img.putalpha(alpha)
 
@@ -310,29 +351,49 @@ def plot_heatmap(df: pd.DataFrame, scene: str):
 def plot_all_points(df: pd.DataFrame, scene: str):
     """
     Plottet das Bild mit allen gewählten Punkten als grün (Treffer) oder rot (Fehler).
+    Treffer/Fehler kommen aus dem Label-Raster der Szene (ein Array-Zugriff für alle).
     """
+    from PIL import Image, ImageDraw
+
     st.subheader("📍 Alle gewählten Punkte")
 
     img_path = get_base_path("detective") / f"{scene}_verändert.png"
     img = Image.open(img_path).convert("RGBA")
     draw = ImageDraw.Draw(img, "RGBA")
 
-    for pts_str in df["punkte"]:
-        points = pts_str.split("; ")
-        for pt in points:
-            try:
-                x, y, hit = eval(pt)
-                x_px = int(x * img.width)
-                y_px = int(y * img.height)
-                color = (0, 255, 0, 180) if hit else (255, 0, 0, 180)
-                r = 10
-                draw.ellipse((x_px - r, y_px - r, x_px + r, y_px + r), fill=color)
-            except Exception:
-                continue
+    pts = klickpunkte(df)
+    hits = get_label_mask(scene).label_ids(pts["rel_x"], pts["rel_y"]) > 0
+    x_px = (pts["rel_x"].to_numpy(float) * img.width).astype(int)
+    y_px = (pts["rel_y"].to_numpy(float) * img.height).astype(int)
+
+    r = 10
+    for x, y, hit in zip(x_px, y_px, hits):
+        color = (0, 255, 0, 180) if hit else (255, 0, 0, 180)
+        draw.ellipse((x - r, y - r, x + r, y + r), fill=color)
 
     st.image(img, caption="Alle gewählten Punkte")
 
 
+# ────────────────────────── 5. Klicks pro Unterschied ──────────────────────────
+def plot_klicks_pro_unterschied(df: pd.DataFrame, scene: str):
+    """
+    Ordnet alle Klicks mit einem Zugriff ins Label-Raster den Unterschieden zu
+    und zeigt, wie oft jeder Unterschied angeklickt wurde.
+    """
+    st.subheader("🎯 Klicks pro Unterschied")
+
+    pts = klickpunkte(df)
+    if pts.empty:
+        st.info("Keine Klickpunkte im gewählten Zeitraum.")
+        return
+
+    label_mask = get_label_mask(scene)
+    ids = label_mask.label_ids(pts["rel_x"], pts["rel_y"])
+    counts = np.bincount(ids, minlength=len(label_mask.labels))
+    namen = ["❌ kein Treffer"] + list(label_mask.labels[1:])
+    st.bar_chart(pd.Series(counts, index=namen).groupby(level=0, sort=False).sum())
+
+
 ############################# Auswertungs-Funktionen für Landschaftsdesigner ############################
 
 
@@ -348,11 +409,6 @@ def designer_auswertung(df: pd.DataFrame):
         st.info("Keine Daten im gewählten Zeitraum.")
         return
 
-    # Normiere Spalten falls nötig (z. B. 'kosten' ist Komma statt Punkt)
-    filtered_df["kosten"] = (
-        filtered_df["kosten"].astype(str).str.replace(",", ".").astype(float)
-    )
-
     # Plots
     col1, col2 = st.columns(2)
     with col1:
@@ -378,18 +434,11 @@ def feedback_auswertung(
     filtered_df = filter_dataframe_by_time(df)
     st.markdown("---")
 
-    # Versuche 'bewertung' in Integer zu konvertieren, ungültige Werte werden zu NaN
-    filtered_df["bewertung"] = pd.to_numeric(filtered_df["bewertung"], errors="coerce")
-
-    # Dann +1 anwenden (nur auf numerische, gültige Werte)
-    filtered_df["bewertung"] = filtered_df["bewertung"].apply(
-        lambda x: x + 1 if pd.notnull(x) else x
-    )
+    # 'bewertung' (Int64, 0–4 aus st.feedback) auf 1–5 verschieben; <NA> bleibt <NA>
+    filtered_df["bewertung"] = filtered_df["bewertung"] + 1
 
-    # Konvertiere 'gelernt' in Integer (0 oder 1), ungültige Werte werden NaN
-    filtered_df["gelernt"] = (
-        pd.to_numeric(filtered_df["gelernt"], errors="coerce").fillna(0).astype(int)
-    )
+    # 'gelernt' ohne Angabe zählt als nicht gelernt
+    filtered_df["gelernt"] = filtered_df["gelernt"].fillna(0).astype(int)
 
     # 1. Metriken: Ø Bewertung und Gelernt-Anteil
     plot_feedback_metrics(filtered_df)
@@ -414,7 +463,9 @@ def plot_feedback_metrics(df: pd.DataFrame):
     """
     st.subheader("🔢 Kennzahlen")
 
-    avg_rating = df["bewertung"].mean().round(2) if not df.empty else -2
+    # bewertung ist Int64: ohne gültige Werte liefert mean() pd.NA
+    mean = df["bewertung"].mean() if not df.empty else pd.NA
+    avg_rating = round(float(mean), 2) if pd.notna(mean) else "-"
 
     gelernt_pct = (
         (df["gelernt"].sum() / len(df) * 100).round(1) if not df.empty else "-"
@@ -430,6 +481,9 @@ def plot_feedback_boxplot(df: pd.DataFrame):
     """
     Plottet einen Boxplot der Bewertungen.
     """
+    import matplotlib.pyplot as plt
+    import seaborn as sns
+
     st.subheader("🎯 Verteilung der Bewertungen")
     if df.empty:
         st.info("Keine Bewertungen im gewählten Zeitraum.")
@@ -448,6 +502,9 @@ def plot_feedback_gelernt_hist(df: pd.DataFrame):
     """
     Zeigt ein Histogramm, wie oft 'gelernt' angegeben wurde.
     """
+    import matplotlib.pyplot as plt
+    import seaborn as sns
+
     st.subheader("🧠 Anteil 'Gelernt'")
 
     if df.empty:
@@ -487,7 +544,8 @@ def show_feedback_comments(df: pd.DataFrame):
         timestamp_dt = pd.to_datetime(timestamp_raw, utc=True)
         timestamp_local = fmt_local(timestamp_dt)
 
-        rating = int(row.get("bewertung", 0))
+        bewertung = row.get("bewertung")
+        rating = int(bewertung) if pd.notna(bewertung) else 0
         gelernt = row.get("gelernt", 0)
 
         # Bewertung als Sterne oder Zahl
@@ -0,0 +1,158 @@
+"""bundle_utils.py – Vorkompilierte Szenen-Bundles für die Detektiv-Seite.
+
+Pro Szene werden CVAT-XML (Polygone), Lerntexte und Bildgrössen einmal in ein
+kleines JSON-Bundle übersetzt. Zur Laufzeit liest die Seite nur noch das
+Bundle – ohne XML-Parser und ohne geopandas.
+
+Bauen (z. B. beim Deployment):
+
+    python -m utils.bundle_utils            # alle Szenen
+    python -m utils.bundle_utils Dorf --force
+
+Ändert sich eine Quelldatei (Inhalt der Texte, Grösse/Änderungszeit der
+Bilder), passt der Quellschlüssel nicht mehr und das Bundle wird beim nächsten
+Zugriff neu kompiliert.
+"""
+
+from __future__ import annotations
+
+import argparse
+import hashlib
+import json
+import os
+import threading
+from pathlib import Path
+
+from PIL import Image
+
+from utils.pyramid_utils import VARIANTS, scenes
+from utils.utils import get_base_path
+
+BUNDLE_PATH = Path(__file__).parent.parent / ".cache" / "scenes"
+BUNDLE_VERSION = 1  # erhöhen, wenn sich das Format ändert
+
+_build_lock = threading.Lock()
+
+
+def _sources(scene: str) -> dict[str, Path]:
+    bp = get_base_path("detective")
+    return {
+        "xml": bp / f"{scene}.xml",
+        "lerntexte": bp / f"{scene}_lerntexte.md",
+        **{v: bp / f"{scene}_{v}.png" for v in VARIANTS},
+    }
+
+
+def _source_key(scene: str) -> dict[str, str]:
+    """Hash der Texte, Grösse + Änderungszeit der (grossen) Bilder."""
+    key = {}
+    for name, path in _sources(scene).items():
+        if path.suffix == ".png":
+            stat = path.stat()
+            key[name] = f"{stat.st_size}-{stat.st_mtime_ns}"
+        else:
+            key[name] = hashlib.sha1(path.read_bytes()).hexdigest()
+    return key
+
+
+# ────────────────────────── Quellen lesen ───────────────────────────
+def read_cvat_polygons(xml_path: Path, scene: str) -> list[dict]:
+    """Polygone des veränderten Bildes in relativen Koordinaten (0-1)."""
+    import xml.etree.ElementTree as ET  # nur beim Kompilieren gebraucht
+
+    root = ET.parse(xml_path).getroot()
+    polygons = []
+    for img in root.iter("image"):
+        if img.get("name") != f"{scene}_verändert.png":
+            continue
+        w, h = float(img.get("width")), float(img.get("height"))
+        for p in img.iter("polygon"):
+            pts = [
+                tuple(map(float, pt.split(","))) for pt in p.get("points").split(";")
+            ]
+            polygons.append(
+                {"label": p.get("label"), "points": [[x / w, y / h] for x, y in pts]}
+            )
+    return polygons
+
+
+def read_lerntexte(md_path: Path) -> dict[str, str]:
+    """Markdown mit `# Label`-Überschriften → {Label: Text}."""
+    lines = md_path.read_text(encoding="utf-8").splitlines()
+    out, key, buf = {}, None, []
+    for ln in lines:
+        if ln.startswith("# "):
+            if key:
+                out[key] = "\n".join(buf).strip()
+            key, buf = ln[2:].strip(), []
+        else:
+            buf.append(ln)
+    if key:
+        out[key] = "\n".join(buf).strip()
+    return out
+
+
+# ────────────────────────── Kompilieren & Laden ─────────────────────
+def _bundle_path(scene: str) -> Path:
+    return BUNDLE_PATH / f"{scene}.json"
+
+
+def load_bundle(scene: str) -> dict | None:
+    """Bundle der Szene, falls vorhanden und aktuell; sonst None."""
+    try:
+        bundle = json.loads(_bundle_path(scene).read_text(encoding="utf-8"))
+    except (OSError, ValueError):
+        return None
+    if bundle.get("version") != BUNDLE_VERSION or bundle.get("source") != _source_key(
+        scene
+    ):
+        return None
+    return bundle
+
+
+def compile_scene(scene: str, force: bool = False) -> dict:
+    """Übersetzt die Quellen einer Szene in ein Bundle (atomar geschrieben)."""
+    with _build_lock:
+        bundle = None if force else load_bundle(scene)
+        if bundle is not None:
+            return bundle
+
+        sources = _sources(scene)
+        sizes = {}
+        for variant in VARIANTS:
+            with Image.open(sources[variant]) as img:  # liest nur den Header
+                sizes[variant] = list(img.size)
+        bundle = {
+            "version": BUNDLE_VERSION,
+            "scene": scene,
+            "source": _source_key(scene),
+            "size": sizes["verändert"],
+            "sizes": sizes,
+            "polygons": read_cvat_polygons(sources["xml"], scene),
+            "lerntexte": read_lerntexte(sources["lerntexte"]),
+        }
+        BUNDLE_PATH.mkdir(parents=True, exist_ok=True)
+        tmp = _bundle_path(scene).with_suffix(f".{os.getpid()}.tmp")
+        tmp.write_text(json.dumps(bundle, ensure_ascii=False), "utf-8")
+        tmp.replace(_bundle_path(scene))
+        return bundle
+
+
+def ensure_bundle(scene: str) -> dict:
+    """Aktuelles Bundle der Szene; kompiliert nur, wenn nötig."""
+    return load_bundle(scene) or compile_scene(scene)
+
+
+def main(argv: list[str] | None = None) -> None:
+    parser = argparse.ArgumentParser(description="Kompiliert die Szenen-Bundles.")
+    parser.add_argument("scenes", nargs="*", help="Standard: alle Szenen")
+    parser.add_argument("--force", action="store_true", help="auch wenn aktuell")
+    args = parser.parse_args(argv)
+    for scene in args.scenes or scenes():
+        bundle = compile_scene(scene, force=args.force)
+        size = _bundle_path(scene).stat().st_size
+        print(f"{scene}: {len(bundle['polygons'])} Polygone, {size / 1024:.1f} KB")
+
+
+if __name__ == "__main__":
+    main()
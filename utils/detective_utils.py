@@ -2,24 +2,31 @@
 
 from __future__ import annotations
 
+import hashlib
+import math
 import os
-import xml.etree.ElementTree as ET
 from pathlib import Path
 from typing import Iterable
 
 
+import numpy as np
 import pandas as pd
-import geopandas as gpd
-import matplotlib.pyplot as plt
+import shapely
 from PIL import Image, ImageDraw
 from shapely.geometry import Polygon
 from shapely.geometry.base import BaseGeometry
 import streamlit as st
 from shapely.affinity import scale as shp_scale
-from shapely.ops import transform
+from utils.outbox_utils import new_round_id
+from utils.bundle_utils import ensure_bundle, read_cvat_polygons
+from utils.clicklog_utils import ClickLog, FoundTimes, iter_points
+from utils.image_utils import ImageStore
+from utils.pyramid_utils import ensure_pyramid, level_paths, snap_width
 from utils.utils import get_base_path
 
 PIXEL_BUFFER = 5.0  # Pixel-Puffer für Klick-Regionen
+MASK_CACHE_PATH = Path(__file__).parent.parent / ".cache" / "detective"
+MASK_VERSION = 1  # erhöhen, wenn sich die Rasterung ändert
 
 
 # ────────────────────────── Session-State init ─────────────────────
@@ -30,9 +37,11 @@ def init_state() -> None:
         spielname="",
         alter=None,
         start_time=None,
+        runden_id=new_round_id(),
         gefunden=[],
-        all_pts=[],  # [(x, y, hit_bool), …]
-        found_data=pd.DataFrame(columns=["label", "sekunden_seit_start"]),
+        all_pts=ClickLog(),  # rel_x, rel_y, hit, t als Arrays
+        marker_layer=None,  # inkrementelle Klick-Ebene, siehe MarkerLayer
+        found_data=FoundTimes(),  # Label → Sekunden seit Start
         letzte_meldung="",
         last_click_original=(None, None),
         last_click_klima=(None, None),
@@ -49,9 +58,11 @@ def reset_session_state_on_scene_change(scene: str) -> None:
         spiel_started=False,
         feedback=False,
         start_time=None,
+        runden_id=new_round_id(),
         gefunden=[],
-        all_pts=[],  # [(x, y, hit_bool), …]
-        found_data=pd.DataFrame(columns=["label", "sekunden_seit_start"]),
+        all_pts=ClickLog(),  # rel_x, rel_y, hit, t als Arrays
+        marker_layer=None,  # inkrementelle Klick-Ebene, siehe MarkerLayer
+        found_data=FoundTimes(),  # Label → Sekunden seit Start
         letzte_meldung="",
         last_click_original=(None, None),
         last_click_klima=(None, None),
@@ -64,11 +75,20 @@ def reset_session_state_on_scene_change(scene: str) -> None:
 
 # ────────────────────────── Bild-I/O ────────────────────────────────
 @st.cache_resource
+def get_image_store() -> ImageStore:
+    """Ein Speicher dekodierter Bilder pro Server-Prozess (räumt beim Start auf)."""
+    store = ImageStore()
+    store.prune_raw()
+    return store
+
+
 def load_images(scene: str) -> tuple[Image.Image, Image.Image]:
+    """Originalbilder (unverändert, verändert) als schreibgeschützte RGBA-Bilder."""
     bp = get_base_path("detective")
+    store = get_image_store()
     return (
-        Image.open(bp / f"{scene}_unverändert.png"),
-        Image.open(bp / f"{scene}_verändert.png"),
+        store.get(bp / f"{scene}_unverändert.png"),
+        store.get(bp / f"{scene}_verändert.png"),
     )
 
 
@@ -91,38 +111,101 @@ def show_schwierigkeitstufe(scene: str) -> int:
 
 
 # ────────────────────────── Bild-Skalierung ─────────────────────────
-@st.cache_data(show_spinner=False)
-def get_scene_scaled(scene: str, display_w: int):
-    img_orig, img_klima = load_images(scene)
+@st.cache_resource(show_spinner=False)
+def get_pyramid(scene: str) -> dict:
+    """Manifest der vorskalierten Bildstufen (baut sie einmalig, falls nötig)."""
+    return ensure_pyramid(scene)
+
 
-    s = display_w / img_orig.width
-    new_h = int(img_orig.height * s)
-    size = (display_w, new_h)
+def load_pyramid_level(scene: str, width: int) -> tuple[Image.Image, Image.Image]:
+    """Vorskalierte Bilder einer Breitenklasse (RGBA, schreibgeschützt)."""
+    store = get_image_store()
+    paths = level_paths(scene, get_pyramid(scene), width)
+    return tuple(store.get(path) for path in paths)
 
-    img_orig_s = img_orig.resize(size, Image.Resampling.LANCZOS)
-    img_klima_s = img_klima.resize(size, Image.Resampling.LANCZOS)
 
-    gdf_rel = parse_cvat_xml(scene)  # bereits 0-1
+def get_scene_scaled(scene: str, display_w: int):
+    """
+    Liefert die Bilder in der Breitenklasse, die display_w am nächsten liegt
+    (ohne Hochskalieren), plus Polygone und Skalierungsfaktor der Stufe.
+    Die Anzeige skaliert im Browser auf display_w; Klicks sind relativ (0-1).
+    """
+    manifest = get_pyramid(scene)
+    width = snap_width(display_w, tuple(int(w) for w in manifest["levels"]))
+    img_orig_s, img_klima_s = load_pyramid_level(scene, width)
+
+    s = width / manifest["size"][0]
+    gdf_rel = load_scene_polygons(scene)  # bereits 0-1
 
     return img_orig_s, img_klima_s, gdf_rel, s
 
 
 # ────────────────────────── Marker-Overlay ──────────────────────────
+COL_HIT, COL_MISS = (0, 200, 0), (230, 0, 0)
+POLY_FILL, POLY_OUTLINE = (0, 255, 0, 80), (0, 180, 0, 180)
+
+
+def _polygon_overlay(
+    size: tuple[int, int], gdf_rel: pd.DataFrame, gefunden: Iterable[str]
+) -> Image.Image:
+    """Transparente Ebene mit den Polygonen der gefundenen Unterschiede."""
+    overlay = Image.new("RGBA", size, (0, 0, 0, 0))
+    draw = ImageDraw.Draw(overlay, "RGBA")
+    w, h = size
+    for poly_rel in gdf_rel[gdf_rel["label"].isin(list(gefunden))].geometry:
+        exterior = [(x * w, y * h) for x, y in poly_rel.exterior.coords]
+        draw.polygon(exterior, fill=POLY_FILL, outline=POLY_OUTLINE)
+    return overlay
+
+
+class MarkerLayer:
+    """
+    Transparente Klick-Ebene einer Runde. `update` zeichnet nur die Klicks, die
+    seit dem letzten Aufruf dazugekommen sind – der Aufwand pro Klick bleibt
+    damit gleich, egal wie viele Klicks schon auf dem Bild sind.
+    """
+
+    def __init__(self, size: tuple[int, int], radius: float, lwd_width: int):
+        self.key = (tuple(size), radius, lwd_width)
+        self.image = Image.new("RGBA", size, (0, 0, 0, 0))
+        self._draw = ImageDraw.Draw(self.image, "RGBA")
+        self.count = 0
+
+    def update(self, pts: ClickLog | list) -> Image.Image:
+        if len(pts) < self.count:  # neue Runde oder Klicks verworfen
+            self.image.paste((0, 0, 0, 0), (0, 0, *self.image.size))
+            self.count = 0
+        w, h = self.image.size
+        r = self.key[1]
+        for rel_x, rel_y, hit in iter_points(pts, self.count):
+            x, y = rel_x * w, rel_y * h
+            c = COL_HIT if hit else COL_MISS
+            self._draw.ellipse(
+                (x - r, y - r, x + r, y + r),
+                fill=c + (140,),
+                outline=c + (255,),
+                width=self.key[2],
+            )
+        self.count = len(pts)
+        return self.image
+
+
 def draw_markers_on_images(
     img1: Image.Image,
     img2: Image.Image,
-    pts: list,
-    gdf_rel: gpd.GeoDataFrame = None,
+    pts: ClickLog | list,
+    gdf_rel: pd.DataFrame = None,
     gefunden: list = None,
     radius: int = 18,
     lwd_width: int = 2,
 ) -> tuple:
     """
     Zeichnet Markierungen (Klickpunkte und optionale Polygone) auf zwei Bilder.
+    Ohne Caching; im Spiel übernimmt `render_marked_scene` mit gecachten Ebenen.
     Args:
         img1 (PIL.Image.Image): Erstes Bild, auf das Markierungen gezeichnet werden.
         img2 (PIL.Image.Image): Zweites Bild, auf das Markierungen gezeichnet werden.
-        pts (list): Liste von Dictionaries mit Punktkoordinaten (rel_x, rel_y) und Trefferstatus ("hit").
+        pts (ClickLog | list): Klicks als ClickLog oder Liste von Dictionaries (rel_x, rel_y, hit).
         gdf_rel (geopandas.GeoDataFrame, optional): GeoDataFrame mit Polygonen im relativen Koordinatensystem.
         gefunden (list, optional): Liste von Polygon-Labels, die als "gefunden" markiert und hervorgehoben werden sollen.
         radius (int, optional): Radius der Markierungskreise. Standard: 18.
@@ -130,91 +213,184 @@ def draw_markers_on_images(
     Returns:
         tuple: Zwei PIL.Image.Image-Objekte mit den eingezeichneten Markierungen.
     """
-    col_hit, col_miss = (0, 200, 0), (230, 0, 0)
-    poly_fill, poly_outline = (0, 255, 0, 80), (0, 180, 0, 180)
-
-    def _scale(x_rel, y_rel, img):
-        return x_rel * img.width, y_rel * img.height
+    markers = MarkerLayer(img1.size, radius, lwd_width).update(pts)
+    polygons = None
+    if gdf_rel is not None and gefunden:
+        polygons = _polygon_overlay(img1.size, gdf_rel, gefunden)
 
     def _with_overlay(base: Image.Image) -> Image.Image:
-        base_rgba = base.convert("RGBA")
-        draw = ImageDraw.Draw(base_rgba, "RGBA")
-
-        # 1) Klickmarker
-        for pt in pts:
-            x, y = _scale(pt["rel_x"], pt["rel_y"], base)
-            c = col_hit if pt["hit"] else col_miss
-            draw.ellipse(
-                (x - radius, y - radius, x + radius, y + radius),
-                fill=c + (140,),
-                outline=c + (255,),
-                width=lwd_width,
-            )
+        out = Image.alpha_composite(base.convert("RGBA"), markers)
+        return Image.alpha_composite(out, polygons) if polygons is not None else out
 
-        # 2) Polygone (gefunden)
-        if gdf_rel is not None and gefunden:
-            overlay = Image.new("RGBA", base_rgba.size, (0, 0, 0, 0))
-            draw_ov = ImageDraw.Draw(overlay, "RGBA")
-            for poly_rel in gdf_rel[gdf_rel["label"].isin(gefunden)].geometry:
-                exterior = [_scale(x, y, base) for x, y in poly_rel.exterior.coords]
-                draw_ov.polygon(exterior, fill=poly_fill, outline=poly_outline)
-            base_rgba = Image.alpha_composite(base_rgba, overlay)
+    return _with_overlay(img1), _with_overlay(img2)
 
-        return base_rgba
 
-    return _with_overlay(img1), _with_overlay(img2)
+@st.cache_resource(show_spinner=False, max_entries=64)
+def get_found_layer(scene: str, width: int, gefunden: tuple[str, ...]) -> Image.Image:
+    """Polygon-Ebene pro Szene, Breite und Menge gefundener Labels."""
+    size = load_pyramid_level(scene, width)[0].size
+    return _polygon_overlay(size, load_scene_polygons(scene), gefunden)
+
+
+def render_marked_scene(
+    scene: str,
+    width: int,
+    pts: ClickLog | list,
+    gefunden: list,
+    radius: float,
+    lwd_width: int,
+    state_key: str = "marker_layer",
+) -> tuple[Image.Image, Image.Image]:
+    """
+    Wie `draw_markers_on_images`, aber aus Ebenen zusammengesetzt:
+    RGBA-Basis pro (Szene, Breite) und Polygon-Ebene pro gefundener Menge sind
+    gecacht, die Klick-Ebene liegt in der Session und wächst inkrementell.
+    Pro Rerun bleiben zwei Alpha-Composites, unabhängig von der Klickzahl.
+    """
+    base1, base2 = load_pyramid_level(scene, width)
+    layer = st.session_state.get(state_key)
+    if layer is None or layer.key != (base1.size, radius, lwd_width):
+        layer = st.session_state[state_key] = MarkerLayer(base1.size, radius, lwd_width)
+    markers = layer.update(pts)
+
+    found = tuple(sorted(gefunden))
+    if found:
+        polygons = get_found_layer(scene, width, found)
+        markers = Image.alpha_composite(markers, polygons)
+    return Image.alpha_composite(base1, markers), Image.alpha_composite(base2, markers)
+
+
+# ────────────────────────── Szenen-Bundle ───────────────────────────
+@st.cache_resource(show_spinner=False)
+def get_scene_bundle(scene: str) -> dict:
+    """Kompiliertes Bundle (Polygone, Lerntexte, Bildgrössen) der Szene."""
+    return ensure_bundle(scene)
+
+
+@st.cache_resource
+def load_scene_polygons(scene: str) -> pd.DataFrame:
+    """
+    Polygone (Spalten label, geometry) in RELATIVEN Koordinaten (0-1),
+    direkt aus dem Bundle – ohne XML und ohne geopandas.
+    """
+    polygons = get_scene_bundle(scene)["polygons"]
+    return pd.DataFrame(
+        {
+            "label": [p["label"] for p in polygons],
+            "geometry": [Polygon(p["points"]) for p in polygons],
+        }
+    )
 
 
-# ────────────────────────── CVAT-Polygone ───────────────────────────
 @st.cache_resource
-def parse_cvat_xml(scene: str) -> gpd.GeoDataFrame:
+def parse_cvat_xml(scene: str):
     """
     Gibt GeoDataFrame in RELATIVEN Koordinaten (0-1) zurück.
+    Liest die CVAT-XML direkt (für Analysen); die Seite nutzt `load_scene_polygons`.
     """
-    xml_path = get_base_path("detective") / f"{scene}.xml"
-    root = ET.parse(xml_path).getroot()
+    import geopandas as gpd
+
+    polygons = read_cvat_polygons(get_base_path("detective") / f"{scene}.xml", scene)
+    return gpd.GeoDataFrame(
+        {
+            "label": [p["label"] for p in polygons],
+            "geometry": [Polygon(p["points"]) for p in polygons],
+        }
+    )
 
-    geoms, labels = [], []
-    for img in root.iter("image"):
-        if img.get("name") != f"{scene}_verändert.png":
-            continue
 
-        w, h = float(img.get("width")), float(img.get("height"))
+# ────────────────────────── Treffer-Prüfung ─────────────────────────
+class LabelMask:
+    """
+    Label-Raster einer Szene in Originalauflösung: Pixel → Label-ID (0 = kein
+    Unterschied, i = i-tes Polygon aus load_scene_polygons). Einen Klick zu
+    klassifizieren ist damit ein einziger Array-Zugriff.
+
+    Gerastert wird über die Pixelmittelpunkte: erstes Polygon in der
+    CVAT-Reihenfolge gewinnt, Punkte genau auf dem Rand zählen (wie bei
+    `contains`) nicht als Treffer.
+    """
 
-        # Helper, um x/w und y/h anzuwenden
-        scale_to_unit = lambda x, y, z=None: (x / w, y / h)
+    def __init__(self, mask: np.ndarray, labels: np.ndarray):
+        self.mask = mask
+        self.labels = np.r_[np.array([None], dtype=object), labels.astype(object)]
+        self.height, self.width = mask.shape
+
+    @classmethod
+    def rasterize(cls, gdf_rel: pd.DataFrame, width: int, height: int):
+        n = len(gdf_rel)
+        mask = np.zeros((height, width), dtype=np.uint8 if n < 255 else np.uint16)
+        geoms = list(gdf_rel.geometry)
+        # Rückwärts zeichnen, damit bei Überlappung das erste Polygon gewinnt
+        for i in reversed(range(n)):
+            geom = geoms[i]
+            minx, miny, maxx, maxy = geom.bounds
+            x0, x1 = max(int(minx * width), 0), min(math.ceil(maxx * width), width)
+            y0, y1 = max(int(miny * height), 0), min(math.ceil(maxy * height), height)
+            if x0 >= x1 or y0 >= y1:
+                continue
+            xs = (np.arange(x0, x1) + 0.5) / width
+            ys = (np.arange(y0, y1) + 0.5) / height
+            inside = shapely.contains_xy(geom, *np.meshgrid(xs, ys))
+            mask[y0:y1, x0:x1][inside] = i + 1
+        return cls(mask, gdf_rel["label"].to_numpy(dtype=str))
+
+    # ► Nachschlagen
+    def label_ids(self, rel_x, rel_y) -> np.ndarray:
+        """Label-ID pro Klick (vektorisiert); Klicks ausserhalb des Bildes → 0."""
+        x = np.floor(np.asarray(rel_x, float) * self.width)
+        y = np.floor(np.asarray(rel_y, float) * self.height)
+        valid = (x >= 0) & (x < self.width) & (y >= 0) & (y < self.height)
+        ids = np.zeros(x.shape, dtype=self.mask.dtype)
+        ids[valid] = self.mask[y[valid].astype(np.intp), x[valid].astype(np.intp)]
+        return ids
+
+    def locate(self, rel_x: float, rel_y: float) -> str | None:
+        """Label unter dem Klick oder None."""
+        x, y = int(rel_x * self.width), int(rel_y * self.height)
+        if rel_x < 0 or rel_y < 0 or x >= self.width or y >= self.height:
+            return None
+        return self.labels[self.mask[y, x]]
+
+    def locate_many(self, rel_x, rel_y) -> np.ndarray:
+        """Wie `locate` für ganze Arrays von Klicks; Fehlklicks → None."""
+        return self.labels[self.label_ids(rel_x, rel_y)]
+
+    # ► Disk-Cache
+    def save(self, path: Path) -> None:
+        path.parent.mkdir(parents=True, exist_ok=True)
+        tmp = path.with_suffix(f".{os.getpid()}.tmp.npz")
+        np.savez_compressed(tmp, mask=self.mask, labels=self.labels[1:].astype(str))
+        tmp.replace(path)
+
+    @classmethod
+    def load(cls, path: Path) -> "LabelMask":
+        with np.load(path) as data:
+            return cls(data["mask"], data["labels"])
+
+
+def _mask_path(scene: str) -> Path:
+    """Cache-Datei pro Szene; der Name ändert sich mit dem Inhalt der CVAT-XML."""
+    xml_hash = get_scene_bundle(scene)["source"]["xml"]
+    digest = hashlib.sha1((xml_hash + str(MASK_VERSION)).encode()).hexdigest()[:12]
+    return MASK_CACHE_PATH / f"{scene}-{digest}.npz"
 
-        for p in img.iter("polygon"):
-            pts = [
-                tuple(map(float, pt.split(","))) for pt in p.get("points").split(";")
-            ]
-            geom_px = Polygon(pts)
-            geom_rel = transform(scale_to_unit, geom_px)  # → 0-1-Polygon
-            geoms.append(geom_rel)
-            labels.append(p.get("label"))
 
-    return gpd.GeoDataFrame({"label": labels, "geometry": geoms})
+@st.cache_resource
+def get_label_mask(scene: str) -> LabelMask:
+    """Label-Raster einer Szene; von der Platte oder einmalig gerastert."""
+    path = _mask_path(scene)
+    if path.exists():
+        return LabelMask.load(path)
+    width, height = get_scene_bundle(scene)["size"]
+    label_mask = LabelMask.rasterize(load_scene_polygons(scene), width, height)
+    label_mask.save(path)
+    return label_mask
 
 
 # ────────────────────────── Lerntexte ───────────────────────────────
-@st.cache_resource
 def load_lerntexte(scene: str) -> dict[str, str]:
-    f = (
-        (get_base_path("detective") / f"{scene}_lerntexte.md")
-        .read_text(encoding="utf-8")
-        .splitlines()
-    )
-    out, key, buf = {}, None, []
-    for ln in f:
-        if ln.startswith("# "):
-            if key:
-                out[key] = "\n".join(buf).strip()
-            key, buf = ln[2:].strip(), []
-        else:
-            buf.append(ln)
-    if key:
-        out[key] = "\n".join(buf).strip()
-    return out
+    return get_scene_bundle(scene)["lerntexte"]
 
 
 # ────────────────────────── Debug-Overlay ───────────────────────────
@@ -229,21 +405,20 @@ def scale_geometry_to_pixels(
 def plot_images_with_differences(
     img1: Image.Image,
     img2: Image.Image,
-    gdf: gpd.GeoDataFrame,
+    gdf: pd.DataFrame,
     c1: tuple[float, float] | None = None,
     c2: tuple[float, float] | None = None,
 ):
+    import matplotlib.pyplot as plt  # nur im Debug-Modus gebraucht
+
     fig, ax = plt.subplots(figsize=(10, 8))
     ax.imshow(img1)
     ax.imshow(img2, alpha=0.5)
 
     # Geometrien (relativ) in Pixel umrechnen
-    gdf_abs = gdf.copy()
-    gdf_abs["geometry"] = gdf_abs["geometry"].apply(
-        lambda geom: scale_geometry_to_pixels(geom, img1.width, img1.height)
-    )
-
-    gdf_abs.boundary.plot(ax=ax, color="red", linewidth=2)
+    for geom in gdf.geometry:
+        geom_px = scale_geometry_to_pixels(geom, img1.width, img1.height)
+        ax.plot(*geom_px.exterior.xy, color="red", linewidth=2)
 
     if c1:
         x1 = c1[0] * img1.width
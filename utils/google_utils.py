@@ -1,90 +1,505 @@
+import atexit
+import threading
+import time
+from contextlib import AbstractContextManager, nullcontext
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timezone
+from pathlib import Path
+
 import gspread
+from google.auth.transport.requests import Request
 from google.oauth2.service_account import Credentials
-from datetime import datetime
-from pathlib import Path
 import streamlit as st
 import pandas as pd
+from utils.clicklog_utils import ClickLog, FoundTimes, format_punkte
+from utils.outbox_utils import Outbox, OutboxRow, WriteTicket, new_round_id
+from utils.quota_utils import READ, WRITE, PRIORITY_PLAYER, SheetsScheduler
+from utils.storage_utils import (
+    StorageBackend,
+    filter_by_timestamp,
+    get_storage_backend,
+)
+from utils.schema_utils import parse_values
 from utils.time_utils import now_utc, fmt_utc
 
+SCOPES = [
+    "https://www.googleapis.com/auth/spreadsheets",
+    "https://www.googleapis.com/auth/drive",
+]
+TOKEN_REFRESH_MARGIN = 300  # Sekunden vor Ablauf wird das Token erneuert
+TOKEN_RETRY_DELAY = 30  # Sekunden Pause nach fehlgeschlagenem Refresh
+HEADER_ATTEMPTS = 5  # Versuche, neue Spalten an die Kopfzeile anzufügen
 
-# ────────────────────────── Google Sheets ──────────────────────────
-def init_gsheet(sheet_name: str) -> gspread.Spreadsheet:
-    """Initialisiert Google Sheet Zugriff mit modernem google-auth Ansatz."""
-    scope = [
-        "https://www.googleapis.com/auth/spreadsheets",
-        "https://www.googleapis.com/auth/drive",
-    ]
 
+# ────────────────────────── Google Sheets ──────────────────────────
+def _load_credentials() -> Credentials:
+    """Lädt die Service-Account-Credentials aus st.secrets oder credentials.json."""
     if "gcp_service_account" in st.secrets:
         creds_dict = st.secrets["gcp_service_account"]
-        creds = Credentials.from_service_account_info(creds_dict, scopes=scope)
-    else:
-        credentials_path = Path(__file__).parent.parent / "credentials.json"
-        creds = Credentials.from_service_account_file(
-            str(credentials_path), scopes=scope
+        return Credentials.from_service_account_info(creds_dict, scopes=SCOPES)
+
+    credentials_path = Path(__file__).parent.parent / "credentials.json"
+    return Credentials.from_service_account_file(str(credentials_path), scopes=SCOPES)
+
+
+class HeaderRegistry:
+    """
+    Kopfzeilen-Cache pro Worksheet.
+
+    Liest nur Zeile 1 (einmal pro Worksheet und Prozess) und erweitert das
+    Schema bei neuen Spalten in place, indem die fehlenden Namen rechts an die
+    Kopfzeile geschrieben werden (bei einem neuen Worksheet die ganze Kopfzeile
+    in Zeile 1). Bestehende Datenzeilen werden nie gelesen oder neu hochgeladen.
+
+    Erweitert wird unter einer prozessübergreifenden Sperre (`lock`, siehe
+    Outbox.schema_lock). Danach wird Zeile 1 erneut gelesen: Hat ein Writer auf
+    einem anderen Rechner dieselben Zellen überschrieben, wird neu angefügt.
+    """
+
+    def __init__(self, scheduler: SheetsScheduler):
+        self._lock = threading.Lock()
+        self._headers: dict[tuple[str, int], list[str]] = {}
+        self._scheduler = scheduler
+
+    @staticmethod
+    def _key(ws: gspread.Worksheet) -> tuple[str, int]:
+        return (ws.spreadsheet_id, ws.id)
+
+    def get(self, ws: gspread.Worksheet) -> list[str]:
+        with self._lock:
+            header = self._headers.get(self._key(ws))
+        if header is None:
+            header = self._scheduler.call(READ, ws.row_values, 1)
+            with self._lock:
+                self._headers[self._key(ws)] = header
+        return list(header)
+
+    def ensure(
+        self,
+        ws: gspread.Worksheet,
+        columns: list[str],
+        lock: AbstractContextManager | None = None,
+    ) -> list[str]:
+        """Stellt sicher, dass alle `columns` in der Kopfzeile stehen; gibt sie zurück."""
+        header = self.get(ws)
+        if all(c in header for c in columns):
+            return header
+
+        with lock or nullcontext():
+            for _ in range(HEADER_ATTEMPTS):
+                # Frisch lesen (anderer Prozess könnte schneller gewesen sein)
+                header = self._scheduler.call(READ, ws.row_values, 1)
+                missing = [c for c in columns if c not in header]
+                if not missing:
+                    break
+                width = len(header) + len(missing)
+                if width > ws.col_count:
+                    self._scheduler.call(WRITE, ws.add_cols, width - ws.col_count)
+                start = gspread.utils.rowcol_to_a1(1, len(header) + 1)
+                self._scheduler.call(WRITE, ws.update, [missing], range_name=start)
+                written = self._scheduler.call(READ, ws.row_values, 1)
+                if written[:width] == header + missing:
+                    header = written
+                    break
+            else:
+                raise RuntimeError(
+                    f"Kopfzeile von '{ws.title}' liess sich nicht erweitern: {missing}"
+                )
+        with self._lock:
+            self._headers[self._key(ws)] = header
+        return list(header)
+
+    def invalidate(self, spreadsheet_id: str | None = None) -> None:
+        with self._lock:
+            if spreadsheet_id is None:
+                self._headers.clear()
+                return
+            for key in [k for k in self._headers if k[0] == spreadsheet_id]:
+                del self._headers[key]
+
+
+class GSheetPool:
+    """
+    Prozessweiter, threadsicherer Google-Sheets-Client.
+
+    Autorisiert einmal pro Prozess, löst Sheet-Namen einmalig zu Keys auf und
+    hält Spreadsheet- und Worksheet-Handles im Speicher. Ein Hintergrund-Thread
+    erneuert das Access-Token, bevor es abläuft, damit kein Spielzug auf einen
+    Token-Refresh warten muss. Alle API-Aufrufe laufen über `scheduler`
+    (Kontingent, Priorität, Backoff – siehe quota_utils).
+    """
+
+    def __init__(self, refresh_margin: float = TOKEN_REFRESH_MARGIN):
+        self._lock = threading.RLock()
+        self._create_lock = threading.Lock()
+        self._refresh_margin = refresh_margin
+        self._stop = threading.Event()
+        self._creds: Credentials | None = None
+        self._client: gspread.Client | None = None
+        self._keys: dict[str, str] = {}
+        self._spreadsheets: dict[str, gspread.Spreadsheet] = {}
+        self._worksheets: dict[tuple[str, str], gspread.Worksheet] = {}
+        self.scheduler = SheetsScheduler()
+        self.headers = HeaderRegistry(self.scheduler)
+
+    # ► Client & Token
+    def client(self) -> gspread.Client:
+        with self._lock:
+            if self._client is None:
+                self._creds = _load_credentials()
+                self._client = gspread.authorize(self._creds)
+                self._start_refresher()
+            return self._client
+
+    def _start_refresher(self) -> None:
+        if not hasattr(self._creds, "refresh"):
+            return
+        threading.Thread(
+            target=self._refresh_loop, name="gsheet-token-refresh", daemon=True
+        ).start()
+
+    def _seconds_until_refresh(self) -> float:
+        expiry = getattr(self._creds, "expiry", None)
+        if expiry is None:
+            return 0.0  # noch kein Token geholt → sofort
+        now = datetime.now(timezone.utc).replace(tzinfo=None)  # google-auth: naive UTC
+        remaining = (expiry - now).total_seconds()
+        return max(0.0, remaining - self._refresh_margin)
+
+    def _refresh_loop(self) -> None:
+        delay = self._seconds_until_refresh()
+        while not self._stop.wait(delay):
+            try:
+                self._creds.refresh(Request())
+                delay = self._seconds_until_refresh()
+            except Exception:
+                delay = TOKEN_RETRY_DELAY
+
+    def close(self) -> None:
+        self._stop.set()
+
+    # ► Handles
+    # API-Aufrufe laufen ausserhalb von `_lock`: sonst wartet ein Spielzug mit
+    # hoher Priorität am Lock auf einen gedrosselten Lesezugriff. Öffnen zwei
+    # Threads gleichzeitig, gewinnt das zuerst eingetragene Handle.
+    def spreadsheet(self, sheet_name: str) -> gspread.Spreadsheet:
+        """Liefert das Spreadsheet; nach dem ersten Öffnen per Key statt per Name."""
+        with self._lock:
+            sh = self._spreadsheets.get(sheet_name)
+            key = self._keys.get(sheet_name)
+        if sh is not None:
+            return sh
+        client = self.client()
+        if key:
+            sh = self.scheduler.call(READ, client.open_by_key, key)
+        else:
+            sh = self.scheduler.call(READ, client.open, sheet_name)
+        with self._lock:
+            self._keys[sheet_name] = sh.id
+            return self._spreadsheets.setdefault(sheet_name, sh)
+
+    def worksheet(
+        self, sheet_name: str, title: str, cols: int | None = None
+    ) -> gspread.Worksheet:
+        """
+        Liefert ein Worksheet-Handle aus dem Cache.
+        Fehlt das Worksheet und ist `cols` gesetzt, wird es angelegt.
+        """
+        with self._lock:
+            ws = self._worksheets.get((sheet_name, title))
+        if ws is not None:
+            return ws
+        sh = self.spreadsheet(sheet_name)
+        try:
+            ws = self.scheduler.call(READ, sh.worksheet, title)
+        except gspread.exceptions.WorksheetNotFound:
+            if cols is None:
+                raise
+            ws = self._add_worksheet(sh, sheet_name, title, cols)
+        with self._lock:
+            return self._worksheets.setdefault((sheet_name, title), ws)
+
+    def _add_worksheet(
+        self, sh: gspread.Spreadsheet, sheet_name: str, title: str, cols: int
+    ) -> gspread.Worksheet:
+        # Eigener Lock nur fürs (seltene) Anlegen, damit es pro Prozess einmal passiert
+        with self._create_lock:
+            with self._lock:
+                ws = self._worksheets.get((sheet_name, title))
+            if ws is None:
+                ws = self.scheduler.call(
+                    WRITE,
+                    sh.add_worksheet,
+                    title=title,
+                    rows="1000",
+                    cols=str(cols),
+                )
+                with self._lock:
+                    self._worksheets[(sheet_name, title)] = ws
+            return ws
+
+    def worksheets(self, sheet_name: str) -> list[gspread.Worksheet]:
+        """Listet alle Worksheets (immer frisch) und aktualisiert den Handle-Cache."""
+        sh = self.spreadsheet(sheet_name)
+        wss = self.scheduler.call(READ, sh.worksheets)
+        with self._lock:
+            for ws in wss:
+                self._worksheets[(sheet_name, ws.title)] = ws
+        return wss
+
+    def invalidate(self, sheet_name: str | None = None) -> None:
+        """Verwirft zwischengespeicherte Handles (z. B. nach gelöschtem Worksheet)."""
+        with self._lock:
+            if sheet_name is None:
+                self._spreadsheets.clear()
+                self._worksheets.clear()
+                self.headers.invalidate()
+                return
+            if sheet_name in self._keys:
+                self.headers.invalidate(self._keys[sheet_name])
+            self._spreadsheets.pop(sheet_name, None)
+            for key in [k for k in self._worksheets if k[0] == sheet_name]:
+                del self._worksheets[key]
+
+
+@st.cache_resource
+def get_gsheet_pool() -> GSheetPool:
+    """Ein Client-Pool pro Server-Prozess, geteilt über alle Sessions."""
+    return GSheetPool()
+
+
+def init_gsheet(sheet_name: str) -> gspread.Spreadsheet:
+    """Liefert das (gecachte) Spreadsheet über den prozessweiten Client-Pool."""
+    return get_gsheet_pool().spreadsheet(sheet_name)
+
+
+# ────────────────────────── Write-Behind-Puffer ────────────────────
+FLUSH_INTERVAL_MS = 500  # spätestens nach so vielen ms wird geschrieben
+FLUSH_MAX_ROWS = 50  # … oder sobald so viele Zeilen warten
+ROUND_ID_COLUMN = "round_id"  # letzte Spalte jeder Ergebniszeile im Sheet
+
+
+class ResultWriter:
+    """
+    Ein Hintergrund-Schreiber pro Prozess.
+
+    Die save_*-Funktionen legen ihre Zeilen in der lokalen Outbox ab und kehren
+    sofort zurück. Der Writer liefert wartende Zeilen aller Sessions alle
+    FLUSH_INTERVAL_MS bzw. ab FLUSH_MAX_ROWS Zeilen mit EINEM append_rows pro
+    Worksheet aus. Beim Start werden liegen gebliebene Zeilen nachgeliefert.
+
+    Jede Zeile trägt ihre `round_id` in der Spalte ROUND_ID_COLUMN. Wird ein
+    Block erneut geliefert (abgelaufene Lease, Fehler nach dem Senden), liest
+    der Writer zuerst diese Spalte und lässt bereits vorhandene Runden weg.
+    """
+
+    def __init__(
+        self,
+        outbox: Outbox | None = None,
+        interval_ms: int = FLUSH_INTERVAL_MS,
+        max_rows: int = FLUSH_MAX_ROWS,
+    ):
+        self.outbox = outbox or Outbox()
+        self._interval = interval_ms / 1000
+        self._max_rows = max_rows
+        self._tickets: dict[str, WriteTicket] = {}
+        self._submitted = 0
+        self._cond = threading.Condition()
+        self._deliver_lock = threading.Lock()
+        self._closed = False
+        self._thread = threading.Thread(
+            target=self._run, name="gsheet-writer", daemon=True
+        )
+        self._thread.start()
+
+    def submit(
+        self,
+        sheet_name: str,
+        worksheet: str,
+        columns: list[str],
+        values: list,
+        cols: int = 10,
+        round_id: str | None = None,
+    ) -> WriteTicket:
+        """Legt eine Zeile idempotent in der Outbox ab (gleiche round_id = No-op)."""
+        round_id = round_id or new_round_id()
+        with self._cond:
+            ticket = self._tickets.get(round_id)
+            if ticket is None:
+                ticket = self._tickets[round_id] = WriteTicket(round_id)
+        inserted = self.outbox.put(
+            round_id, sheet_name, worksheet, columns, values, cols
         )
+        if not inserted and self.outbox.status(round_id) == "delivered":
+            ticket._resolve()
+        with self._cond:
+            self._submitted += 1
+            self._cond.notify()  # Writer plant seinen nächsten Termin neu
+        return ticket
+
+    def flush(self) -> None:
+        """Liefert alle fälligen Zeilen sofort (Tests, Prozessende)."""
+        with self._deliver_lock:
+            while self._drain():
+                pass
 
-    client = gspread.authorize(creds)
-    return client.open(sheet_name)
+    def close(self) -> None:
+        with self._cond:
+            self._closed = True
+            self._cond.notify()
+        self.flush()
+
+    def _run(self) -> None:
+        self.outbox.purge_delivered()
+        while True:
+            # Kein fester Takt: schlafen bis die nächste Zeile fällig ist – neue
+            # nach FLUSH_INTERVAL_MS, liegen gebliebene nach ihrem Backoff
+            with self._cond:
+                while not (self._closed or self._submitted >= self._max_rows):
+                    due = self.outbox.next_due(self._interval)
+                    if due is None:
+                        self._cond.wait()
+                        continue
+                    timeout = due - time.time()
+                    if timeout <= 0:
+                        break
+                    self._cond.wait(timeout)
+                if self._closed:
+                    return
+                self._submitted = 0
+            with self._deliver_lock:
+                while self._drain():
+                    pass
+
+    def _drain(self) -> bool:
+        """Liefert einen Block; True, wenn alles davon angekommen ist."""
+        batch = self.outbox.claim(self._max_rows)
+        if not batch:
+            return False
+
+        groups: dict[tuple, list[OutboxRow]] = {}
+        for row in batch:
+            groups.setdefault((row.sheet_name, row.worksheet, row.columns), []).append(
+                row
+            )
+
+        pool = get_gsheet_pool()
+        all_ok = True
+        for (sheet_name, worksheet, columns), rows in groups.items():
+            columns = (*columns, ROUND_ID_COLUMN)
+            try:
+                # Spielergebnisse haben Vorrang vor Lesezugriffen der Auswertung
+                with pool.scheduler.priority(PRIORITY_PLAYER):
+                    ws = pool.worksheet(sheet_name, worksheet, cols=rows[0].cols)
+                    header = pool.headers.ensure(
+                        ws, list(columns), lock=self.outbox.schema_lock()
+                    )
+                    if any(r.claims > 1 for r in rows):
+                        present = self._delivered_round_ids(ws, header)
+                        sent = [r for r in rows if r.round_id in present]
+                        self._resolve(sent)
+                        rows = [r for r in rows if r.round_id not in present]
+                    if rows:
+                        # Verankert an A1: Sheets hängt serverseitig hinter die
+                        # letzte Zeile der Tabelle an, auch bei parallelen Writern.
+                        # Nach 5xx nicht blind wiederholen (evtl. schon angehängt).
+                        pool.scheduler.call(
+                            WRITE,
+                            ws.append_rows,
+                            [
+                                _align_row(header, columns, [*r.values, r.round_id])
+                                for r in rows
+                            ],
+                            table_range="A1",
+                            idempotent=False,
+                        )
+            except Exception as e:
+                all_ok = False
+                pool.invalidate(sheet_name)
+                self.outbox.mark_failed([r.id for r in rows], e)
+                with self._cond:
+                    for r in rows:
+                        if r.round_id in self._tickets:
+                            self._tickets[r.round_id]._retry(e)
+                continue
+            self._resolve(rows)
+        return all_ok
+
+    @staticmethod
+    def _delivered_round_ids(ws: gspread.Worksheet, header: list[str]) -> set[str]:
+        """Runden, die schon im Worksheet stehen (eine Spalte lesen)."""
+        col = header.index(ROUND_ID_COLUMN) + 1
+        return set(get_gsheet_pool().scheduler.call(READ, ws.col_values, col)[1:])
+
+    def _resolve(self, rows: list[OutboxRow]) -> None:
+        if not rows:
+            return
+        self.outbox.mark_delivered([r.id for r in rows])
+        with self._cond:
+            for r in rows:
+                ticket = self._tickets.pop(r.round_id, None)
+                if ticket is not None:
+                    ticket._resolve()
+
+
+@st.cache_resource
+def get_result_writer() -> ResultWriter:
+    """Ein Write-Behind-Writer pro Server-Prozess; leert sich beim Beenden."""
+    writer = ResultWriter()
+    atexit.register(writer.close)
+    return writer
 
 
 # ────────────────────────── Ergebnisse speichern ───────────────────
 
 
+def _align_row(header: list[str], columns: tuple[str, ...], values: list) -> list:
+    """Ordnet Werte (in `columns`-Reihenfolge) den Spalten der Kopfzeile zu."""
+    if list(columns) == header:
+        return values
+    record = dict(zip(columns, values))
+    return [record.get(h, "") for h in header]
+
+
 # Landschaftsdetektiv
 def save_compare_results_to_gsheet(
-    df: pd.DataFrame,
+    df: FoundTimes | pd.DataFrame,
     scene: str,
     sheet_name: str = "Landschaftsdetektiv",
     spielname: str | None = None,
     alter: int | None = None,
-    all_pts: list[dict] | None = None,  # <- jetzt Dicts mit rel_x/rel_y/hit
-):
-    """Speichert eine Spielrunde als EINE Zeile (Labels = Spalten) plus Metadaten."""
-    sh = init_gsheet(sheet_name)
-
-    try:
-        ws = sh.worksheet(scene)
-        existing_data = ws.get_all_records()
-        existing_headers = list(existing_data[0].keys()) if existing_data else []
-    except gspread.exceptions.WorksheetNotFound:
-        ws = sh.add_worksheet(title=scene, rows="1000", cols="50")
-        existing_data, existing_headers = [], []
-
+    all_pts: ClickLog | list[dict] | None = None,  # ClickLog oder Dicts rel_x/rel_y/hit
+    round_id: str | None = None,
+) -> WriteTicket:
+    """
+    Speichert eine Spielrunde als EINE Zeile (Labels = Spalten) plus Metadaten.
+    Die Zeile landet zuerst in der lokalen Outbox; das Ticket meldet die
+    Lieferung an Sheets. Mit `round_id` ist mehrfaches Speichern derselben
+    Runde wirkungslos.
+    """
     # ► Alle Labels und Zeiten aus der Runde
-    label_to_time = dict(zip(df["label"], df["sekunden_seit_start"]))
+    if isinstance(df, FoundTimes):
+        label_to_time = df.as_dict()
+    else:
+        label_to_time = dict(zip(df["label"], df["sekunden_seit_start"]))
     round_labels = sorted(label_to_time)
 
     fixed_columns = ["timestamp", "spielname", "alter"]
     all_columns = fixed_columns + round_labels + ["punkte"]
 
-    # ► Header anpassen, falls neue Labels dazugekommen sind
-    if existing_headers != all_columns:
-        old_rows = (
-            [[row.get(h, "") for h in all_columns] for row in existing_data]
-            if existing_data
-            else []
-        )
-        ws.append_row(all_columns)
-        if old_rows:
-            ws.append_rows(old_rows)
-
     # ► Datenzeile zusammenbauen
-    timestamp = timestamp = fmt_utc(now_utc())
+    timestamp = fmt_utc(now_utc())
     zeile = [timestamp, spielname or "", alter or ""]
 
     # Label-Zeitspalten füllen
     zeile += [label_to_time.get(lbl, "") for lbl in round_labels]
 
     # Klickliste serialisieren (rel_x/rel_y auf 4 Dezimalstellen)
-    pts_str = ""
-    if all_pts:
-        pts_str = "; ".join(
-            f"({p['rel_x']:.4f}, {p['rel_y']:.4f}, {p['hit']})" for p in all_pts
-        )
-    zeile.append(pts_str)
+    zeile.append(format_punkte(all_pts) if all_pts else "")
 
-    ws.append_row(zeile)
+    return get_storage_backend().append_round(
+        sheet_name, scene, all_columns, zeile, round_id=round_id
+    )
 
 
 # Landschaftsdesigner
@@ -94,24 +509,9 @@ def save_slider_results_to_gsheet(
     kosten: float,
     sheet_name: str = "Landschaftsdesigner",
     worksheet_name: str = "Sliderdaten",
-):
+) -> WriteTicket:
     """Speichert timestamp, Szene, Sliderwerte (S1, S4) und Schadenskosten in ein Worksheet."""
-    sh = init_gsheet(sheet_name)
-
-    try:
-        ws = sh.worksheet(worksheet_name)
-        existing = ws.get_all_values()
-        existing_headers = existing[0] if existing else []
-    except gspread.exceptions.WorksheetNotFound:
-        ws = sh.add_worksheet(title=worksheet_name, rows="1000", cols="10")
-        existing_headers = []
-
-    # Neue Zielspalten
     columns = ["timestamp", "scene", "s1", "s4", "kosten"]
-    if existing_headers != columns:
-        ws.append_row(columns)
-
-    # Datenzeile speichern
     row = [
         fmt_utc(now_utc()),
         scene,
@@ -119,7 +519,9 @@ def save_slider_results_to_gsheet(
         slider_values[1],  # S4
         round(kosten, 3),
     ]
-    ws.append_row(row)
+    return get_storage_backend().append_slider_choice(
+        sheet_name, worksheet_name, columns, row
+    )
 
 
 # ────────────────────────── Feedback ─────────────────────────────
@@ -127,36 +529,214 @@ def save_feedback_to_gsheet(
     df: pd.DataFrame,
     sheet_name: str = "Landschaftsdetektiv",
     worksheet: str = "Feedback",
-):
+) -> WriteTicket | None:
     """
     Speichert einzeiliges Feedback-DataFrame in ein eigenes Worksheet.
-    Fügt automatisch Spaltenheader hinzu, falls sie noch nicht existieren.
+    Gibt das Ticket der letzten Zeile zurück (None bei leerem DataFrame).
+
+    Reines Anhängen: Der Writer prüft nur die gecachte Kopfzeile (fehlt sie,
+    wird sie in Zeile 1 geschrieben) und hängt per append_rows an – bestehende
+    Zeilen werden nie gelesen. Gleichzeitige Sessions und Server-Prozesse
+    überschreiben sich so nicht gegenseitig.
     """
-    sh = init_gsheet(sheet_name)
+    backend = get_storage_backend()
+    columns = df.columns.tolist()
+    tickets = [
+        backend.append_feedback(sheet_name, worksheet, columns, values)
+        for values in df.values.tolist()
+    ]
+    return tickets[-1] if tickets else None
 
-    try:
-        ws = sh.worksheet(worksheet)
-        existing = ws.get_all_values()
-        if not existing or df.columns.tolist() != existing[0]:
-            ws.append_row(df.columns.tolist())
-            existing_rows = 1
-        else:
-            existing_rows = len(existing)
-    except gspread.exceptions.WorksheetNotFound:
-        ws = sh.add_worksheet(title=worksheet, rows="1000", cols="10")
-        ws.append_row(df.columns.tolist())
-        existing_rows = 1
 
-    # Feedback-Daten als Zeilen schreiben
-    ws.insert_rows(df.values.tolist(), row=existing_rows + 1)
+# ────────────────────────── Sheets-Backend ─────────────────────────
+class _TailState:
+    """Zuletzt geladener Stand eines Worksheets (roh + typisiert)."""
+
+    __slots__ = ("header", "rows", "frame")
+
+    def __init__(self, header: list[str], rows: list[list[str]], frame: pd.DataFrame):
+        self.header = header
+        self.rows = rows
+        self.frame = frame
+
+
+def _pad(rows: list[list[str]], width: int) -> list[list[str]]:
+    """Füllt von der API gekürzte Zeilen (leere Zellen am Ende) auf `width` auf."""
+    return [list(r[:width]) + [""] * (width - len(r)) for r in rows]
+
+
+class SheetsBackend(StorageBackend):
+    """
+    Google Sheets als Speicher: Schreiben über Outbox/Writer, Lesen über den Pool.
+
+    Gelesen wird inkrementell: pro Worksheet merkt sich das Backend die bekannten
+    Zeilen und holt beim nächsten Mal nur Kopfzeile + Zeilen ab der letzten
+    bekannten (ein batch_get). Ändert sich die Kopfzeile oder passt die letzte
+    bekannte Zeile nicht mehr (Zeilen gelöscht/umsortiert), wird voll neu geladen.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._tails: dict[tuple[str, str], _TailState] = {}
+
+    def append_round(self, sheet_name, scene, columns, values, round_id=None):
+        return get_result_writer().submit(
+            sheet_name, scene, columns, values, cols=50, round_id=round_id
+        )
+
+    def append_slider_choice(self, sheet_name, worksheet, columns, values):
+        return get_result_writer().submit(sheet_name, worksheet, columns, values)
+
+    def append_feedback(self, sheet_name, worksheet, columns, values):
+        return get_result_writer().submit(sheet_name, worksheet, columns, values)
+
+    def list_datasets(self, sheet_name: str) -> list[str]:
+        return [ws.title for ws in get_gsheet_pool().worksheets(sheet_name)]
+
+    def read_dataset(self, sheet_name, worksheet, start=None, end=None):
+        ws = get_gsheet_pool().worksheet(sheet_name, worksheet)
+        with self._lock:
+            state = self._tails.get((sheet_name, worksheet))
+        names = (sheet_name, worksheet)
+        state = self._load_tail(ws, state, *names) if state else None
+        if state is None:
+            state = self._load_full(ws, *names)
+        with self._lock:
+            self._tails[(sheet_name, worksheet)] = state
+        return filter_by_timestamp(state.frame.copy(), start, end)
+
+    def read_all(self, sheet_name):
+        """
+        Lädt alle Worksheets eines Spiels mit einem values_batch_get.
+
+        Für bereits bekannte Worksheets werden nur Kopfzeile + neue Zeilen
+        geholt, für unbekannte der ganze Bereich. Der Stand jedes Worksheets
+        wird für spätere inkrementelle Aufrufe gemerkt; schlägt die Prüfung
+        fehl, werden die betroffenen Worksheets in einem zweiten Batch voll
+        geladen.
+        """
+        titles = self.list_datasets(sheet_name)
+        if not titles:
+            return {}
+        with self._lock:
+            states = {t: self._tails.get((sheet_name, t)) for t in titles}
+
+        ranges = []
+        for title in titles:
+            if states[title] is None:
+                ranges.append(gspread.utils.absolute_range_name(title))
+            else:
+                ranges += [
+                    gspread.utils.absolute_range_name(title, r)
+                    for r in self._tail_ranges(states[title])
+                ]
+        values = iter(self._batch_values(sheet_name, ranges))
+
+        frames, reload = {}, []
+        for title in titles:
+            state = states[title]
+            if state is None:
+                state = self._from_values(next(values), sheet_name, title)
+            else:
+                head, tail = next(values), next(values)
+                state = self._apply_tail(state, head, tail, sheet_name, title)
+                if state is None:
+                    reload.append(title)
+                    continue
+            frames[title] = state
+        if reload:
+            full = self._batch_values(
+                sheet_name, [gspread.utils.absolute_range_name(t) for t in reload]
+            )
+            for title, data in zip(reload, full):
+                frames[title] = self._from_values(data, sheet_name, title)
+
+        with self._lock:
+            for title, state in frames.items():
+                self._tails[(sheet_name, title)] = state
+        return {title: frames[title].frame.copy() for title in titles}
+
+    @staticmethod
+    def _batch_values(sheet_name: str, ranges: list[str]) -> list[list[list[str]]]:
+        """Ein values_batch_get; liefert die Werte pro Bereich (leer → [])."""
+        pool = get_gsheet_pool()
+        sh = pool.spreadsheet(sheet_name)
+        response = pool.scheduler.call(READ, sh.values_batch_get, ranges)
+        value_ranges = response.get("valueRanges", [])
+        value_ranges += [{}] * (len(ranges) - len(value_ranges))
+        return [vr.get("values", []) for vr in value_ranges]
+
+    @classmethod
+    def _load_full(
+        cls, ws: gspread.Worksheet, sheet_name: str, worksheet: str
+    ) -> _TailState:
+        data = get_gsheet_pool().scheduler.call(READ, ws.get_all_values)
+        return cls._from_values(data, sheet_name, worksheet)
+
+    @staticmethod
+    def _from_values(
+        data: list[list[str]], sheet_name: str, worksheet: str
+    ) -> _TailState:
+        header = data[0] if data else []
+        rows = _pad(data[1:], len(header))
+        return _TailState(
+            header,
+            rows,
+            parse_values(pd.DataFrame(rows, columns=header), sheet_name, worksheet),
+        )
+
+    @staticmethod
+    def _tail_ranges(state: _TailState) -> tuple[str, str]:
+        """Bereiche für Kopfzeile und neue Zeilen (ab der letzten bekannten)."""
+        last_col = gspread.utils.rowcol_to_a1(1, max(len(state.header), 1))[:-1]
+        # Ab der letzten bekannten Datenzeile (Sheet-Zeile n+1) lesen, um sie zu prüfen
+        first = max(len(state.rows) + 1, 2)
+        # Ganze erste Zeile, damit neu angefügte Spalten auffallen
+        return "1:1", f"A{first}:{last_col}"
+
+    @classmethod
+    def _load_tail(
+        cls, ws: gspread.Worksheet, state: _TailState, sheet_name: str, worksheet: str
+    ) -> _TailState | None:
+        """Holt nur neue Zeilen; None, wenn ein voller Reload nötig ist."""
+        head, tail = get_gsheet_pool().scheduler.call(
+            READ, ws.batch_get, list(cls._tail_ranges(state))
+        )
+        return cls._apply_tail(state, head, tail, sheet_name, worksheet)
+
+    @staticmethod
+    def _apply_tail(
+        state: _TailState,
+        head_range: list[list[str]],
+        tail_range: list[list[str]],
+        sheet_name: str,
+        worksheet: str,
+    ) -> _TailState | None:
+        """Hängt die neuen Zeilen an; None, wenn ein voller Reload nötig ist."""
+        width = len(state.header)
+        header = head_range[0] if head_range else []
+        if len(header) > width or _pad([header], width)[0] != state.header:
+            return None  # Kopfzeile erweitert oder verändert
+        tail = _pad(list(tail_range), width)
+        if state.rows:
+            if not tail or tail[0] != state.rows[-1]:
+                return None  # Zeilen gelöscht oder verändert
+            tail = tail[1:]
+        if not tail:
+            return state
+
+        new = parse_values(
+            pd.DataFrame(tail, columns=state.header), sheet_name, worksheet
+        )
+        frame = pd.concat([state.frame, new], ignore_index=True)
+        return _TailState(state.header, state.rows + tail, frame)
 
 
 # ────────────────────────── Daten laden ───────────────────────────
 @st.cache_data(ttl=20)
 def lade_worksheet_namen(sheet_name: str) -> list[str]:
     try:
-        sheet = init_gsheet(sheet_name)
-        return [ws.title for ws in sheet.worksheets()]
+        return get_storage_backend().list_datasets(sheet_name)
     except Exception as e:
         st.error(f"Fehler beim Laden des Sheets '{sheet_name}': {e}")
         return []
@@ -167,17 +747,12 @@ def lade_worksheet(sheet_name: str, worksheet_name: str) -> pd.DataFrame:
     """
     Lädt die Daten aus einem Google-Sheet-Worksheet als Pandas DataFrame.
 
-    Diese Funktion verwendet get_all_values(), um sicherzustellen, dass
-    alle Werte zunächst als Strings geladen werden (inkl. deutscher Kommas
-    als Dezimaltrenner). Danach werden die Spalten (außer timestamp,
-    spielname, punkte) konvertiert:
-
-    - Alle Kommas werden durch Punkte ersetzt.
-    - Danach werden die Werte in floats gewandelt.
-
-    Das ermöglicht einen robusten Import auch für unterschiedliche
-    Regional-Einstellungen in Google Sheets (z.B. Deutsch/Schweiz vs.
-    Englisch/USA).
+    Gelesen wird über das konfigurierte Speicher-Backend (Sheets oder lokal).
+    Das Sheets-Backend lädt beim ersten Mal per get_all_values() und danach nur
+    noch neu hinzugekommene Zeilen. Die Werte kommen als Strings (inkl.
+    deutscher Kommas als Dezimaltrenner) und werden gemäss `schema_utils`
+    typisiert – robust auch für unterschiedliche Regional-Einstellungen in
+    Google Sheets (z.B. Deutsch/Schweiz vs. Englisch/USA).
 
     Args:
         sheet_name (str): Der Name des Google-Sheets-Dokuments.
@@ -187,24 +762,31 @@ def lade_worksheet(sheet_name: str, worksheet_name: str) -> pd.DataFrame:
         pd.DataFrame: Ein DataFrame mit den geladenen und konvertierten Daten.
     """
     try:
-        sheet = init_gsheet(sheet_name)
-        ws = sheet.worksheet(worksheet_name)
-        data = ws.get_all_values()
-        headers = data[0]
-        rows = data[1:]
-        df = pd.DataFrame(rows, columns=headers)
-
-        for col in df.columns:
-            if col.lower() in ["timestamp", "spielname", "punkte"]:
-                continue
-            try:
-                df[col] = (
-                    df[col].astype(str).str.replace(",", ".", regex=False).astype(float)
-                )
-            except Exception:
-                pass
-        return df
-
+        return get_storage_backend().read_dataset(sheet_name, worksheet_name)
     except Exception as e:
         st.error(f"Fehler beim Laden der Daten aus '{worksheet_name}': {e}")
         return pd.DataFrame()
+
+
+@st.cache_data(ttl=20)
+def lade_alle_worksheets(sheet_names: tuple[str, ...]) -> dict[str, dict]:
+    """
+    Lädt alle Worksheets mehrerer Spiele auf einmal (für die Auswertung).
+
+    Pro Spreadsheet ein Batch-Request, die Spreadsheets parallel. Ergebnis:
+    {sheet_name: {worksheet_name: DataFrame}}; bei Fehlern ein leeres dict.
+    """
+    backend = get_storage_backend()
+    with ThreadPoolExecutor(max_workers=max(len(sheet_names), 1)) as executor:
+        futures = {
+            name: executor.submit(backend.read_all, name) for name in sheet_names
+        }
+
+    daten = {}
+    for name, future in futures.items():
+        try:
+            daten[name] = future.result()
+        except Exception as e:
+            st.error(f"Fehler beim Laden des Sheets '{name}': {e}")
+            daten[name] = {}
+    return daten
@@ -0,0 +1,452 @@
+"""image_utils.py – Kompakte Bild-Nutzlast für den Browser.
+
+`streamlit_image_coordinates` schickt PIL-Bilder standardmässig als
+unkomprimiertes PNG, `st.image` liefert Pfade unverändert aus (mehrere MB pro
+Designer-Bild). Hier werden Anzeige-Bilder einmal auf Anzeigebreite gebracht,
+verlustbehaftet kodiert und die Bytes nach Inhalts-Hash gecacht:
+
+- `encode_image(img)` – PIL-Bild → `EncodedImage` (Speicher-Cache, LRU),
+- `encode_file(path, width)` – Bilddatei → `EncodedImage` (zusätzlich auf Platte),
+- `cached_file(path, width)` – nur nachsehen, ob die Datei schon kodiert ist.
+
+`EncodedImage.save` schreibt die fertigen Bytes, so dass es überall dort
+übergeben werden kann, wo ein PIL-Bild mit `save` erwartet wird.
+
+Dekodierte Bilder hält ein `ImageStore`: jede Datei wird einmal in einen
+schreibgeschützten RGBA-Puffer dekodiert (standardmässig per mmap aus einer
+Roh-Datei unter `.cache/raw`, so teilen sich mehrere Server-Prozesse die
+Seiten), mit festem Speicherbudget und LRU-Verdrängung. Roh-Dateien geänderter
+oder gelöschter Bilder räumt `ImageStore.prune_raw` weg.
+
+Bericht (Grösse/Zeit pro Szene und Format):
+
+    python -m utils.image_utils
+    python -m utils.image_utils --formats JPEG WEBP --quality 80
+"""
+
+from __future__ import annotations
+
+import argparse
+import functools
+import hashlib
+import io
+import os
+import threading
+import time
+from collections import OrderedDict
+from dataclasses import dataclass
+from pathlib import Path
+
+import numpy as np
+from PIL import Image
+
+ENCODE_CACHE_PATH = Path(__file__).parent.parent / ".cache" / "encoded"
+ENCODE_VERSION = 1  # erhöhen, wenn sich Kodierung oder Resampling ändern
+MEMORY_BUDGET_BYTES = 64 * 1024 * 1024  # kodierte Bytes im Speicher-Cache
+RAW_CACHE_PATH = Path(__file__).parent.parent / ".cache" / "raw"
+STORE_BUDGET_BYTES = 256 * 1024 * 1024  # dekodierte Pixel im ImageStore
+
+# Streamlit reicht nur JPEG/PNG/GIF unverändert durch; WebP dient dem Vergleich
+QUALITY = {"JPEG": 82, "WEBP": 80}
+MIME = {"JPEG": "image/jpeg", "WEBP": "image/webp", "PNG": "image/png"}
+SUFFIX = {"JPEG": "jpg", "WEBP": "webp", "PNG": "png"}
+DESIGNER_WIDTH = 2 * 730  # grösste Inhaltsbreite von st.image
+
+
+@dataclass(frozen=True)
+class EncodedImage:
+    """Fertig kodierte Bild-Bytes samt Format und Pixelgrösse."""
+
+    data: bytes
+    format: str
+    size: tuple[int, int]
+
+    @property
+    def mime(self) -> str:
+        return MIME[self.format]
+
+    @property
+    def width(self) -> int:
+        return self.size[0]
+
+    @property
+    def height(self) -> int:
+        return self.size[1]
+
+    def save(self, fp, format: str | None = None, **kwargs) -> None:
+        """Wie `PIL.Image.save`, schreibt aber die vorhandenen Bytes."""
+        fp.write(self.data)
+
+
+# ────────────────────────── Kodieren ────────────────────────────────
+def _tmp_suffix() -> str:
+    """Eindeutig über Prozesse UND Threads (Thread-IDs allein nur pro Prozess)."""
+    return f"{os.getpid()}.{threading.get_ident()}"
+
+
+def _prepare(img: Image.Image, fmt: str, width: int | None) -> Image.Image:
+    """Auf Anzeigebreite verkleinern (nie vergrössern), Farbmodus anpassen."""
+    if width and img.width > width:
+        size = (width, round(img.height * width / img.width))
+        img = img.resize(size, Image.Resampling.LANCZOS)
+    if fmt == "JPEG" and img.mode != "RGB":
+        img = img.convert("RGB")  # Anzeige-Bilder sind deckend
+    return img
+
+
+def _encode(img: Image.Image, fmt: str, quality: int | None) -> bytes:
+    buf = io.BytesIO()
+    if fmt == "JPEG":
+        img.save(buf, "JPEG", quality=quality or QUALITY[fmt], optimize=True)
+    elif fmt == "WEBP":
+        img.save(buf, "WEBP", quality=quality or QUALITY[fmt], method=4)
+    else:
+        img.save(buf, fmt)
+    return buf.getvalue()
+
+
+def content_hash(img: Image.Image) -> str:
+    """Hash über Modus, Grösse und Pixel – unabhängig vom Objekt."""
+    h = hashlib.blake2b(digest_size=16)
+    h.update(f"{img.mode}{img.size}".encode())
+    h.update(img.tobytes())
+    return h.hexdigest()
+
+
+class _EncodedCache:
+    """Thread-sicherer LRU-Cache für kodierte Bytes mit Byte-Budget."""
+
+    def __init__(self, budget: int):
+        self.budget = budget
+        self.used = 0
+        self._items: OrderedDict[str, EncodedImage] = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key: str) -> EncodedImage | None:
+        with self._lock:
+            item = self._items.get(key)
+            if item is not None:
+                self._items.move_to_end(key)
+            return item
+
+    def put(self, key: str, item: EncodedImage) -> None:
+        with self._lock:
+            if key in self._items:
+                return
+            self._items[key] = item
+            self.used += len(item.data)
+            while self.used > self.budget and len(self._items) > 1:
+                _, old = self._items.popitem(last=False)
+                self.used -= len(old.data)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._items.clear()
+            self.used = 0
+
+
+_cache = _EncodedCache(MEMORY_BUDGET_BYTES)
+
+
+def _cache_key(source: str, fmt: str, quality: int | None, width: int | None):
+    return f"{source}-{fmt}-{quality or QUALITY.get(fmt)}-{width or 0}-{ENCODE_VERSION}"
+
+
+def encode_image(
+    img: Image.Image,
+    fmt: str = "JPEG",
+    quality: int | None = None,
+    width: int | None = None,
+) -> EncodedImage:
+    """Kodiert ein PIL-Bild; gleicher Inhalt → gecachte Bytes."""
+    key = _cache_key(content_hash(img), fmt, quality, width)
+    cached = _cache.get(key)
+    if cached is not None:
+        return cached
+    img = _prepare(img, fmt, width)
+    encoded = EncodedImage(_encode(img, fmt, quality), fmt, img.size)
+    _cache.put(key, encoded)
+    return encoded
+
+
+def _file_key(path: Path) -> str:
+    """Inhalts-Hash einer Datei; pro (Pfad, Grösse, Änderungszeit) nur einmal."""
+    stat = path.stat()
+    return _hash_file(str(path), stat.st_size, stat.st_mtime_ns)
+
+
+@functools.lru_cache(maxsize=256)
+def _hash_file(path: str, size: int, mtime_ns: int) -> str:
+    return hashlib.blake2b(Path(path).read_bytes(), digest_size=16).hexdigest()
+
+
+_file_locks: dict[str, threading.Lock] = {}
+_file_locks_lock = threading.Lock()
+
+
+def cached_file(
+    path: str | Path,
+    width: int | None = DESIGNER_WIDTH,
+    fmt: str = "JPEG",
+    quality: int | None = None,
+) -> EncodedImage | None:
+    """Bereits kodierte Bytes aus dem Speicher-Cache – kodiert selbst nie."""
+    return _cache.get(_cache_key(_file_key(Path(path)), fmt, quality, width))
+
+
+def encode_file(
+    path: str | Path,
+    width: int | None = DESIGNER_WIDTH,
+    fmt: str = "JPEG",
+    quality: int | None = None,
+) -> EncodedImage:
+    """Wie `encode_image` für Bilddateien; die Bytes landen zusätzlich auf Platte."""
+    path = Path(path)
+    key = _cache_key(_file_key(path), fmt, quality, width)
+    cached = _cache.get(key)
+    if cached is not None:
+        return cached
+
+    with _file_locks_lock:
+        key_lock = _file_locks.setdefault(key, threading.Lock())
+    with key_lock:  # gleiche Datei nie parallel kodieren (z. B. Vorab-Kodierung)
+        encoded = _cache.get(key) or _encode_file(path, key, fmt, quality, width)
+        _cache.put(key, encoded)
+    with _file_locks_lock:
+        _file_locks.pop(key, None)
+    return encoded
+
+
+def _encode_file(
+    path: Path, key: str, fmt: str, quality: int | None, width: int | None
+) -> EncodedImage:
+    out = ENCODE_CACHE_PATH / f"{key}.{SUFFIX[fmt]}"
+    if out.exists():
+        data = out.read_bytes()
+        with Image.open(io.BytesIO(data)) as img:
+            return EncodedImage(data, fmt, img.size)
+
+    with Image.open(path) as img:
+        img = _prepare(img, fmt, width)
+        encoded = EncodedImage(_encode(img, fmt, quality), fmt, img.size)
+    out.parent.mkdir(parents=True, exist_ok=True)
+    tmp = out.with_name(f".{out.name}.{_tmp_suffix()}.tmp")
+    tmp.write_bytes(encoded.data)
+    tmp.replace(out)
+    return encoded
+
+
+# ────────────────────────── Bild-Speicher ───────────────────────────
+class ImageStore:
+    """
+    Thread-sicherer Speicher dekodierter Bilder.
+
+    Jede Datei wird nur einmal in einen unveränderlichen RGBA-Puffer dekodiert,
+    auch wenn mehrere Sessions gleichzeitig zugreifen. `get(path)` legt darüber
+    jedes Mal ein neues, schreibgeschütztes PIL-Bild (ohne Kopie); wer darauf
+    zeichnet, bekommt von PIL eine eigene Kopie und stört niemanden. Übersteigen
+    die Puffer das Budget, fallen die am längsten nicht benutzten heraus.
+    """
+
+    def __init__(
+        self,
+        budget_bytes: int = STORE_BUDGET_BYTES,
+        raw_path: Path | None = RAW_CACHE_PATH,
+    ):
+        self.budget = budget_bytes
+        self.raw_path = raw_path  # None = ohne mmap, Puffer im Prozess
+        self.used = 0
+        self._items: OrderedDict[tuple, np.ndarray] = OrderedDict()
+        self._lock = threading.Lock()
+        self._key_locks: dict[tuple, threading.Lock] = {}
+        self._counters = {"hits": 0, "decodes": 0, "evictions": 0}
+
+    def get(self, path: str | Path) -> Image.Image:
+        """Schreibgeschütztes RGBA-Bild über dem gemeinsamen Puffer."""
+        pixels = self.get_array(path)
+        return Image.frombuffer(
+            "RGBA", pixels.shape[1::-1], pixels, "raw", "RGBA", 0, 1
+        )
+
+    def get_array(self, path: str | Path) -> np.ndarray:
+        """Pixel als schreibgeschütztes (H, W, 4)-uint8-Array."""
+        path = Path(path)
+        stat = path.stat()
+        key = (str(path), stat.st_size, stat.st_mtime_ns)
+        pixels = self._lookup(key)
+        if pixels is not None:
+            return pixels
+        with self._lock:
+            key_lock = self._key_locks.setdefault(key, threading.Lock())
+        with key_lock:  # gleiche Datei nie parallel dekodieren
+            pixels = self._lookup(key)
+            if pixels is None:
+                pixels = self._decode(path, key)
+                self._insert(key, pixels)
+        with self._lock:
+            self._key_locks.pop(key, None)
+        return pixels
+
+    def _lookup(self, key: tuple) -> np.ndarray | None:
+        with self._lock:
+            pixels = self._items.get(key)
+            if pixels is None:
+                return None
+            self._items.move_to_end(key)
+            self._counters["hits"] += 1
+            return pixels
+
+    def _insert(self, key: tuple, pixels: np.ndarray) -> None:
+        with self._lock:
+            self._items[key] = pixels
+            self.used += pixels.nbytes
+            self._counters["decodes"] += 1
+            while self.used > self.budget and len(self._items) > 1:
+                _, old = self._items.popitem(last=False)
+                self.used -= old.nbytes
+                self._counters["evictions"] += 1
+
+    def _raw_file(self, path: Path, key: tuple) -> Path:
+        """Roh-Datei einer Quelle: <stem>-<Pfad-Hash>-<Hash von Grösse/mtime>.npy"""
+        source = hashlib.blake2b(key[0].encode(), digest_size=6).hexdigest()
+        version = hashlib.blake2b(repr(key).encode(), digest_size=12).hexdigest()
+        return self.raw_path / f"{path.stem}-{source}-{version}.npy"
+
+    def _decode(self, path: Path, key: tuple) -> np.ndarray:
+        """Pixel als schreibgeschütztes (H, W, 4)-Array, ggf. aus der Roh-Datei."""
+        raw = None
+        if self.raw_path is not None:
+            raw = self._raw_file(path, key)
+            if raw.exists():
+                return np.load(raw, mmap_mode="r")
+
+        with Image.open(path) as img:
+            pixels = np.asarray(img.convert("RGBA"))
+        if raw is None:
+            pixels.flags.writeable = False
+            return pixels
+
+        raw.parent.mkdir(parents=True, exist_ok=True)
+        # Quelle zuerst vermerken, damit prune_raw die neue Datei nie für verwaist hält
+        raw.with_suffix(".src").write_text(key[0], encoding="utf-8")
+        tmp = raw.with_name(f".{raw.name}.{_tmp_suffix()}.tmp")
+        with open(tmp, "wb") as fh:
+            np.save(fh, pixels)
+        tmp.replace(raw)
+        # Ältere Stände derselben Quelle (Bild wurde geändert) entfernen
+        for old in raw.parent.glob(raw.name.rsplit("-", 1)[0] + "-*.npy"):
+            if old != raw:
+                _unlink(old, old.with_suffix(".src"))
+        return np.load(raw, mmap_mode="r")
+
+    def prune_raw(self) -> int:
+        """
+        Löscht Roh-Dateien, deren Quelle fehlt oder sich seither geändert hat
+        (Grösse/Änderungszeit); gibt die Anzahl entfernter Dateien zurück.
+        """
+        if self.raw_path is None or not self.raw_path.exists():
+            return 0
+        removed = 0
+        for raw in self.raw_path.glob("*.npy"):
+            src = raw.with_suffix(".src")
+            try:
+                source = Path(src.read_text(encoding="utf-8"))
+                stat = source.stat()
+                current = self._raw_file(
+                    source, (str(source), stat.st_size, stat.st_mtime_ns)
+                )
+            except OSError:
+                current = None  # Quelle gelöscht oder Datei ohne Vermerk
+            if current != raw:
+                removed += _unlink(raw, src)
+        return removed
+
+    def stats(self) -> dict[str, int]:
+        with self._lock:
+            return {"items": len(self._items), "bytes": self.used, **self._counters}
+
+    def clear(self) -> None:
+        with self._lock:
+            self._items.clear()
+            self.used = 0
+
+
+def _unlink(raw: Path, src: Path) -> int:
+    """Entfernt Roh-Datei + Vermerk; ein anderer Prozess darf schneller sein."""
+    try:
+        raw.unlink()
+    except OSError:
+        return 0
+    src.unlink(missing_ok=True)
+    return 1
+
+
+# ────────────────────────── Bericht ─────────────────────────────────
+def _timed(fn) -> tuple[bytes, float]:
+    t0 = time.perf_counter()
+    data = fn()
+    return data, (time.perf_counter() - t0) * 1000
+
+
+def _encode_png(img: Image.Image) -> bytes:
+    """Wie `streamlit_image_coordinates` es ohne Einstellungen tut."""
+    buf = io.BytesIO()
+    img.save(buf, "PNG", compress_level=0)
+    return buf.getvalue()
+
+
+def size_report(
+    formats: tuple[str, ...] = ("JPEG", "WEBP"), quality: int | None = None
+) -> list[dict]:
+    """
+    Pro Bild und Anzeigebreite: Bytes, die bisher gesendet wurden (Detektiv:
+    unkomprimiertes PNG, Designer: die Datei), und in den kodierten Formaten,
+    samt Kodierzeit in ms.
+    """
+    from utils.pyramid_utils import PYRAMID_WIDTHS, ensure_pyramid, load_level
+    from utils.pyramid_utils import scenes as detective_scenes
+    from utils.utils import get_base_path
+
+    rows = []
+
+    def _measure(name: str, width: int, img: Image.Image, before: bytes) -> None:
+        row = {"image": name, "width": width, "before_kb": len(before) / 1024}
+        for fmt in formats:
+            prepared = _prepare(img, fmt, width)
+            data, ms = _timed(lambda: _encode(prepared, fmt, quality))
+            row[f"{fmt.lower()}_kb"] = len(data) / 1024
+            row[f"{fmt.lower()}_ms"] = ms
+        rows.append(row)
+
+    for scene in detective_scenes():
+        manifest = ensure_pyramid(scene)
+        for width in PYRAMID_WIDTHS:
+            img = load_level(scene, manifest, width)[0].convert("RGBA")
+            _measure(scene, width, img, _encode_png(img))
+
+    for path in sorted(get_base_path("slider").glob("*_*_*_*.*")):
+        with Image.open(path) as img:
+            img.load()
+            _measure(path.stem, min(img.width, DESIGNER_WIDTH), img, path.read_bytes())
+    return rows
+
+
+def main(argv: list[str] | None = None) -> None:
+    parser = argparse.ArgumentParser(description="Grössenbericht der Anzeige-Bilder.")
+    parser.add_argument("--formats", nargs="+", default=["JPEG", "WEBP"])
+    parser.add_argument("--quality", type=int, default=None)
+    args = parser.parse_args(argv)
+    formats = tuple(f.upper() for f in args.formats)
+
+    header = f"{'Bild':<20}{'Breite':>7}{'bisher KB':>11}"
+    header += "".join(f"{f + ' KB':>11}{'ms':>7}" for f in formats)
+    print(header)
+    for r in size_report(formats, args.quality):
+        line = f"{r['image']:<20}{r['width']:>7}{r['before_kb']:>11.0f}"
+        for f in formats:
+            line += f"{r[f'{f.lower()}_kb']:>11.0f}{r[f'{f.lower()}_ms']:>7.0f}"
+        print(line)
+
+
+if __name__ == "__main__":
+    main()
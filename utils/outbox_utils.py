@@ -0,0 +1,279 @@
+"""outbox_utils.py – Lokaler, absturzsicherer Ausgang für Spielergebnisse.
+
+Jede Ergebniszeile wird zuerst in eine SQLite-Datenbank (WAL-Modus) geschrieben
+und erst danach vom Writer in Google Sheets übertragen. Fällt Sheets aus oder
+ist das Kontingent erschöpft, bleiben die Zeilen liegen und werden später in
+Blöcken nachgeliefert – auch nach einem Neustart des Servers.
+"""
+
+from __future__ import annotations
+
+import json
+import os
+import sqlite3
+import threading
+import time
+from contextlib import contextmanager
+from pathlib import Path
+from typing import NamedTuple
+
+OUTBOX_PATH = Path(__file__).parent.parent / ".outbox" / "results.sqlite"
+LEASE_SECONDS = 60  # so lange gehört ein Block einem Writer (danach Replay)
+RETRY_MIN_SECONDS = 2  # Backoff nach fehlgeschlagener Lieferung …
+RETRY_MAX_SECONDS = 300  # … verdoppelt sich bis hierhin
+KEEP_DELIVERED_SECONDS = 7 * 24 * 3600
+SCHEMA_LOCK_TIMEOUT = 120  # so lange wartet ein Writer auf die Kopfzeilen-Sperre
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS outbox (
+    id          INTEGER PRIMARY KEY AUTOINCREMENT,
+    round_id    TEXT NOT NULL UNIQUE,
+    sheet_name  TEXT NOT NULL,
+    worksheet   TEXT NOT NULL,
+    cols        INTEGER NOT NULL,
+    columns     TEXT NOT NULL,
+    payload     TEXT NOT NULL,
+    created     REAL NOT NULL,
+    lease_until REAL NOT NULL DEFAULT 0,
+    claims      INTEGER NOT NULL DEFAULT 0,
+    attempts    INTEGER NOT NULL DEFAULT 0,
+    last_error  TEXT,
+    delivered   REAL
+);
+CREATE INDEX IF NOT EXISTS outbox_pending ON outbox (delivered, lease_until, id);
+"""
+
+
+class WriteTicket:
+    """
+    Lieferstatus einer Ergebniszeile: 'pending' → ('retrying' →) 'ok'.
+
+    Schlägt eine Lieferung an Sheets fehl, wird das Ticket 'retrying' (die Zeile
+    liegt sicher in der Outbox und wird nachgeliefert) und `error` enthält den
+    letzten Fehler. Erledigt (`done`) ist es erst nach erfolgreicher Lieferung.
+    """
+
+    __slots__ = ("_done", "round_id", "status", "error")
+
+    def __init__(self, round_id: str):
+        self._done = threading.Event()
+        self.round_id = round_id
+        self.status = "pending"
+        self.error: Exception | None = None
+
+    def _retry(self, error: Exception) -> None:
+        self.status = "retrying"
+        self.error = error
+
+    def _resolve(self) -> None:
+        self.status = "ok"
+        self.error = None
+        self._done.set()
+
+    @property
+    def done(self) -> bool:
+        return self._done.is_set()
+
+    def wait(self, timeout: float | None = None) -> bool:
+        return self._done.wait(timeout)
+
+
+class OutboxRow(NamedTuple):
+    id: int
+    round_id: str
+    sheet_name: str
+    worksheet: str
+    cols: int
+    columns: tuple[str, ...]
+    values: list
+    claims: int  # wie oft schon reserviert (> 1: evtl. bereits im Sheet)
+
+
+class Outbox:
+    """
+    Append-only-Speicher für noch nicht gelieferte Zeilen.
+
+    `round_id` ist eindeutig: dieselbe Runde zweimal abzulegen ist ein No-op.
+    Mehrere Prozesse dürfen dieselbe Datei nutzen; `claim()` vergibt Blöcke
+    per Lease, sodass jede Zeile nur von einem Writer gleichzeitig geliefert
+    wird. Stirbt ein Writer, läuft die Lease ab und die Zeile wird erneut
+    reserviert; `claims` > 1 sagt dem Writer, dass er vor dem erneuten Senden
+    im Sheet nach der `round_id` schauen muss.
+    """
+
+    def __init__(self, path: str | Path | None = None):
+        self.path = Path(path or OUTBOX_PATH)
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self._lock = threading.Lock()
+        self._con = sqlite3.connect(
+            str(self.path), check_same_thread=False, isolation_level=None, timeout=30
+        )
+        self._con.execute("PRAGMA journal_mode=WAL")
+        self._con.execute("PRAGMA synchronous=NORMAL")
+        self._con.executescript(_SCHEMA)
+        self._migrate()
+
+    def _migrate(self) -> None:
+        """Bringt Outbox-Dateien älterer Versionen auf das aktuelle Schema."""
+        columns = {r[1] for r in self._con.execute("PRAGMA table_info(outbox)")}
+        if "header_kind" in columns:  # nicht mehr benutzt
+            try:
+                self._con.execute("ALTER TABLE outbox DROP COLUMN header_kind")
+            except sqlite3.OperationalError:
+                pass  # ein anderer Prozess war schneller
+        if "claims" not in columns:
+            try:
+                self._con.execute(
+                    "ALTER TABLE outbox ADD COLUMN claims INTEGER NOT NULL DEFAULT 0"
+                )
+            except sqlite3.OperationalError:
+                pass
+
+    # ► Schreiben
+    def put(
+        self,
+        round_id: str,
+        sheet_name: str,
+        worksheet: str,
+        columns: list[str],
+        values: list,
+        cols: int = 10,
+    ) -> bool:
+        """Legt eine Zeile ab. Gibt False zurück, wenn die Runde schon existiert."""
+        with self._lock:
+            cur = self._con.execute(
+                "INSERT OR IGNORE INTO outbox (round_id, sheet_name, worksheet, cols,"
+                " columns, payload, created) VALUES (?,?,?,?,?,?,?)",
+                (
+                    round_id,
+                    sheet_name,
+                    worksheet,
+                    cols,
+                    json.dumps(list(columns)),
+                    json.dumps(values, default=str),
+                    time.time(),
+                ),
+            )
+            return cur.rowcount == 1
+
+    # ► Liefern
+    def claim(self, limit: int, lease: float = LEASE_SECONDS) -> list[OutboxRow]:
+        """Reserviert bis zu `limit` fällige Zeilen (älteste zuerst) für diesen Writer."""
+        now = time.time()
+        with self._lock:
+            self._con.execute("BEGIN IMMEDIATE")
+            try:
+                rows = self._con.execute(
+                    "SELECT id, round_id, sheet_name, worksheet, cols, columns,"
+                    " payload, claims FROM outbox"
+                    " WHERE delivered IS NULL AND lease_until <= ?"
+                    " ORDER BY id LIMIT ?",
+                    (now, limit),
+                ).fetchall()
+                self._con.executemany(
+                    "UPDATE outbox SET lease_until = ?, claims = claims + 1"
+                    " WHERE id = ?",
+                    [(now + lease, r[0]) for r in rows],
+                )
+                self._con.execute("COMMIT")
+            except BaseException:
+                self._con.execute("ROLLBACK")
+                raise
+        return [
+            OutboxRow(
+                r[0],
+                r[1],
+                r[2],
+                r[3],
+                r[4],
+                tuple(json.loads(r[5])),
+                json.loads(r[6]),
+                r[7] + 1,
+            )
+            for r in rows
+        ]
+
+    def mark_delivered(self, ids: list[int]) -> None:
+        now = time.time()
+        with self._lock:
+            self._con.executemany(
+                "UPDATE outbox SET delivered = ?, last_error = NULL WHERE id = ?",
+                [(now, i) for i in ids],
+            )
+
+    def mark_failed(self, ids: list[int], error: Exception) -> None:
+        """Gibt Zeilen mit exponentiellem Backoff für den nächsten Versuch frei."""
+        now = time.time()
+        with self._lock:
+            self._con.executemany(
+                "UPDATE outbox SET attempts = attempts + 1, last_error = ?,"
+                " lease_until = ? + MIN(?, ? * (1 << MIN(attempts, 16))) WHERE id = ?",
+                [
+                    (str(error), now, RETRY_MAX_SECONDS, RETRY_MIN_SECONDS, i)
+                    for i in ids
+                ],
+            )
+
+    # ► Sperre
+    @contextmanager
+    def schema_lock(self):
+        """
+        Prozessübergreifende Sperre für Änderungen an Sheet-Kopfzeilen.
+
+        Eigene SQLite-Datei neben der Outbox, damit Spieler-Speicherungen
+        (put) nicht auf eine laufende Kopfzeilen-Änderung warten.
+        """
+        con = sqlite3.connect(
+            str(self.path.with_name(self.path.name + ".lock")),
+            isolation_level=None,
+            timeout=SCHEMA_LOCK_TIMEOUT,
+        )
+        try:
+            con.execute("BEGIN EXCLUSIVE")
+            try:
+                yield
+            finally:
+                con.execute("ROLLBACK")
+        finally:
+            con.close()
+
+    # ► Abfragen & Aufräumen
+    def status(self, round_id: str) -> str | None:
+        """'pending', 'delivered' oder None (unbekannte Runde)."""
+        with self._lock:
+            row = self._con.execute(
+                "SELECT delivered FROM outbox WHERE round_id = ?", (round_id,)
+            ).fetchone()
+        if row is None:
+            return None
+        return "pending" if row[0] is None else "delivered"
+
+    def next_due(self, delay: float = 0.0) -> float | None:
+        """Zeitpunkt (time.time), an dem die nächste wartende Zeile fällig wird.
+
+        Neue Zeilen werden `delay` Sekunden nach dem Ablegen fällig (Bündeln),
+        bereits reservierte erst nach Ablauf ihrer Lease bzw. ihres Backoffs.
+        """
+        with self._lock:
+            return self._con.execute(
+                "SELECT MIN(CASE WHEN claims = 0 THEN MAX(created + ?, lease_until)"
+                " ELSE lease_until END) FROM outbox WHERE delivered IS NULL",
+                (delay,),
+            ).fetchone()[0]
+
+    def purge_delivered(self, max_age: float = KEEP_DELIVERED_SECONDS) -> int:
+        with self._lock:
+            cur = self._con.execute(
+                "DELETE FROM outbox WHERE delivered IS NOT NULL AND delivered < ?",
+                (time.time() - max_age,),
+            )
+            return cur.rowcount
+
+    def close(self) -> None:
+        with self._lock:
+            self._con.close()
+
+
+def new_round_id() -> str:
+    """Eindeutige, sortierbare ID für eine Ergebniszeile."""
+    return f"{time.time_ns():x}-{os.getpid():x}-{os.urandom(4).hex()}"
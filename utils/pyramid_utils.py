@@ -0,0 +1,167 @@
+"""pyramid_utils.py – Vorskalierte Bildstufen der Detektiv-Szenen.
+
+Statt bei jeder neuen Bildbreite die 2–3 MB grossen Original-PNGs mit LANCZOS
+zu verkleinern, werden pro Szene feste Breitenklassen einmal vorberechnet und
+als verlustfreie WebP-Dateien samt Manifest abgelegt. `get_scene_scaled`
+rastet auf die passende Klasse ein und lädt nur noch die fertige Stufe.
+
+Bauen (z. B. beim Deployment):
+
+    python -m utils.pyramid_utils            # alle Szenen
+    python -m utils.pyramid_utils Dorf --force
+
+Fehlt eine Stufe oder hat sich ein Originalbild geändert, wird die Pyramide
+beim ersten Zugriff bzw. beim Start der App im Hintergrund neu gebaut.
+"""
+
+from __future__ import annotations
+
+import argparse
+import json
+import os
+import threading
+from pathlib import Path
+
+from PIL import Image
+
+from utils.utils import get_base_path
+
+PYRAMID_PATH = Path(__file__).parent.parent / ".cache" / "pyramid"
+PYRAMID_WIDTHS = (200, 400, 600, 800, 1000, 1200)
+PYRAMID_VERSION = 1  # erhöhen, wenn sich Format oder Resampling ändern
+VARIANTS = ("unverändert", "verändert")
+
+_build_lock = threading.Lock()
+
+
+def scenes() -> list[str]:
+    """Alle Detektiv-Szenen (eine CVAT-XML pro Szene)."""
+    return sorted(p.stem for p in get_base_path("detective").glob("*.xml"))
+
+
+def snap_width(display_w: int, widths: tuple[int, ...] = PYRAMID_WIDTHS) -> int:
+    """Kleinste Klasse >= display_w (nie hochskalieren), sonst die grösste."""
+    for w in sorted(widths):
+        if w >= display_w:
+            return w
+    return max(widths)
+
+
+def _source_key(scene: str) -> list:
+    """Grösse + Änderungszeit der Originale – ändert sich eines, wird neu gebaut."""
+    key = []
+    for variant in VARIANTS:
+        stat = (get_base_path("detective") / f"{scene}_{variant}.png").stat()
+        key.append([variant, stat.st_size, stat.st_mtime_ns])
+    return key
+
+
+def _manifest_path(scene: str) -> Path:
+    return PYRAMID_PATH / scene / "manifest.json"
+
+
+def load_manifest(scene: str) -> dict | None:
+    """Manifest der Szene, falls vorhanden und aktuell; sonst None."""
+    try:
+        manifest = json.loads(_manifest_path(scene).read_text(encoding="utf-8"))
+    except (OSError, ValueError):
+        return None
+    if (
+        manifest.get("version") != PYRAMID_VERSION
+        or manifest.get("source") != _source_key(scene)
+        or sorted(map(int, manifest.get("levels", {}))) != sorted(PYRAMID_WIDTHS)
+    ):
+        return None
+    return manifest
+
+
+def build_pyramid(scene: str, force: bool = False) -> dict:
+    """Berechnet alle Stufen einer Szene und schreibt das Manifest zuletzt."""
+    with _build_lock:
+        manifest = None if force else load_manifest(scene)
+        if manifest is not None:
+            return manifest
+
+        out_dir = PYRAMID_PATH / scene
+        out_dir.mkdir(parents=True, exist_ok=True)
+        originals = {
+            v: Image.open(get_base_path("detective") / f"{scene}_{v}.png")
+            for v in VARIANTS
+        }
+        width, height = originals[VARIANTS[0]].size
+
+        levels = {}
+        for w in PYRAMID_WIDTHS:
+            size = (w, int(height * w / width))
+            files = {}
+            for variant, img in originals.items():
+                name = f"{w}_{variant}.webp"
+                tmp = out_dir / f".{name}.{os.getpid()}.tmp"
+                img.resize(size, Image.Resampling.LANCZOS).save(
+                    tmp, "WEBP", lossless=True, method=4
+                )
+                tmp.replace(out_dir / name)
+                files[variant] = name
+            levels[str(w)] = {"size": list(size), "files": files}
+
+        manifest = {
+            "version": PYRAMID_VERSION,
+            "scene": scene,
+            "size": [width, height],
+            "source": _source_key(scene),
+            "levels": levels,
+        }
+        tmp = _manifest_path(scene).with_suffix(f".{os.getpid()}.tmp")
+        tmp.write_text(json.dumps(manifest, indent=2, ensure_ascii=False), "utf-8")
+        tmp.replace(_manifest_path(scene))
+        return manifest
+
+
+def ensure_pyramid(scene: str) -> dict:
+    """Aktuelles Manifest der Szene; baut die Pyramide nur, wenn nötig."""
+    return load_manifest(scene) or build_pyramid(scene)
+
+
+def level_paths(scene: str, manifest: dict, width: int) -> tuple[Path, ...]:
+    """Dateien (unverändert, verändert) einer Stufe."""
+    files = manifest["levels"][str(width)]["files"]
+    return tuple(PYRAMID_PATH / scene / files[variant] for variant in VARIANTS)
+
+
+def load_level(scene: str, manifest: dict, width: int) -> tuple[Image.Image, ...]:
+    """Lädt die vorskalierten Bilder (unverändert, verändert) einer Stufe."""
+    images = []
+    for path in level_paths(scene, manifest, width):
+        img = Image.open(path)
+        img.load()
+        images.append(img)
+    return tuple(images)
+
+
+def build_all_in_background() -> threading.Thread:
+    """Baut fehlende Pyramiden aller Szenen in einem Daemon-Thread."""
+
+    def _run():
+        for scene in scenes():
+            try:
+                ensure_pyramid(scene)
+            except Exception:
+                continue  # wird beim ersten Zugriff erneut versucht
+
+    thread = threading.Thread(target=_run, name="pyramid-build", daemon=True)
+    thread.start()
+    return thread
+
+
+def main(argv: list[str] | None = None) -> None:
+    parser = argparse.ArgumentParser(description="Baut die Bildpyramiden.")
+    parser.add_argument("scenes", nargs="*", help="Standard: alle Szenen")
+    parser.add_argument("--force", action="store_true", help="auch wenn aktuell")
+    args = parser.parse_args(argv)
+    for scene in args.scenes or scenes():
+        manifest = build_pyramid(scene, force=args.force)
+        print(f"{scene}: {', '.join(manifest['levels'])} px")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,216 @@
+"""quota_utils.py – Kontingent-Steuerung für Google-Sheets-Aufrufe.
+
+Google begrenzt Lese- und Schreibanfragen pro Minute und Service-Account.
+Alle API-Aufrufe in `utils.google_utils` laufen deshalb über einen
+`SheetsScheduler`:
+
+- je ein Token-Bucket für Lesen und Schreiben (Anfragen pro Minute),
+- Spieler-Speicherungen (Writer-Thread) vor Dashboard-Lesezugriffen,
+- bei 429 und 5xx exponentieller Backoff mit Jitter; ein 429 pausiert den
+  ganzen Bucket, damit nicht alle Wartenden gleichzeitig erneut anklopfen,
+- nicht idempotente Aufrufe (Anhängen) nach 5xx nicht wiederholen – der
+  Aufrufer prüft selbst, ob die Zeilen schon angekommen sind.
+"""
+
+from __future__ import annotations
+
+import heapq
+import itertools
+import random
+import threading
+import time
+from contextlib import contextmanager
+
+import gspread
+
+READ = "read"
+WRITE = "write"
+
+READS_PER_MINUTE = 60  # Standard-Kontingent pro Nutzer und Projekt
+WRITES_PER_MINUTE = 60
+BURST = 10  # so viele Anfragen dürfen ohne Wartezeit direkt nacheinander laufen
+
+PRIORITY_PLAYER = 0  # Spielergebnisse speichern
+PRIORITY_DASHBOARD = 10  # Auswertung lesen
+
+MAX_RETRIES = 4
+BACKOFF_BASE_SECONDS = 1.0
+BACKOFF_MAX_SECONDS = 32.0
+
+
+def is_retryable(error: Exception, idempotent: bool = True) -> bool:
+    """
+    429 (Kontingent) und 5xx (Serverfehler) lohnen einen neuen Versuch.
+
+    Ein 429 weist die Anfrage ab, bevor sie ausgeführt wird. Bei 5xx ist offen,
+    ob Google sie schon angewendet hat – nicht idempotente Aufrufe (append_rows)
+    werden dann nicht blind wiederholt.
+    """
+    if not isinstance(error, gspread.exceptions.APIError):
+        return False
+    code = getattr(error, "code", None)
+    if code == 429:
+        return True
+    return idempotent and isinstance(code, int) and 500 <= code < 600
+
+
+class TokenBucket:
+    """Füllt sich mit `per_minute / 60` Tokens pro Sekunde bis `capacity` auf."""
+
+    def __init__(self, per_minute: float, capacity: float = BURST):
+        self.rate = per_minute / 60
+        self.capacity = capacity
+        self.tokens = float(capacity)
+        self.paused_until = 0.0
+        self._stamp = time.monotonic()
+
+    def _refill(self, now: float) -> None:
+        self.tokens = min(self.capacity, self.tokens + (now - self._stamp) * self.rate)
+        self._stamp = now
+
+    def wait_time(self, now: float) -> float:
+        """Sekunden bis ein Token frei ist (0 = sofort)."""
+        self._refill(now)
+        if now < self.paused_until:
+            return self.paused_until - now
+        if self.tokens >= 1:
+            return 0.0
+        return (1 - self.tokens) / self.rate
+
+    def take(self) -> None:
+        self.tokens -= 1
+
+    def pause(self, now: float, seconds: float) -> None:
+        """Nach einem 429: keine Tokens bis `now + seconds`, Vorrat leeren."""
+        self.paused_until = max(self.paused_until, now + seconds)
+        self.tokens = min(self.tokens, 0.0)
+
+
+class SheetsScheduler:
+    """
+    Zentrale Warteschlange vor der Sheets-API.
+
+    `call(kind, fn, ...)` wartet auf ein Token des Buckets `kind`, ruft `fn` auf
+    und wiederholt bei 429/5xx mit Backoff. Wartende werden pro Bucket nach
+    Priorität (dann Ankunft) bedient; die Priorität kommt aus dem Argument oder
+    aus `with scheduler.priority(...)` für den aktuellen Thread.
+    """
+
+    def __init__(
+        self,
+        reads_per_minute: float | None = None,
+        writes_per_minute: float | None = None,
+        burst: float = BURST,
+        max_retries: int = MAX_RETRIES,
+        backoff_base: float = BACKOFF_BASE_SECONDS,
+        backoff_max: float = BACKOFF_MAX_SECONDS,
+    ):
+        self._cond = threading.Condition()
+        self._buckets = {
+            READ: TokenBucket(reads_per_minute or READS_PER_MINUTE, burst),
+            WRITE: TokenBucket(writes_per_minute or WRITES_PER_MINUTE, burst),
+        }
+        self._queues: dict[str, list[tuple[int, int]]] = {READ: [], WRITE: []}
+        self._seq = itertools.count()
+        self._local = threading.local()
+        self.max_retries = max_retries
+        self.backoff_base = backoff_base
+        self.backoff_max = backoff_max
+        self._counters = {
+            "calls": 0,
+            "throttled": 0,  # 429 von Google
+            "server_errors": 0,  # 5xx von Google
+            "retries": 0,
+            "failures": 0,  # nach allen Versuchen aufgegeben
+        }
+
+    # ► Priorität
+    @contextmanager
+    def priority(self, value: int):
+        """Setzt die Priorität aller Aufrufe dieses Threads innerhalb des Blocks."""
+        previous = getattr(self._local, "priority", None)
+        self._local.priority = value
+        try:
+            yield
+        finally:
+            self._local.priority = previous
+
+    def _current_priority(self) -> int:
+        value = getattr(self._local, "priority", None)
+        return PRIORITY_DASHBOARD if value is None else value
+
+    # ► Aufrufe
+    def call(
+        self,
+        kind: str,
+        fn,
+        *args,
+        priority: int | None = None,
+        idempotent: bool = True,
+        **kwargs,
+    ):
+        """
+        Führt `fn(*args, **kwargs)` im Kontingent von `kind` (READ/WRITE) aus.
+        Mit `idempotent=False` wird nur nach 429 wiederholt (siehe is_retryable).
+        """
+        if priority is None:
+            priority = self._current_priority()
+        attempt = 0
+        while True:
+            self._acquire(kind, priority)
+            try:
+                return fn(*args, **kwargs)
+            except Exception as e:
+                if not is_retryable(e, idempotent):
+                    if isinstance(e, gspread.exceptions.APIError) and e.code >= 500:
+                        with self._cond:
+                            self._counters["server_errors"] += 1
+                            self._counters["failures"] += 1
+                    raise
+                delay = self._backoff(attempt)
+                with self._cond:
+                    if e.code == 429:
+                        self._counters["throttled"] += 1
+                        self._buckets[kind].pause(time.monotonic(), delay)
+                        self._cond.notify_all()
+                    else:
+                        self._counters["server_errors"] += 1
+                    if attempt >= self.max_retries:
+                        self._counters["failures"] += 1
+                        raise
+                    self._counters["retries"] += 1
+                attempt += 1
+                time.sleep(delay)
+
+    def _backoff(self, attempt: int) -> float:
+        """Full Jitter: zufällig zwischen 0 und base * 2^attempt (gedeckelt)."""
+        return random.uniform(0, min(self.backoff_max, self.backoff_base * 2**attempt))
+
+    def _acquire(self, kind: str, priority: int) -> None:
+        ticket = (priority, next(self._seq))
+        bucket = self._buckets[kind]
+        queue = self._queues[kind]
+        with self._cond:
+            heapq.heappush(queue, ticket)
+            try:
+                while True:
+                    wait = bucket.wait_time(time.monotonic())
+                    if queue[0] == ticket and wait == 0:
+                        bucket.take()
+                        self._counters["calls"] += 1
+                        return
+                    self._cond.wait(timeout=wait or None)
+            finally:
+                queue.remove(ticket)
+                heapq.heapify(queue)
+                self._cond.notify_all()
+
+    # ► Kennzahlen
+    def stats(self) -> dict[str, int]:
+        """Warteschlangenlänge pro Bucket und Zähler seit Prozessstart."""
+        with self._cond:
+            return {
+                "queued_read": len(self._queues[READ]),
+                "queued_write": len(self._queues[WRITE]),
+                **self._counters,
+            }
@@ -0,0 +1,108 @@
+"""schema_utils.py – Spaltentypen der Ergebnis-Worksheets.
+
+Die Werte kommen aus Google Sheets bzw. SQLite immer als Strings (inkl.
+deutscher Kommas als Dezimaltrenner). Statt jede Spalte einzeln zu probieren,
+ist hier pro Worksheet festgelegt, welche Spalte welchen Typ hat. Das rohe
+Werteraster wird einmal umgewandelt; die Auswertung bekommt fertige Spalten.
+"""
+
+from __future__ import annotations
+
+import pandas as pd
+
+TIMESTAMP = "timestamp"  # UTC, Format fmt_utc → datetime64[ns, UTC]
+STRING = "string"  # Arrow-gestützte Strings
+INT = "int"  # Nullable Int64 (leere Zellen → <NA>)
+FLOAT = "float"  # float64 (leere Zellen → NaN)
+CLICKS = "clicks"  # Klickliste "(x, y, hit); …" – bleibt String, siehe Auswertung
+
+TIMESTAMP_FORMAT = "%Y-%m-%d %H:%M:%S"
+# So zeigt Sheets Zeitstempel mit deutscher Ländereinstellung an (Tag zuerst)
+LOCALE_FORMATS = ("%d.%m.%Y %H:%M:%S", "%d.%m.%Y %H:%M")
+
+# Spaltentypen pro Spiel (Sheet); "Feedback" gilt für alle Feedback-Worksheets.
+SCHEMAS: dict[str, dict[str, str]] = {
+    "Landschaftsdetektiv": {
+        "timestamp": TIMESTAMP,
+        "spielname": STRING,
+        "alter": INT,
+        "punkte": CLICKS,
+        "round_id": STRING,
+    },
+    "Landschaftsdesigner": {
+        "timestamp": TIMESTAMP,
+        "scene": STRING,
+        "s1": INT,
+        "s4": INT,
+        "kosten": FLOAT,
+        "round_id": STRING,
+    },
+    "Feedback": {
+        "timestamp": TIMESTAMP,
+        "bewertung": INT,
+        "gelernt": INT,
+        "kommentar": STRING,
+        "round_id": STRING,
+    },
+}
+
+# Typ für Spalten, die nicht im Schema stehen (Detektiv: Label-Zeiten in Sekunden).
+DEFAULT_TYPES: dict[str, str] = {"Landschaftsdetektiv": FLOAT}
+
+
+def column_types(sheet_name: str, worksheet: str, columns: list[str]) -> dict[str, str]:
+    """Liefert den Typ jeder Spalte eines Worksheets."""
+    key = "Feedback" if worksheet == "Feedback" else sheet_name
+    schema = SCHEMAS.get(key, {})
+    default = STRING if key == "Feedback" else DEFAULT_TYPES.get(key, STRING)
+    return {col: schema.get(col, default) for col in columns}
+
+
+def parse_values(df: pd.DataFrame, sheet_name: str, worksheet: str) -> pd.DataFrame:
+    """
+    Wandelt ein DataFrame aus Roh-Strings gemäss Schema um.
+
+    Pro Typ wird ein Block von Spalten gemeinsam umgewandelt (Komma → Punkt,
+    to_numeric, to_datetime); ungültige Werte werden zu NA statt Fehler.
+    """
+    if df.empty and not len(df.columns):
+        return df
+
+    types = column_types(sheet_name, worksheet, list(df.columns))
+    by_type: dict[str, list[str]] = {}
+    for col, typ in types.items():
+        by_type.setdefault(typ, []).append(col)
+
+    out = {}
+    numeric = by_type.get(INT, []) + by_type.get(FLOAT, [])
+    if numeric:
+        raw = df[numeric].astype("string[pyarrow]")
+        nums = raw.apply(
+            lambda s: pd.to_numeric(
+                s.str.strip().str.replace(",", ".", regex=False).replace("", None),
+                errors="coerce",
+            )
+        )
+        for col in by_type.get(FLOAT, []):
+            out[col] = nums[col].astype("float64")
+        for col in by_type.get(INT, []):
+            out[col] = nums[col].round().astype("Int64")
+
+    for col in by_type.get(TIMESTAMP, []):
+        ts = pd.to_datetime(df[col], format=TIMESTAMP_FORMAT, utc=True, errors="coerce")
+        # Von Sheets umformatierte Zeitstempel (Ländereinstellung) nachparsen:
+        # erst die deutschen Formate (Tag zuerst), dann ISO & Co. einzeln
+        filled = df[col].astype("string[pyarrow]").fillna("").ne("")
+        for fmt in (*LOCALE_FORMATS, "mixed"):
+            odd = ts.isna() & filled
+            if not odd.any():
+                break
+            ts[odd] = pd.to_datetime(
+                df.loc[odd, col], format=fmt, utc=True, errors="coerce"
+            )
+        out[col] = ts
+
+    for col in by_type.get(STRING, []) + by_type.get(CLICKS, []):
+        out[col] = df[col].astype("string[pyarrow]").fillna("")
+
+    return pd.DataFrame(out, index=df.index)[list(df.columns)]
@@ -1,67 +1,190 @@
+from __future__ import annotations
+
 import os
 from pathlib import Path
 from collections import defaultdict
 import re
-import pandas as pd
+import threading
 from datetime import datetime
+from dataclasses import dataclass, field
+from concurrent.futures import ThreadPoolExecutor
+from typing import TYPE_CHECKING, Iterable
 import streamlit as st
 
 from utils.time_utils import now_utc, fmt_utc
 
+if TYPE_CHECKING:
+    import pandas as pd
+
+
+# ────────────────────────── Bild-Index ───────────────────────────
+# Erwartetes Format: Szene_S1_S4_Kosten.jpg (bzw. .png)
+_NAME_RE = re.compile(
+    r"^(?P<scene>.+?)_(?P<s1>\d+)_(?P<s4>\d+)_(?P<kosten>\d+\.\d+)\.(?P<fmt>jpg|png)$"
+)
+_FORMAT_RANK = {"jpg": 0, "png": 1}  # JPEG vor PNG, wie bisher
+
+
+@dataclass(frozen=True)
+class SliderImage:
+    path: str
+    format: str
+    kosten: float
+
+
+@dataclass
+class SliderIndex:
+    """(Szene, S1, S4) → Bild sowie Slider-Ranges pro Szene."""
+
+    images: dict[tuple[str, int, int], SliderImage] = field(default_factory=dict)
+    ranges: dict[str, dict[str, tuple[int, int]]] = field(default_factory=dict)
+
+
+def build_slider_index(image_dir: str | Path = "data/slider") -> SliderIndex:
+    """Liest das Verzeichnis einmal (ein `scandir`, ein Regex pro Datei)."""
+    index = SliderIndex()
+    values_by_scene = defaultdict(lambda: {"S1": set(), "S4": set()})
+
+    with os.scandir(image_dir) as entries:
+        for entry in entries:
+            match = _NAME_RE.match(entry.name)
+            if not match:
+                continue
+            scene, fmt = match.group("scene"), match.group("fmt")
+            s1, s4 = int(match.group("s1")), int(match.group("s4"))
+            key = (scene, s1, s4)
+            known = index.images.get(key)
+            if known is None or _FORMAT_RANK[fmt] < _FORMAT_RANK[known.format]:
+                index.images[key] = SliderImage(
+                    str(Path(image_dir) / entry.name),
+                    fmt,
+                    float(match.group("kosten")),
+                )
+            values_by_scene[scene]["S1"].add(s1)
+            values_by_scene[scene]["S4"].add(s4)
+
+    for scene, val_dict in values_by_scene.items():
+        index.ranges[scene] = {k: (min(v), max(v)) for k, v in val_dict.items()}
+    return index
+
+
+def _dir_signature(image_dir: str | Path) -> int:
+    """Änderungszeit des Verzeichnisses – ändert sich beim Hinzufügen,
+    Löschen oder Umbenennen einer Datei."""
+    return os.stat(image_dir).st_mtime_ns
+
+
+_index_lock = threading.Lock()
+_indexes: dict[str, tuple[int, SliderIndex]] = {}  # Verzeichnis → (Signatur, Index)
+
+
+def get_slider_index(image_dir: str | Path = "data/slider") -> SliderIndex:
+    """
+    Index pro Prozess; wird neu gebaut, sobald sich das Verzeichnis ändert.
+    Pro Aufruf ein `stat` und ein Dict-Zugriff (bewusst ohne st.cache_resource,
+    dessen Argument-Hashing hier teurer wäre als der Lookup selbst).
+    """
+    image_dir = str(image_dir)
+    signature = _dir_signature(image_dir)
+    cached = _indexes.get(image_dir)
+    if cached is not None and cached[0] == signature:
+        return cached[1]
+    with _index_lock:
+        cached = _indexes.get(image_dir)
+        if cached is None or cached[0] != signature:
+            cached = (signature, build_slider_index(image_dir))
+            _indexes[image_dir] = cached
+    return cached[1]
+
 
 def get_image_path(
     scene: str, s1: int, s4: int, image_dir: str = "data/slider"
 ) -> tuple[str, float]:
-    pattern = re.compile(rf"^{scene}_{s1}_{s4}_(\d\.\d+)\.(jpg|png)$")
-    image_dir = Path(image_dir)
-    for file in image_dir.glob(f"{scene}_{s1}_{s4}_*.jpg"):
-        match = pattern.match(file.name)
-        if match:
-            kosten = float(match.group(1))
-            return str(file), kosten
-    for file in image_dir.glob(f"{scene}_{s1}_{s4}_*.png"):
-        match = pattern.match(file.name)
-        if match:
-            kosten = float(match.group(1))
-            return str(file), kosten
-    raise FileNotFoundError(
-        f"Kein Bild gefunden für Szene {scene}_{s1}_{s4}_*.jpg/png im Verzeichnis {image_dir}"
-    )
+    image = get_slider_index(image_dir).images.get((scene, s1, s4))
+    if image is None:
+        raise FileNotFoundError(
+            f"Kein Bild gefunden für Szene {scene}_{s1}_{s4}_*.jpg/png im Verzeichnis {image_dir}"
+        )
+    return image.path, image.kosten
 
 
 def scan_slider_ranges(
     image_dir: str = "data/slider",
 ) -> dict[str, dict[str, tuple[int, int]]]:
     """
-    Scannt alle Bilder und ermittelt Slider-Ranges für S1 & S4 pro Szene.
+    Slider-Ranges für S1 & S4 pro Szene (aus dem Bild-Index).
     Erwartetes Format: Szene_S1_S4_Kosten.jpg
     """
-    pattern = re.compile(
-        r"^(?P<scene>.+?)_(?P<s1>\d+)_(?P<s4>\d+)_\d+\.\d+\.(jpg|png)$"
-    )
-    image_dir = Path(image_dir)
-    values_by_scene = defaultdict(lambda: {"S1": set(), "S4": set()})
+    ranges = get_slider_index(image_dir).ranges
+    return {scene: dict(r) for scene, r in ranges.items()}
 
-    for file in list(image_dir.glob("*.jpg")) + list(image_dir.glob("*.png")):
-        match = pattern.match(file.name)
-        if not match:
-            continue
-        scene = match.group("scene")
-        s1 = int(match.group("s1"))
-        s4 = int(match.group("s4"))
-        values_by_scene[scene]["S1"].add(s1)
-        values_by_scene[scene]["S4"].add(s4)
-
-    ranges = {}
-    for scene, val_dict in values_by_scene.items():
-        ranges[scene] = {}
-        for k, vals in val_dict.items():
-            if vals == {0}:
-                ranges[scene][k] = (0, 0)
-            else:
-                ranges[scene][k] = (min(vals), max(vals))
 
-    return ranges
+# ────────────────────────── Vorab-Kodierung ─────────────────────────
+def neighbour_images(
+    scene: str, s1: int, s4: int, image_dir: str = "data/slider"
+) -> list[SliderImage]:
+    """
+    Bilder der Nachbarzustände: Renaturierung s1±1 und Hochwasser an/aus
+    (S4 springt per Toggle zwischen Minimum und Maximum).
+    """
+    index = get_slider_index(image_dir)
+    ranges = index.ranges.get(scene)
+    if ranges is None:
+        return []
+    s4_min, s4_max = ranges["S4"]
+    states = [(s1 - 1, s4), (s1 + 1, s4)]
+    if s4_min != s4_max:
+        states.append((s1, s4_max if s4 == s4_min else s4_min))
+    keys = ((scene, a, b) for a, b in states)
+    return [index.images[k] for k in keys if k in index.images]
+
+
+class SliderPrefetcher:
+    """
+    Kodiert Designer-Bilder im Hintergrund auf Anzeigebreite (`encode_file`),
+    damit ein Zustandswechsel aus dem Speicher-Cache bedient wird.
+    """
+
+    def __init__(self, workers: int = 2):
+        self._pool = ThreadPoolExecutor(workers, thread_name_prefix="slider-prefetch")
+        self._pending: set[str] = set()
+        self._lock = threading.Lock()
+
+    def submit(self, paths: Iterable[str]) -> None:
+        for path in paths:
+            with self._lock:
+                if path in self._pending:
+                    continue
+                self._pending.add(path)
+            self._pool.submit(self._encode, path)
+
+    def _encode(self, path: str) -> None:
+        from utils.image_utils import encode_file
+
+        try:
+            encode_file(path)
+        except Exception:
+            pass  # wird beim Anzeigen erneut versucht
+        finally:
+            with self._lock:
+                self._pending.discard(path)
+
+    def prefetch_neighbours(
+        self, scene: str, s1: int, s4: int, image_dir: str = "data/slider"
+    ) -> list[SliderImage]:
+        """Reiht die Nachbarzustände ein und gibt sie zurück."""
+        neighbours = neighbour_images(scene, s1, s4, image_dir)
+        self.submit(img.path for img in neighbours)
+        return neighbours
+
+
+@st.cache_resource
+def get_prefetcher(image_dir: str = "data/slider") -> SliderPrefetcher:
+    """Ein Prefetcher pro Prozess; kodiert beim Start alle Varianten vor."""
+    prefetcher = SliderPrefetcher()
+    images = get_slider_index(image_dir).images
+    prefetcher.submit(images[k].path for k in sorted(images))
+    return prefetcher
 
 
 def map_to_emoji_level(value: float, steps: int = 5) -> int:
@@ -94,6 +217,8 @@ def load_narrative_texts() -> dict[str, str]:
 def create_feedback_df(
     rating: int, comment: str, selected_scene: str, image_name: str
 ) -> pd.DataFrame:
+    import pandas as pd
+
     return pd.DataFrame(
         [
             {
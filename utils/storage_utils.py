@@ -0,0 +1,228 @@
+"""storage_utils.py – Austauschbare Speicher-Backends für Spielergebnisse.
+
+Die öffentlichen Funktionen in `utils.google_utils` (save_*, lade_*) bauen ihre
+Zeilen selbst und reichen sie an das hier gewählte Backend weiter:
+
+- ``sheets`` (Standard): Google Sheets über Outbox und Write-Behind-Writer.
+- ``sqlite``: lokale SQLite-Datei – Millisekunden-Latenz, kein Netzwerk.
+
+Auswahl in ``.streamlit/secrets.toml``::
+
+    [storage]
+    backend = "sqlite"
+    path = ".storage/learnlit.sqlite"   # optional
+"""
+
+from __future__ import annotations
+
+import json
+import sqlite3
+import threading
+from abc import ABC, abstractmethod
+from pathlib import Path
+
+import pandas as pd
+import streamlit as st
+
+from utils.outbox_utils import WriteTicket, new_round_id
+from utils.schema_utils import parse_values
+
+STORAGE_PATH = Path(__file__).parent.parent / ".storage" / "learnlit.sqlite"
+
+
+# ────────────────────────── Schnittstelle ──────────────────────────
+class StorageBackend(ABC):
+    """
+    Gemeinsame Schnittstelle aller Backends.
+
+    Zeilen kommen als (columns, values) herein; gelesen wird ein DataFrame,
+    dessen Spalten gemäss ``schema_utils`` typisiert sind. `start`/`end` filtern auf die timestamp-Spalte
+    (UTC-Strings im Format von ``fmt_utc``).
+    """
+
+    @abstractmethod
+    def append_round(
+        self,
+        sheet_name: str,
+        scene: str,
+        columns: list[str],
+        values: list,
+        round_id: str | None = None,
+    ) -> WriteTicket: ...
+
+    @abstractmethod
+    def append_slider_choice(
+        self, sheet_name: str, worksheet: str, columns: list[str], values: list
+    ) -> WriteTicket: ...
+
+    @abstractmethod
+    def append_feedback(
+        self, sheet_name: str, worksheet: str, columns: list[str], values: list
+    ) -> WriteTicket: ...
+
+    @abstractmethod
+    def list_datasets(self, sheet_name: str) -> list[str]: ...
+
+    @abstractmethod
+    def read_dataset(
+        self,
+        sheet_name: str,
+        worksheet: str,
+        start: str | None = None,
+        end: str | None = None,
+    ) -> pd.DataFrame: ...
+
+    def read_all(self, sheet_name: str) -> dict[str, pd.DataFrame]:
+        """Alle Datensätze eines Spiels; Backends können das gebündelt laden."""
+        return {
+            worksheet: self.read_dataset(sheet_name, worksheet)
+            for worksheet in self.list_datasets(sheet_name)
+        }
+
+
+def filter_by_timestamp(
+    df: pd.DataFrame, start: str | None = None, end: str | None = None
+) -> pd.DataFrame:
+    """Filtert auf start <= timestamp <= end (UTC-Strings im Format fmt_utc)."""
+    if "timestamp" not in df.columns or (start is None and end is None):
+        return df
+    ts = df["timestamp"]
+    as_time = pd.api.types.is_datetime64_any_dtype(ts)
+    bound = (lambda v: pd.Timestamp(v, tz="UTC")) if as_time else (lambda v: v)
+    mask = pd.Series(True, index=df.index)
+    if start is not None:
+        mask &= ts >= bound(start)
+    if end is not None:
+        mask &= ts <= bound(end)
+    return df[mask].reset_index(drop=True)
+
+
+# ────────────────────────── SQLite ─────────────────────────────────
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS records (
+    id         INTEGER PRIMARY KEY AUTOINCREMENT,
+    round_id   TEXT NOT NULL UNIQUE,
+    sheet_name TEXT NOT NULL,
+    worksheet  TEXT NOT NULL,
+    timestamp  TEXT NOT NULL,
+    columns    TEXT NOT NULL,
+    payload    TEXT NOT NULL
+);
+CREATE INDEX IF NOT EXISTS records_by_ws ON records (sheet_name, worksheet, timestamp);
+"""
+
+
+class SQLiteBackend(StorageBackend):
+    """
+    Lokales Backend: eine Zeile pro Datensatz, Spalten als JSON.
+
+    Spalten, die später dazukommen (neue Labels), werden beim Lesen hinten
+    angehängt – wie beim Erweitern der Kopfzeile in Google Sheets.
+    """
+
+    def __init__(self, path: str | Path | None = None):
+        self.path = Path(path or STORAGE_PATH)
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self._lock = threading.Lock()
+        self._con = sqlite3.connect(
+            str(self.path), check_same_thread=False, isolation_level=None, timeout=30
+        )
+        self._con.execute("PRAGMA journal_mode=WAL")
+        self._con.executescript(_SCHEMA)
+
+    def _append(
+        self,
+        sheet_name: str,
+        worksheet: str,
+        columns: list[str],
+        values: list,
+        round_id: str | None = None,
+    ) -> WriteTicket:
+        round_id = round_id or new_round_id()
+        record = dict(zip(columns, values))
+        with self._lock:
+            self._con.execute(
+                "INSERT OR IGNORE INTO records (round_id, sheet_name, worksheet,"
+                " timestamp, columns, payload) VALUES (?,?,?,?,?,?)",
+                (
+                    round_id,
+                    sheet_name,
+                    worksheet,
+                    str(record.get("timestamp", "")),
+                    json.dumps(list(columns)),
+                    json.dumps(values, default=str),
+                ),
+            )
+        ticket = WriteTicket(round_id)
+        ticket._resolve()
+        return ticket
+
+    def append_round(self, sheet_name, scene, columns, values, round_id=None):
+        return self._append(sheet_name, scene, columns, values, round_id)
+
+    def append_slider_choice(self, sheet_name, worksheet, columns, values):
+        return self._append(sheet_name, worksheet, columns, values)
+
+    def append_feedback(self, sheet_name, worksheet, columns, values):
+        return self._append(sheet_name, worksheet, columns, values)
+
+    def list_datasets(self, sheet_name: str) -> list[str]:
+        with self._lock:
+            rows = self._con.execute(
+                "SELECT worksheet FROM records WHERE sheet_name = ?"
+                " GROUP BY worksheet ORDER BY MIN(id)",
+                (sheet_name,),
+            ).fetchall()
+        return [r[0] for r in rows]
+
+    def read_dataset(self, sheet_name, worksheet, start=None, end=None):
+        query = "SELECT columns, payload FROM records WHERE sheet_name = ? AND worksheet = ?"
+        params: list = [sheet_name, worksheet]
+        if start is not None:
+            query += " AND timestamp >= ?"
+            params.append(start)
+        if end is not None:
+            query += " AND timestamp <= ?"
+            params.append(end)
+        with self._lock:
+            rows = self._con.execute(query + " ORDER BY id", params).fetchall()
+
+        header: list[str] = []
+        records = []
+        for columns_json, payload_json in rows:
+            columns = json.loads(columns_json)
+            header += [c for c in columns if c not in header]
+            records.append(dict(zip(columns, json.loads(payload_json))))
+
+        grid = [
+            ["" if rec.get(c) is None else str(rec.get(c)) for c in header]
+            for rec in records
+        ]
+        return parse_values(pd.DataFrame(grid, columns=header), sheet_name, worksheet)
+
+    def close(self) -> None:
+        with self._lock:
+            self._con.close()
+
+
+# ────────────────────────── Auswahl ────────────────────────────────
+def storage_config() -> dict:
+    """Liest den Abschnitt [storage] aus st.secrets (leer, falls nicht vorhanden)."""
+    try:
+        return dict(st.secrets.get("storage", {}))
+    except FileNotFoundError:
+        return {}
+
+
+@st.cache_resource
+def get_storage_backend() -> StorageBackend:
+    """Ein Backend pro Server-Prozess, gewählt über st.secrets['storage']['backend']."""
+    config = storage_config()
+    backend = config.get("backend", "sheets")
+    if backend == "sqlite":
+        return SQLiteBackend(config.get("path"))
+    if backend == "sheets":
+        from utils.google_utils import SheetsBackend
+
+        return SheetsBackend()
+    raise ValueError(f"Unbekanntes Speicher-Backend: '{backend}'")
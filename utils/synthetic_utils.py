@@ -0,0 +1,265 @@
+"""synthetic_utils.py – Synthetische Spielinhalte für Last- und Benchmark-Tests.
+
+Erzeugt Designer-Bilder im aktuellen Format `Szene_S1_S4_Kosten.(jpg|png)`
+und Detektiv-Szenen (Bildpaar, CVAT-XML, Lerntexte) in derselben Ablage wie
+`data/`, in beliebiger Menge und realistischer Bildgrösse. Jede Datei bzw.
+Szene ist eine eigene Aufgabe; die Aufgaben laufen parallel über alle Kerne.
+
+    python -m utils.synthetic_utils --slider-scenes 200 --detective-scenes 100
+    python -m utils.synthetic_utils --out /tmp/synth --size 800x600 --workers 4
+
+Ergebnis (Standard: `.cache/synthetic`):
+
+    <out>/slider/Szene0000_1_2_1.0.png
+    <out>/detective/Szene0000.xml, Szene0000_lerntexte.md,
+                    Szene0000_unverändert.png, Szene0000_verändert.png
+"""
+
+from __future__ import annotations
+
+import argparse
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+from xml.sax.saxutils import quoteattr
+
+import numpy as np
+from PIL import Image, ImageDraw
+
+SYNTHETIC_PATH = Path(__file__).parent.parent / ".cache" / "synthetic"
+SLIDER_SIZE = (1461, 1016)  # wie die echten Designer-Bilder
+DETECTIVE_SIZE = (1358, 704)  # wie die echten Detektiv-Szenen
+LABELS = ("Solar", "Wind", "Erdrutsch", "Renaturierung", "Verbau", "Borke", "Hecke")
+
+
+# ────────────────────────── Bilder ──────────────────────────────────
+def landscape(size: tuple[int, int], seed: int) -> Image.Image:
+    """Himmel, Hügelkette und verrauschte Wiese – komprimiert ähnlich wie Fotos."""
+    rng = np.random.default_rng(seed)
+    w, h = size
+    y = np.arange(h, dtype=np.float32)[:, None]
+    x = np.arange(w, dtype=np.float32)[None, :]
+
+    phase, freq = rng.uniform(0, 2 * np.pi), rng.uniform(2, 6)
+    horizon = h * (0.45 + 0.08 * np.sin(x / w * freq * np.pi + phase))
+    sky = np.stack(
+        [150 + 60 * y / h, 190 + 40 * y / h, np.full_like(y, 245)], axis=-1
+    ) * np.ones((1, w, 1), np.float32)
+    ground = np.stack(
+        [60 + 40 * y / h, 120 + 50 * (1 - y / h), 50 + 20 * y / h], axis=-1
+    ) * np.ones((1, w, 1), np.float32)
+    pixels = np.where((y > horizon)[..., None], ground, sky)
+    pixels += rng.normal(0, 9, pixels.shape).astype(np.float32)
+    return Image.fromarray(np.clip(pixels, 0, 255).astype(np.uint8), "RGB")
+
+
+def _random_polygon(
+    rng: np.random.Generator, size: tuple[int, int]
+) -> list[tuple[float, float]]:
+    """Sternförmiges Polygon (6–12 Ecken), vollständig im Bild."""
+    w, h = size
+    r_max = min(w, h) * rng.uniform(0.04, 0.12)
+    cx, cy = rng.uniform(r_max, w - r_max), rng.uniform(r_max, h - r_max)
+    n = int(rng.integers(6, 13))
+    angles = np.sort(rng.uniform(0, 2 * np.pi, n))
+    radii = rng.uniform(0.5, 1.0, n) * r_max
+    return [
+        (round(cx + r * np.cos(a), 2), round(cy + r * np.sin(a), 2))
+        for a, r in zip(angles, radii)
+    ]
+
+
+# ────────────────────────── Designer ────────────────────────────────
+def slider_kosten(s1: int, s4: int) -> float:
+    """Wie in `data/slider`: ohne Hochwasser 0, sonst halbiert je Renaturierungsstufe."""
+    return 0.0 if s4 == 1 else round(0.5 ** (s1 - 1), 3)
+
+
+def slider_name(scene: str, s1: int, s4: int, fmt: str) -> str:
+    return f"{scene}_{s1}_{s4}_{slider_kosten(s1, s4)!r}.{fmt}"
+
+
+def write_slider_image(
+    out_dir: Path, scene: str, s1: int, s4: int, fmt: str, size, seed: int
+) -> int:
+    img = landscape(size, seed)
+    draw = ImageDraw.Draw(img)
+    w, h = size
+    # Renaturierung: mehr Bäume; Hochwasser: Wasserfläche im unteren Drittel
+    rng = np.random.default_rng(seed + s1)
+    for _ in range(8 * s1):
+        x, y = rng.uniform(0, w), rng.uniform(h * 0.5, h * 0.95)
+        draw.ellipse((x - 12, y - 20, x + 12, y + 20), fill=(30, 90, 40))
+    if s4 == 2:
+        draw.rectangle((0, int(h * 0.8), w, h), fill=(70, 110, 160))
+
+    path = out_dir / slider_name(scene, s1, s4, fmt)
+    img.save(path, "JPEG" if fmt == "jpg" else "PNG", quality=90)
+    return path.stat().st_size
+
+
+# ────────────────────────── Detektiv ────────────────────────────────
+def cvat_xml(scene: str, size: tuple[int, int], polygons: list[tuple]) -> str:
+    """Minimale CVAT-1.1-Annotation: Polygone nur auf dem veränderten Bild."""
+    w, h = size
+    shapes = "\n".join(
+        f'    <polygon label={quoteattr(label)} source="manual" occluded="0" '
+        f"points=\"{';'.join(f'{x:.2f},{y:.2f}' for x, y in pts)}\" z_order=\"0\">\n"
+        "    </polygon>"
+        for label, pts in polygons
+    )
+    return (
+        '<?xml version="1.0" encoding="utf-8"?>\n<annotations>\n'
+        "  <version>1.1</version>\n"
+        f'  <image id="0" name="{scene}_unverändert.png" width="{w}" height="{h}">\n'
+        "  </image>\n"
+        f'  <image id="1" name="{scene}_verändert.png" width="{w}" height="{h}">\n'
+        f"{shapes}\n  </image>\n</annotations>\n"
+    )
+
+
+def write_detective_scene(
+    out_dir: Path, scene: str, size, n_diffs: int, seed: int
+) -> int:
+    rng = np.random.default_rng(seed)
+    base = landscape(size, seed)
+    changed = base.copy()
+    draw = ImageDraw.Draw(changed)
+    polygons = []
+    for k in rng.permutation(n_diffs):
+        # eindeutige Labels, ab der 8. Änderung mit Nummer (Solar1, Wind1, …)
+        label = LABELS[k % len(LABELS)] + (
+            str(k // len(LABELS)) if k >= len(LABELS) else ""
+        )
+        pts = _random_polygon(rng, size)
+        draw.polygon(pts, fill=tuple(int(c) for c in rng.integers(0, 256, 3)))
+        polygons.append((label, pts))
+
+    paths = {
+        "unverändert": out_dir / f"{scene}_unverändert.png",
+        "verändert": out_dir / f"{scene}_verändert.png",
+        "xml": out_dir / f"{scene}.xml",
+        "lerntexte": out_dir / f"{scene}_lerntexte.md",
+    }
+    base.save(paths["unverändert"])
+    changed.save(paths["verändert"])
+    paths["xml"].write_text(cvat_xml(scene, size, polygons), encoding="utf-8")
+    paths["lerntexte"].write_text(
+        "".join(
+            f"# {label}  \n**{label}**  \nSynthetischer Lerntext zu {label} "
+            f"in {scene}.\n\n"
+            for label, _ in polygons
+        ),
+        encoding="utf-8",
+    )
+    return sum(p.stat().st_size for p in paths.values())
+
+
+# ────────────────────────── Ablauf ──────────────────────────────────
+def _run(task: tuple) -> int:
+    fn, *args = task
+    return fn(*args)
+
+
+def plan(
+    out: Path,
+    slider_scenes: int,
+    s1_levels: int,
+    detective_scenes: int,
+    n_diffs: int,
+    slider_size,
+    detective_size,
+    fmt: str,
+    seed: int,
+) -> list[tuple]:
+    """Alle Aufgaben (eine pro Designer-Bild bzw. Detektiv-Szene)."""
+    slider_dir, detective_dir = out / "slider", out / "detective"
+    slider_dir.mkdir(parents=True, exist_ok=True)
+    detective_dir.mkdir(parents=True, exist_ok=True)
+
+    tasks = []
+    for i in range(slider_scenes):
+        scene = f"Szene{i:04d}"
+        scene_fmt = fmt if fmt != "gemischt" else ("png", "jpg")[i % 2]
+        for s1 in range(1, s1_levels + 1):
+            for s4 in (1, 2):
+                tasks.append(
+                    (
+                        write_slider_image,
+                        slider_dir,
+                        scene,
+                        s1,
+                        s4,
+                        scene_fmt,
+                        slider_size,
+                        seed + i,
+                    )
+                )
+    for i in range(detective_scenes):
+        tasks.append(
+            (
+                write_detective_scene,
+                detective_dir,
+                f"Szene{i:04d}",
+                detective_size,
+                n_diffs,
+                seed + 100_000 + i,
+            )
+        )
+    return tasks
+
+
+def generate(tasks: list[tuple], workers: int | None = None) -> int:
+    """Führt die Aufgaben parallel aus; liefert die geschriebenen Bytes."""
+    workers = workers or os.cpu_count() or 1
+    if workers == 1:
+        return sum(map(_run, tasks))
+    chunksize = max(1, len(tasks) // (workers * 4))
+    with ProcessPoolExecutor(workers) as pool:
+        return sum(pool.map(_run, tasks, chunksize=chunksize))
+
+
+def _size(text: str) -> tuple[int, int]:
+    w, h = text.lower().split("x")
+    return int(w), int(h)
+
+
+def main(argv: list[str] | None = None) -> None:
+    parser = argparse.ArgumentParser(description="Erzeugt synthetische Spielinhalte.")
+    parser.add_argument("--out", type=Path, default=SYNTHETIC_PATH)
+    parser.add_argument("--slider-scenes", type=int, default=50)
+    parser.add_argument("--s1", type=int, default=3, help="Renaturierungsstufen")
+    parser.add_argument("--detective-scenes", type=int, default=20)
+    parser.add_argument("--diffs", type=int, default=5, help="Unterschiede pro Szene")
+    parser.add_argument("--size", type=_size, default=None, help="z. B. 800x600")
+    parser.add_argument(
+        "--format", choices=("png", "jpg", "gemischt"), default="gemischt"
+    )
+    parser.add_argument(
+        "--workers", type=int, default=None, help="Standard: alle Kerne"
+    )
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args(argv)
+
+    tasks = plan(
+        args.out,
+        args.slider_scenes,
+        args.s1,
+        args.detective_scenes,
+        args.diffs,
+        args.size or SLIDER_SIZE,
+        args.size or DETECTIVE_SIZE,
+        args.format,
+        args.seed,
+    )
+    t0 = time.perf_counter()
+    written = generate(tasks, args.workers)
+    print(
+        f"{len(tasks)} Aufgaben, {written / 1024**2:.1f} MB in "
+        f"{time.perf_counter() - t0:.1f} s → {args.out}"
+    )
+
+
+if __name__ == "__main__":
+    main()
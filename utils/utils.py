@@ -1,6 +1,5 @@
 import streamlit as st
 from utils.time_utils import now_utc, fmt_utc
-import pandas as pd
 from pathlib import Path
 import os
 
@@ -41,12 +40,16 @@ def zeige_feedback_formular(sheet_name) -> None:
             "kommentar": [kommentar],
         }
 
+        import pandas as pd
+
         feedback_df = pd.DataFrame(feedback_data)
 
         try:
             from utils.google_utils import save_feedback_to_gsheet
 
-            save_feedback_to_gsheet(feedback_df, sheet_name)
+            st.session_state.feedback_ticket = save_feedback_to_gsheet(
+                feedback_df, sheet_name
+            )
             st.session_state.feedback = True
             st.toast("✅ Danke für dein Feedback!")
             st.rerun()
@@ -54,6 +57,24 @@ def zeige_feedback_formular(sheet_name) -> None:
             st.warning(f"⚠️ Leider hat das Abspeichern nicht geklappt: {e}")
 
 
+def zeige_speicherstatus(*keys: str) -> None:
+    """
+    Meldet fehlgeschlagene Hintergrund-Speicherungen (WriteTicket im session_state).
+    Erledigte Tickets werden danach entfernt, offene bleiben für den nächsten Rerun.
+    """
+    for key in keys:
+        ticket = st.session_state.get(key)
+        if ticket is None:
+            continue
+        if ticket.done:
+            del st.session_state[key]
+        elif ticket.status == "retrying":
+            st.warning(
+                "⚠️ Das Abspeichern hat noch nicht geklappt, wir versuchen es "
+                f"automatisch erneut: {ticket.error}"
+            )
+
+
 def reset_session_state(exclude_keys: list[str] = []) -> None:
     """
     Löscht alle Keys im session_state außer denen, die explizit geschützt werden sollen.